@@ -0,0 +1,113 @@
+import os
+import sys
+import asyncio
+import logging
+import argparse
+import tempfile
+from sqlalchemy import select
+from mock_sources import MockConfig, MockSources, FakeTelegramClient
+
+# Columns that must come out identical when a recorded cycle is replayed into an empty database
+COMPARED_COLUMNS = ('source', 'external_id', 'title', 'company', 'location', 'salary_min', 'salary_max',
+                    'currency', 'apply_link', 'description_html', 'posted_at_source', 'fingerprint')
+
+def _configure_env(db_path: str, sources: MockSources, groups: int):
+    os.environ.update(sources.env())
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{db_path}",
+        'QUERY_DELAY_SECONDS': '0',
+        'JOOBLE_API_KEY': 'bench',
+        'TELEGRAM_API_ID': '1',
+        'TELEGRAM_API_HASH': 'bench',
+        'TELEGRAM_SESSION_STRING': '',
+        'TELEGRAM_GROUPS': ','.join(f"bench_group_{i}" for i in range(groups)),
+        'TELEGRAM_REQUESTS_PER_SECOND': '1000',
+        'TELEGRAM_REQUEST_BURST': '1000',
+    })
+
+def _rows(db_url: str, after_id: int = 0) -> list:
+    from database import DatabaseManager, Job
+    db = DatabaseManager(db_url)
+    columns = [getattr(Job, name) for name in COMPARED_COLUMNS]
+    with db.engine.connect() as conn:
+        rows = conn.execute(select(*columns).where(Job.id > after_id)).all()
+    return sorted((tuple(row) for row in rows), key=repr)
+
+def _posting(row: tuple) -> tuple:
+    """Source, title, company, location and link: what a repost shares with the original"""
+    values = dict(zip(COMPARED_COLUMNS, row))
+    return values['source'], values['title'], values['company'], values['location'], values['apply_link']
+
+async def run_round_trip(args) -> bool:
+    """Warm-up cycle (fills the entity cache and checkpoints), recorded cycle, then replay into a fresh DB"""
+    directory = tempfile.mkdtemp()
+    cassette_path = os.path.join(directory, 'cycle.jsonl.gz')
+    sources = MockSources(MockConfig(latency_ms=0, page_size=args.page_size, seed=args.seed))
+    await sources.start()
+    _configure_env(os.path.join(directory, 'recorded.db'), sources, args.telegram_groups)
+    recorded_url = os.environ['DATABASE_URL']
+
+    # Engines read their settings at construction, so import after the environment is in place
+    import cassette
+    import telegram_engine
+    from database import DatabaseManager, Job, SearchQuery, PlatformEnum
+    from sqlalchemy import func
+
+    FakeTelegramClient.reset(MockConfig(latency_ms=0, seed=args.seed))
+    telegram_engine.TelegramClient = FakeTelegramClient
+    db = DatabaseManager(recorded_url)
+    db.create_tables()
+    session = db.get_session()
+    session.add(SearchQuery(platform=PlatformEnum.JOOBLE, value="bench query", location=""))
+    session.commit()
+    session.close()
+
+    try:
+        for i in range(args.telegram_groups):
+            FakeTelegramClient.post(f"bench_group_{i}", args.telegram_messages)
+        await telegram_engine.run_telegram_engine()
+        with db.engine.connect() as conn:
+            warm_up_max_id = conn.execute(select(func.max(Job.id))).scalar() or 0
+
+        # Recorded cycle: every group now resolves from the entity cache and resumes from its checkpoint
+        for i in range(args.telegram_groups):
+            FakeTelegramClient.post(f"bench_group_{i}", args.telegram_messages)
+        os.environ.update({'CASSETTE_MODE': 'record', 'CASSETTE_PATH': cassette_path})
+        cassette._snapshot_state(cassette.active())
+        await cassette.run_cycle(['telegram', 'jooble'])
+    finally:
+        await sources.stop()
+
+    # Replay with no network into an empty database
+    os.environ.update({'CASSETTE_MODE': 'replay', 'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'replayed.db')}"})
+    cassette._prepare_replay(cassette.active())
+    await cassette.run_cycle(['telegram', 'jooble'])
+
+    recorded = _rows(recorded_url, warm_up_max_id)
+    replayed = _rows(os.environ['DATABASE_URL'])
+    # Reposts the recorded database skipped as duplicates of warm-up rows are new to the empty replay database
+    warm_up = {_posting(row) for row in _rows(recorded_url) if row not in set(recorded)}
+    by_source = {}
+    for row in recorded:
+        by_source[row[0].value] = by_source.get(row[0].value, 0) + 1
+    print(f"recorded cycle rows: {len(recorded)} {by_source}")
+    print(f"replayed rows:       {len(replayed)}")
+    missing = set(recorded) - set(replayed)
+    extra = set(replayed) - set(recorded)
+    reposts = {row for row in extra if _posting(row) in warm_up}
+    extra -= reposts
+    print(f"missing on replay: {len(missing)}, extra on replay: {len(extra)} "
+          f"(plus {len(reposts)} reposts of warm-up rows)")
+    return bool(recorded) and 'telegram' in by_source and not missing and not extra
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record one cycle against local mock sources, replay it "
+                                                 "offline into an empty database and compare the stored rows")
+    parser.add_argument('--telegram-groups', type=int, default=3)
+    parser.add_argument('--telegram-messages', type=int, default=60, help="New messages per group per cycle")
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    sys.exit(0 if asyncio.run(run_round_trip(args)) else 1)
@@ -0,0 +1,68 @@
+import sys
+import json
+import time
+from datetime import datetime
+from job_classifier import score_message, MIN_SCORE
+from telegram_engine import parse_message
+
+FIXTURE_PATH = 'fixtures/telegram_messages.jsonl'  # The patterns and MIN_SCORE were tuned on these
+HOLDOUT_PATH = 'fixtures/telegram_messages_holdout.jsonl'  # Never used for tuning: quote precision/recall from here
+
+def _load_fixtures(path: str):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _confusion(fixtures, min_score: float):
+    tp = fp = fn = tn = 0
+    for item in fixtures:
+        predicted = score_message(item['text']) >= min_score
+        if predicted and item['job']:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif item['job']:
+            fn += 1
+        else:
+            tn += 1
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return tp, fp, fn, tn, precision, recall
+
+def _report(name: str, fixtures):
+    print(f"{name}: {len(fixtures)} labelled messages ({sum(item['job'] for item in fixtures)} job posts)")
+    print(f"{'min score':>10}{'tp':>5}{'fp':>5}{'fn':>5}{'tn':>5}{'precision':>11}{'recall':>8}")
+    for min_score in (1.0, 2.0, MIN_SCORE, 4.0, 5.0):
+        tp, fp, fn, tn, precision, recall = _confusion(fixtures, min_score)
+        marker = '  <- TELEGRAM_JOB_MIN_SCORE' if min_score == MIN_SCORE else ''
+        print(f"{min_score:>10.1f}{tp:>5}{fp:>5}{fn:>5}{tn:>5}{precision:>11.2f}{recall:>8.2f}{marker}")
+
+    for item in fixtures:
+        predicted = score_message(item['text']) >= MIN_SCORE
+        if predicted != item['job']:
+            label = 'missed job' if item['job'] else 'false positive'
+            print(f"  {label}: {item['text'].splitlines()[0][:70]!r}")
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_PATH
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    holdout_path = sys.argv[3] if len(sys.argv) > 3 else HOLDOUT_PATH
+    fixtures = _load_fixtures(path)
+
+    _report("tuning set", fixtures)
+    _report("held-out set", _load_fixtures(holdout_path))
+
+    # Throughput: scoring alone, then the whole parse (score + extraction + UnifiedJob)
+    texts = [item['text'] for item in fixtures] * repeat
+    started = time.perf_counter()
+    for text in texts:
+        score_message(text)
+    score_elapsed = time.perf_counter() - started
+
+    now = datetime.now()
+    payloads = [(text, now, i, 'bench') for i, text in enumerate(texts)]
+    started = time.perf_counter()
+    kept = sum(1 for payload in payloads if parse_message(payload))
+    parse_elapsed = time.perf_counter() - started
+
+    print(f"score_message: {len(texts) / score_elapsed:,.0f} msgs/sec")
+    print(f"parse_message: {len(texts) / parse_elapsed:,.0f} msgs/sec ({kept}/{len(texts)} kept)")
@@ -0,0 +1,51 @@
+import random
+import subprocess
+from datetime import datetime, timedelta
+from database import PlatformEnum
+
+# Helpers shared by the bench_*.py scripts
+
+TITLES = ['software engineer', 'backend engineer', 'frontend developer', 'python developer', 'java developer',
+          'data scientist', 'data analyst', 'ml engineer', 'devops engineer', 'cloud architect',
+          'security engineer', 'product manager', 'qa engineer', 'android developer', 'sre']
+SENIORITY = ['junior', 'senior', 'lead', 'staff', 'principal', '']
+COMPANIES = [f"company {i}" for i in range(5000)]
+LOCATIONS = ['Bangalore', 'Hyderabad', 'Pune', 'Chennai', 'Mumbai', 'Delhi', 'Noida', 'Gurgaon', 'Remote', 'India']
+WORDS = ('kubernetes docker aws gcp azure postgres mysql redis kafka spark airflow django flask fastapi react '
+         'angular vue typescript golang rust scala terraform linux microservices graphql grpc pandas numpy '
+         'pytorch tensorflow llm nlp etl agile scrum startup fintech healthcare ecommerce saas').split()
+# Filler vocabulary so skill keywords are as sparse as in real postings
+FILLER = [f"word{i}" for i in range(20000)]
+
+def synthetic_rows(start: int, count: int, rng: random.Random):
+    """job_hashes and jobs rows for Core bulk inserts, with ids start .. start + count - 1"""
+    now = datetime.utcnow()
+    hashes, jobs = [], []
+    for i in range(start, start + count):
+        title = f"{rng.choice(SENIORITY)} {rng.choice(TITLES)}".strip().title()
+        skills = [rng.choice(WORDS) for _ in range(rng.randint(3, 8))]
+        filler = [rng.choice(FILLER) for _ in range(rng.randint(40, 120))]
+        body = ' '.join(skills + filler)
+        hashes.append({'id': i, 'content_hash': f"{i:064x}"})
+        jobs.append({
+            'id': i,
+            'hash_id': i,
+            'source': rng.choice(list(PlatformEnum)[:5]),
+            'title': title,
+            'company': rng.choice(COMPANIES),
+            'location': rng.choice(LOCATIONS),
+            'description_html': f"<p>{body}</p><ul><li>{rng.choice(WORDS)}</li></ul>",
+            'posted_at_source': now - timedelta(minutes=i),
+            'created_at': now,
+        })
+    return hashes, jobs
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, update
+from mock_sources import MockLinks
+
+def _seed(db, links: int, hosts: list, private_every: int):
+    """Jobs whose apply links spread round-robin over the stand-in's host names"""
+    from database import Job, JobHash, PlatformEnum
+    now = datetime.utcnow()
+    hashes, jobs = [], []
+    for n in range(1, links + 1):
+        host = hosts[n % len(hosts)]
+        path = 'private' if private_every and n % private_every == 0 else 'job'
+        hashes.append({'id': n, 'content_hash': f"{n:064x}"})
+        jobs.append({'id': n, 'hash_id': n, 'source': PlatformEnum.JOOBLE, 'title': f"Job {n}", 'company': 'Bench',
+                     'location': 'Remote', 'apply_link': f"http://{host}/{path}/{n}", 'created_at': now})
+    with db.engine.begin() as conn:
+        conn.execute(insert(JobHash.__table__), hashes)
+        conn.execute(insert(Job.__table__), jobs)
+
+def _accuracy(db, private_every: int) -> tuple:
+    from database import LinkCheck
+    from link_checker import STATUS_DISALLOWED
+    correct = wrong = disallowed = 0
+    with db.engine.connect() as conn:
+        for job_id, status, alive in conn.execute(select(LinkCheck.job_id, LinkCheck.status, LinkCheck.alive)):
+            if private_every and job_id % private_every == 0:
+                disallowed += status == STATUS_DISALLOWED
+            elif alive == MockLinks.expected(job_id):
+                correct += 1
+            else:
+                wrong += 1
+    return correct, wrong, disallowed
+
+async def run_benchmark(args):
+    stand_in = MockLinks(crawl_delay=args.crawl_delay, latency_ms=args.latency_ms)
+    port = await stand_in.start()
+    hosts = [f"127.0.0.1:{port}", f"localhost:{port}"]
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_link_checker.db')}",
+        'LINK_CHECK_PER_HOST': str(args.per_host),
+        'LINK_CHECK_HOST_DELAY_MS': str(args.host_delay_ms),
+        'LINK_CHECK_BATCH_SIZE': str(args.batch_size),
+        'LINK_CHECK_MAX_WAIT_SECONDS': str(args.max_wait),
+    })
+    from database import DatabaseManager, LinkCheck
+    from link_checker import LinkChecker
+    db = DatabaseManager(os.environ['DATABASE_URL'])
+    db.create_tables()
+    _seed(db, args.links, hosts, args.private_every)
+
+    try:
+        print(f"{'pass':<14}{'seconds':>9}{'checks/s':>10}{'alive':>7}{'dead':>6}{'unknown':>9}{'deferred':>10}")
+        for label in ('first', 'nothing due', 'all due'):
+            if label == 'all due':
+                # Pretend the schedule came round: every stored result is due again
+                with db.engine.begin() as conn:
+                    conn.execute(update(LinkCheck).values(next_check_at=datetime.utcnow() - timedelta(seconds=1)))
+            checker = LinkChecker(db)
+            started = time.perf_counter()
+            counts = await checker.run(args.limit)
+            elapsed = time.perf_counter() - started
+            checked = sum(counts.values()) - counts['deferred']
+            print(f"{label:<14}{elapsed:>9.2f}{checked / elapsed if elapsed else 0:>10.0f}{counts['alive']:>7}"
+                  f"{counts['dead']:>6}{counts['unknown']:>9}{counts['deferred']:>10}")
+    finally:
+        await stand_in.stop()
+
+    correct, wrong, disallowed = _accuracy(db, args.private_every)
+    print(f"\nclassified correctly: {correct}, wrong: {wrong}, robots-disallowed: {disallowed}")
+    print(f"peak in-flight per host: {stand_in.peak_in_flight} (cap {args.per_host})")
+    with db.engine.connect() as conn:
+        streaks = sorted(conn.execute(select(LinkCheck.streak).distinct()).scalars())
+    print(f"streaks after the re-check: {streaks}")
+    return wrong == 0 and max(stand_in.peak_in_flight.values(), default=0) <= args.per_host
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply-link checker against a local HTTP stand-in")
+    parser.add_argument('--links', type=int, default=2000)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--host-delay-ms', type=float, default=0)
+    parser.add_argument('--crawl-delay', type=float, default=0, help="Crawl-delay the stand-in's robots.txt asks for")
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--max-wait', type=float, default=30)
+    parser.add_argument('--private-every', type=int, default=50, help="Every Nth link is disallowed by robots.txt")
+    parser.add_argument('--limit', type=int, default=0, help="Links per pass (0 = all due)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    sys.exit(0 if asyncio.run(run_benchmark(args)) else 1)
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import log_config
+from bench_common import percentile
+
+logger = logging.getLogger("LoggingBenchmark")
+
+def _legacy_setup(directory: str):
+    """What every engine did at import: synchronous file and console handlers on the caller's thread"""
+    root = logging.getLogger()
+    console = open(os.path.join(directory, 'console.log'), 'w', encoding='utf-8')
+    for handler in (logging.FileHandler(os.path.join(directory, 'app.log'), encoding='utf-8'),
+                    logging.StreamHandler(console)):
+        handler.setFormatter(logging.Formatter(log_config.TEXT_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def _queue_setup(directory: str, log_format: str, sample_burst: int):
+    os.environ.update({
+        'LOG_FILE': os.path.join(directory, 'app.log'),
+        'LOG_FORMAT': log_format,
+        'LOG_SAMPLE_BURST': str(sample_burst),
+    })
+    console = open(os.path.join(directory, 'console.log'), 'w', encoding='utf-8')
+    log_config.setup_logging(console=console)
+
+def _teardown():
+    log_config.shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+def _emit(records: int, per_cycle_every: int) -> list:
+    """Per-job messages from one call site, with a per-cycle summary every `per_cycle_every` records"""
+    timings = []
+    for i in range(records):
+        started = time.perf_counter_ns()
+        if i % per_cycle_every:
+            logger.info(f"Error parsing job: missing title in payload {i}")
+        else:
+            logger.info(f"DB COMMIT SUCCESS: {i} jobs inserted")
+        timings.append(time.perf_counter_ns() - started)
+    return timings
+
+def run_benchmark(records: int, per_cycle_every: int):
+    configs = [
+        ('legacy sync', lambda d: _legacy_setup(d)),
+        ('queue text', lambda d: _queue_setup(d, 'text', 0)),
+        ('queue json', lambda d: _queue_setup(d, 'json', 0)),
+        ('queue text sampled', lambda d: _queue_setup(d, 'text', 50)),
+    ]
+    print(f"{'config':<20}{'mean us':>9}{'p50 us':>9}{'p99 us':>9}{'caller s':>10}{'drain s':>9}{'lines':>9}")
+    for name, setup in configs:
+        directory = tempfile.mkdtemp()
+        setup(directory)
+        started = time.perf_counter()
+        timings = _emit(records, per_cycle_every)
+        caller_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        _teardown()  # Waits for the listener to finish writing
+        drain_seconds = time.perf_counter() - started
+        with open(os.path.join(directory, 'app.log'), encoding='utf-8') as f:
+            lines = sum(1 for _ in f)
+        print(f"{name:<20}{sum(timings) / len(timings) / 1000:>9.2f}{percentile(timings, 50) / 1000:>9.2f}"
+              f"{percentile(timings, 99) / 1000:>9.2f}{caller_seconds:>10.3f}{drain_seconds:>9.3f}{lines:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caller-side cost of a log call per logging setup")
+    parser.add_argument('--records', type=int, default=50000)
+    parser.add_argument('--per-cycle-every', type=int, default=500, help="One per-cycle message every N records")
+    args = parser.parse_args()
+    if args.per_cycle_every < 1:
+        sys.exit("--per-cycle-every must be positive")
+    run_benchmark(args.records, args.per_cycle_every)
@@ -0,0 +1,78 @@
+import re
+import sys
+import time
+import random
+import hashlib
+import tracemalloc
+from datetime import datetime
+from models import UnifiedJob
+
+class LegacyJob:
+    """The dict-backed per-engine job class UnifiedJob replaced, kept as a baseline"""
+    def __init__(self, title, company, location, description, apply_link=None, posted_at=None,
+                 source="jooble", external_id=None):
+        self.title = title
+        self.company = company
+        self.location = location
+        self.description = description
+        self.apply_link = apply_link
+        self.posted_at = posted_at
+        self.source = source
+        self.external_id = external_id
+
+    def get_content_hash(self) -> str:
+        title_norm = re.sub(r'\s+', ' ', self.title.lower().strip()) if self.title else ""
+        company_norm = re.sub(r'\s+', ' ', self.company.lower().strip()) if self.company else ""
+        location_norm = re.sub(r'\s+', ' ', self.location.lower().strip()) if self.location else ""
+        source_url_norm = self.apply_link.lower().strip() if self.apply_link else ""
+        hash_input = f"{title_norm}|{company_norm}|{location_norm}|{self.source}|{source_url_norm}"
+        return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+
+def _payloads(count: int):
+    rng = random.Random(1)
+    companies = [f"Company  {i}" for i in range(2000)]
+    locations = ['Bangalore', 'Hyderabad', 'Pune', 'Remote', 'India']
+    now = datetime.now()
+    return [
+        dict(title=f"Senior  Engineer {i % 500}", company=rng.choice(companies), location=rng.choice(locations),
+             description="x" * 200, apply_link=f"https://example.com/jobs/{i}", posted_at=now,
+             source="jooble", external_id=str(i))
+        for i in range(count)
+    ]
+
+def _measure(cls, payloads):
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    jobs = [cls(**payload) for payload in payloads]
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # Only count allocations of the records themselves, not the shared payload strings
+    size = sum(stat.size_diff for stat in snapshot.compare_to(baseline, 'filename') if stat.size_diff > 0)
+
+    started = time.perf_counter()
+    for job in jobs:
+        job.get_content_hash()
+    first_pass = time.perf_counter() - started
+
+    # Engines hash each job more than once (dedup lookup, logging, near-dup)
+    started = time.perf_counter()
+    for job in jobs:
+        job.get_content_hash()
+    second_pass = time.perf_counter() - started
+
+    assert len({job.get_content_hash() for job in jobs}) == len(jobs)
+    return size, first_pass, second_pass, jobs[0].get_content_hash()
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payloads = _payloads(count)
+
+    print(f"{'class':<12}{'bytes/job':>12}{'hash 1st ms':>14}{'hash 2nd ms':>14}")
+    hashes = []
+    for cls in (LegacyJob, UnifiedJob):
+        size, first_pass, second_pass, sample_hash = _measure(cls, payloads)
+        hashes.append(sample_hash)
+        print(f"{cls.__name__:<12}{size / count:>12.0f}{first_pass * 1000:>14.1f}{second_pass * 1000:>14.1f}")
+
+    # Same inputs must keep producing the hashes already stored in job_hashes
+    assert hashes[0] == hashes[1], "content hash changed"
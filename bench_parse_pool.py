@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import random
+import asyncio
+from datetime import datetime, timezone
+from parse_pool import ParseStage, shutdown_pool
+from telegram_engine import parse_message
+
+LINES = ['We are hiring!', 'Location: Bangalore / Remote', 'Experience: 2-5 years', 'Skills: Python, Django, AWS',
+         'CTC: 12-18 LPA', 'Apply here: https://example.com/apply/{n}', 'Share with your friends',
+         'Responsibilities include building APIs, reviewing code and mentoring juniors.']
+
+def _payloads(count: int):
+    rng = random.Random(3)
+    now = datetime.now(timezone.utc)
+    payloads = []
+    for n in range(count):
+        body = '\n'.join(rng.choice(LINES).format(n=n) for _ in range(rng.randint(8, 30)))
+        payloads.append((f"Python Developer #{n}\n{body}", now, n, 'jobs_group'))
+    return payloads
+
+async def _run(stage: ParseStage, payloads):
+    started = time.perf_counter()
+    jobs = await stage.run(parse_message, payloads)
+    return time.perf_counter() - started, len(jobs)
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payloads = _payloads(count)
+    cpus = os.cpu_count() or 1
+
+    stage = ParseStage()
+    stage.threshold = count + 1  # Force inline
+    inline_seconds, parsed = asyncio.run(_run(stage, payloads))
+    print(f"{count} Telegram payloads, {cpus} CPUs")
+    print(f"{'mode':<18}{'seconds':>10}{'jobs/s':>12}{'speedup':>10}")
+    print(f"{'inline':<18}{inline_seconds:>10.2f}{parsed / inline_seconds:>12.0f}{1:>10.2f}")
+
+    # Worker counts 2, 4, 8 ... up to the core count (always at least 2)
+    worker_counts = [2]
+    while worker_counts[-1] * 2 <= cpus:
+        worker_counts.append(worker_counts[-1] * 2)
+
+    for kind in ('thread', 'process'):
+        for workers in worker_counts:
+            stage = ParseStage()
+            stage.kind, stage.workers, stage.threshold = kind, workers, 0
+            seconds, parsed = asyncio.run(_run(stage, payloads))
+            shutdown_pool()
+            label = f"{kind} x{workers}"
+            print(f"{label:<18}{seconds:>10.2f}{parsed / seconds:>12.0f}{inline_seconds / seconds:>10.2f}")
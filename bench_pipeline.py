@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import tempfile
+from datetime import datetime
+from mock_sources import MockConfig, MockSources, FakeTelegramClient
+from bench_common import percentile, git_revision
+
+ENGINES = ['jooble', 'remotive', 'adzuna', 'wellfound', 'telegram']
+
+def _configure_env(db_path: str, sources: MockSources, args):
+    os.environ.update(sources.env())
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{db_path}",
+        'QUERY_DELAY_SECONDS': '0',
+        'JOOBLE_API_KEY': 'bench',
+        'ADZUNA_APP_ID': 'bench',
+        'ADZUNA_APP_KEY': 'bench',
+        'TELEGRAM_API_ID': '1',
+        'TELEGRAM_API_HASH': 'bench',
+        'TELEGRAM_SESSION_STRING': '',
+        'TELEGRAM_GROUPS': ','.join(f"bench_group_{i}" for i in range(args.telegram_groups)),
+        'TELEGRAM_REQUESTS_PER_SECOND': '1000',
+        'TELEGRAM_REQUEST_BURST': '1000',
+    })
+
+def _seed_queries(db, engines, count: int):
+    from database import SearchQuery, PlatformEnum
+    session = db.get_session()
+    try:
+        for engine in engines:
+            if engine == 'telegram':
+                continue
+            for i in range(count):
+                session.add(SearchQuery(platform=PlatformEnum(engine), value=f"bench query {i}", location=""))
+        session.commit()
+    finally:
+        session.close()
+
+def _stage_percentiles(engine: str) -> dict:
+    import metrics
+    stages = {}
+    for (engine_label, stage), samples in metrics.STAGE_SECONDS.samples.items():
+        if engine_label == engine and samples:
+            stages[stage] = samples
+    http = [value for (engine_label, _, _), samples in metrics.HTTP_SECONDS.samples.items()
+            if engine_label == engine for value in samples]
+    if http:
+        stages['http'] = http
+    return {
+        stage: {'count': len(samples), 'p50_ms': round(percentile(samples, 50) * 1000, 3),
+                'p99_ms': round(percentile(samples, 99) * 1000, 3)}
+        for stage, samples in stages.items()
+    }
+
+async def run_benchmark(args) -> dict:
+    config = MockConfig(page_size=args.page_size, latency_ms=args.latency_ms, payload_bytes=args.payload_bytes,
+                        duplicate_ratio=args.dup_ratio, chatter_ratio=args.chatter_ratio, seed=args.seed)
+    sources = MockSources(config)
+    await sources.start()
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_pipeline.db')
+    _configure_env(db_path, sources, args)
+
+    # Engines read their settings at construction, so import after the environment is in place
+    import metrics
+    import telegram_engine
+    from database import DatabaseManager
+    from jooble_engine import run_jooble_engine
+    from remotive_engine import run_remotive_engine
+    from adzuna_engine import run_adzuna_engine
+    from wellfound_engine import run_wellfound_engine
+    if args.log:
+        # Production logging (queue listener, INFO) into a scratch file, to measure its share of the cycle
+        from log_config import setup_logging
+        os.environ['LOG_FILE'] = os.path.join(os.path.dirname(db_path), 'app.log')
+        setup_logging(console=None)
+    else:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    FakeTelegramClient.reset(config)
+    telegram_engine.TelegramClient = FakeTelegramClient
+    runners = {
+        'jooble': run_jooble_engine,
+        'remotive': run_remotive_engine,
+        'adzuna': run_adzuna_engine,
+        'wellfound': run_wellfound_engine,
+        'telegram': telegram_engine.run_telegram_engine,
+    }
+
+    db = DatabaseManager(os.environ['DATABASE_URL'])
+    db.create_tables()
+    _seed_queries(db, args.engines, args.queries)
+    metrics.REGISTRY.record_samples = True
+
+    wall = {engine: 0.0 for engine in args.engines}
+    try:
+        for _ in range(args.cycles):
+            for i in range(args.telegram_groups):
+                FakeTelegramClient.post(f"bench_group_{i}", args.telegram_messages)
+            for engine in args.engines:
+                started = time.perf_counter()
+                await runners[engine]()
+                wall[engine] += time.perf_counter() - started
+    finally:
+        await sources.stop()
+
+    results = {}
+    for engine in args.engines:
+        counts = {outcome: int(value) for (engine_label, outcome), value in metrics.JOBS.values.items()
+                  if engine_label == engine}
+        results[engine] = {
+            'wall_s': round(wall[engine], 3),
+            'jobs': counts,
+            'fetched_per_sec': round(counts.get('fetched', 0) / wall[engine], 1) if wall[engine] else None,
+            'inserted_per_sec': round(counts.get('inserted', 0) / wall[engine], 1) if wall[engine] else None,
+            'stages': _stage_percentiles(engine),
+        }
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'run_at': datetime.utcnow().isoformat(),
+        'revision': git_revision(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'engines': results,
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is KiB on Linux
+        'peak_rss_children_mb': round(children.ru_maxrss / 1024, 1),
+    }
+
+def _print_report(report: dict):
+    print(f"{'engine':<11}{'wall s':>8}{'fetched':>9}{'inserted':>10}{'dups':>6}{'fetched/s':>11}{'inserted/s':>12}")
+    for engine, result in report['engines'].items():
+        jobs = result['jobs']
+        print(f"{engine:<11}{result['wall_s']:>8.2f}{jobs.get('fetched', 0):>9}{jobs.get('inserted', 0):>10}"
+              f"{jobs.get('duplicate', 0):>6}{result['fetched_per_sec'] or 0:>11.1f}{result['inserted_per_sec'] or 0:>12.1f}")
+    print()
+    print(f"{'engine':<11}{'stage':<14}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}")
+    for engine, result in report['engines'].items():
+        for stage, stats in sorted(result['stages'].items()):
+            print(f"{engine:<11}{stage:<14}{stats['count']:>7}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+    print()
+    print(f"peak RSS: {report['peak_rss_mb']} MB (child processes: {report['peak_rss_children_mb']} MB)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark against local mock sources")
+    parser.add_argument('--engines', default=','.join(ENGINES), type=lambda value: value.split(','))
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--queries', type=int, default=5, help="Search queries per HTTP engine")
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--payload-bytes', type=int, default=2000)
+    parser.add_argument('--dup-ratio', type=float, default=0.2)
+    parser.add_argument('--chatter-ratio', type=float, default=0.3)
+    parser.add_argument('--telegram-groups', type=int, default=5)
+    parser.add_argument('--telegram-messages', type=int, default=200, help="New messages per group per cycle")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--log', action='store_true', help="Run with INFO logging through log_config")
+    parser.add_argument('--output', help="Append the JSON report to this file for comparison across runs")
+    args = parser.parse_args()
+
+    unknown = set(args.engines) - set(ENGINES)
+    if unknown:
+        sys.exit(f"Unknown engines: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run_benchmark(args))
+    _print_report(report)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + '\n')
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import tempfile
+import statistics
+import aiohttp
+from aiohttp import web
+from sqlalchemy import insert
+from database import DatabaseManager, Job, JobHash
+from read_api import JobReadService, create_read_engine
+from bench_common import synthetic_rows, percentile
+
+SOURCES = ['jooble', 'remotive', 'adzuna', 'telegram', 'wellfound']
+
+async def _client(session: aiohttp.ClientSession, base_url: str, requests: int, timings: list, statuses: dict, rng):
+    """Mix of first pages (hot, cacheable), deep pages via cursor, and ETag revalidation"""
+    etags = {}
+    for _ in range(requests):
+        url = f"{base_url}/jobs?source={rng.choice(SOURCES)}&limit=50"
+        headers = {'If-None-Match': etags[url]} if url in etags and rng.random() < 0.5 else {}
+
+        started = time.perf_counter()
+        async with session.get(url, headers=headers) as response:
+            body = await response.json() if response.status == 200 else None
+            etags[url] = response.headers.get('ETag')
+        timings.append((time.perf_counter() - started) * 1000)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+
+        # Follow the cursor a few pages deep
+        cursor = body and body.get('next_cursor')
+        for _ in range(rng.randint(0, 5)):
+            if not cursor:
+                break
+            started = time.perf_counter()
+            async with session.get(f"{url}&cursor={cursor}") as response:
+                body = await response.json()
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            cursor = body.get('next_cursor')
+
+async def run_load_test(rows: int, clients: int, requests_per_client: int):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_read_api.db')
+    db_url = f"sqlite:///{db_path}"
+    db = DatabaseManager(db_url)
+    db.create_tables()
+
+    rng = random.Random(7)
+    for start in range(1, rows + 1, 20000):
+        hashes, jobs = synthetic_rows(start, min(20000, rows - start + 1), rng)
+        with db.engine.begin() as conn:
+            conn.execute(insert(JobHash.__table__), hashes)
+            conn.execute(insert(Job.__table__), jobs)
+
+    service = JobReadService(create_read_engine(db_url), cache_ttl=5)
+    runner = web.AppRunner(service.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    timings, statuses = [], {}
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*[
+            _client(session, base_url, requests_per_client, timings, statuses, random.Random(i))
+            for i in range(clients)
+        ])
+    elapsed = time.perf_counter() - started
+    await runner.cleanup()
+
+    print(f"Corpus: {rows} jobs, {clients} clients x {requests_per_client} listing walks")
+    print(f"Requests: {len(timings)} in {elapsed:.1f}s ({len(timings) / elapsed:.0f} req/s)")
+    print(f"Latency ms: p50 {statistics.median(timings):.2f}, p99 {percentile(timings, 99):.2f}")
+    print(f"Statuses: {statuses}, cache hits {service.cache.hits}, misses {service.cache.misses}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run_load_test(
+        rows=int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        clients=int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        requests_per_client=int(sys.argv[3]) if len(sys.argv) > 3 else 40,
+    ))
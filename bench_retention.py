@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, func
+from database import DatabaseManager, Job, JobHash, JobArchive, ArchivedHash, PlatformEnum
+from retention import RetentionManager, ARCHIVE_COLUMNS
+
+def _seed(db: DatabaseManager, jobs: int, jobs_per_hash: int):
+    """Old jobs where every hash is shared by a run of consecutive jobs, so runs straddle archive batches"""
+    created_at = datetime.utcnow() - timedelta(days=30)
+    hashes = (jobs + jobs_per_hash - 1) // jobs_per_hash
+    with db.engine.begin() as conn:
+        conn.execute(insert(JobHash), [{'id': i + 1, 'content_hash': f"{i:064x}"} for i in range(hashes)])
+        conn.execute(insert(Job), [{
+            'hash_id': i // jobs_per_hash + 1,
+            'source': PlatformEnum.JOOBLE,
+            'title': f"Backend Engineer {i}",
+            'company': "Acme",
+            'location': "Remote",
+            'description_html': "<p>Python, SQL</p>",
+            'created_at': created_at,
+        } for i in range(jobs)])
+    return hashes
+
+def _restore(db: DatabaseManager, limit: int) -> int:
+    """Move the newest archived rows back into jobs, the way an operator undoes an archival"""
+    columns = [getattr(JobArchive, name) for name in ARCHIVE_COLUMNS]
+    with db.engine.begin() as conn:
+        ids = conn.execute(select(JobArchive.id).order_by(JobArchive.id.desc()).limit(limit)).scalars().all()
+        conn.execute(insert(Job.__table__).from_select(ARCHIVE_COLUMNS, select(*columns).where(JobArchive.id.in_(ids))))
+        conn.execute(delete(JobArchive).where(JobArchive.id.in_(ids)))
+    return len(ids)
+
+def _counts(db: DatabaseManager) -> tuple:
+    with db.engine.connect() as conn:
+        return tuple(conn.execute(select(func.count()).select_from(model)).scalar()
+                     for model in (Job, JobArchive, ArchivedHash))
+
+async def run_bench(args) -> bool:
+    directory = tempfile.mkdtemp()
+    os.environ.update({
+        'RETENTION_DAYS': '1',
+        'RETENTION_MODE': 'table',
+        'RETENTION_BATCH_SIZE': str(args.batch_size),
+        'RETENTION_THROTTLE_MS': '0',
+    })
+    db = DatabaseManager(f"sqlite:///{os.path.join(directory, 'retention.db')}")
+    db.create_tables()
+    hashes = _seed(db, args.jobs, args.jobs_per_hash)
+    manager = RetentionManager(db)
+
+    started = time.perf_counter()
+    archived = await manager.archive_jobs()
+    print(f"first pass:  archived {archived} jobs in {time.perf_counter() - started:.2f}s")
+
+    # Restored jobs keep their hash, which is already recorded in archived_hashes
+    restored = _restore(db, args.restore)
+    started = time.perf_counter()
+    rearchived = await manager.archive_jobs()
+    print(f"second pass: restored {restored}, re-archived {rearchived} in {time.perf_counter() - started:.2f}s")
+
+    remaining, archive_rows, archived_hashes = _counts(db)
+    print(f"jobs left: {remaining}, archive rows: {archive_rows}, archived hashes: {archived_hashes} (expected {hashes})")
+    return (archived == args.jobs and rearchived == restored and remaining == 0
+            and archive_rows == args.jobs and archived_hashes == hashes)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive jobs that share hashes across batches, restore some "
+                                                 "and archive them again")
+    parser.add_argument('--jobs', type=int, default=20000)
+    parser.add_argument('--jobs-per-hash', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--restore', type=int, default=2500, help="Archived jobs moved back before the second pass")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    sys.exit(0 if asyncio.run(run_bench(args)) else 1)
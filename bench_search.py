@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import random
+import logging
+import tempfile
+import statistics
+from sqlalchemy import insert, text
+from database import DatabaseManager, Job, JobHash
+from search import SearchIndex
+from bench_common import synthetic_rows, percentile
+
+logger = logging.getLogger("SearchBenchmark")
+
+QUERIES = ['python developer', 'kubernetes', 'data scientist pytorch', 'senior backend golang',
+           'remote devops terraform', 'company 42', 'fintech react typescript']
+
+def run_benchmark(rows: int, repeats: int = 20):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+    db = DatabaseManager(f"sqlite:///{db_path}")
+    db.create_tables()
+    index = SearchIndex(db)
+    rng = random.Random(42)
+
+    # Load the corpus with bulk Core inserts, then index it in one pass
+    started = time.perf_counter()
+    chunk = 20000
+    for start in range(1, rows + 1, chunk):
+        hashes, jobs = synthetic_rows(start, min(chunk, rows - start + 1), rng)
+        with db.engine.begin() as conn:
+            conn.execute(insert(JobHash.__table__), hashes)
+            conn.execute(insert(Job.__table__), jobs)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.rebuild()
+    index_seconds = time.perf_counter() - started
+
+    print(f"Corpus: {rows} jobs loaded in {load_seconds:.1f}s, indexed in {index_seconds:.1f}s ({db_path})")
+    print(f"{'query':<28}{'hits':>6}{'p50 ms':>10}{'p99 ms':>10}{'LIKE ms':>10}")
+
+    for query in QUERIES:
+        timings = []
+        hits = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            hits = index.search(query, limit=20)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Baseline: what consumers do today
+        started = time.perf_counter()
+        with db.engine.connect() as conn:
+            conn.execute(
+                text("SELECT id FROM jobs WHERE title LIKE :q OR description_html LIKE :q "
+                     "ORDER BY posted_at_source DESC LIMIT 20"),
+                {'q': f"%{query.split()[-1]}%"}
+            ).all()
+        like_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{query:<28}{len(hits):>6}{statistics.median(timings):>10.2f}"
+              f"{percentile(timings, 99):>10.2f}{like_ms:>10.2f}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
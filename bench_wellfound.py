@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import tempfile
+from datetime import datetime
+from mock_sources import MockConfig, MockSources
+
+FIXTURE_DIR = 'fixtures/wellfound'
+
+def _check_pages(fixture_dir: str) -> int:
+    """Parse each saved page directly and compare with expected.json; returns the number of mismatches"""
+    from wellfound_engine import parse_listing_page
+    with open(os.path.join(fixture_dir, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    failures = 0
+    for name, want in expected.items():
+        with open(os.path.join(fixture_dir, name), encoding='utf-8') as f:
+            jobs = {job.external_id: job for job in parse_listing_page(f.read())}
+        problems = []
+        if sorted(jobs) != sorted(want['external_ids']):
+            problems.append(f"ids {sorted(jobs)} != {sorted(want['external_ids'])}")
+        sample = jobs.get(want['sample']['external_id'])
+        for field, value in want['sample'].items():
+            if sample is None or getattr(sample, field) != value:
+                problems.append(f"{field}: {getattr(sample, field, None)!r} != {value!r}")
+        failures += bool(problems)
+        print(f"{name:<14}{len(jobs):>5} jobs  {'ok' if not problems else 'FAIL: ' + '; '.join(problems)}")
+    return failures
+
+async def _fetch_served(fixture_dir: str) -> int:
+    """Run the engine's real fetch path (curl_cffi, concurrent pages) against the pages served locally"""
+    sources = MockSources(MockConfig(latency_ms=20), wellfound_fixtures=fixture_dir)
+    await sources.start()
+    os.environ.update(sources.env())
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_wellfound.db')}"
+    try:
+        from wellfound_engine import WellfoundEngine
+        engine = WellfoundEngine()
+        engine.max_pages = len([name for name in os.listdir(fixture_dir) if name.endswith('.html')]) + 1
+        await engine.connect()
+        try:
+            jobs = await engine.fetch_jobs('software engineer', 'India', datetime.min)
+        finally:
+            await engine.close()
+    finally:
+        await sources.stop()
+    print(f"served fetch: {len(jobs)} jobs from {sources.requests.get('wellfound', 0)} requests")
+    return len(jobs)
+
+async def _parse_rate(fixture_dir: str, repeat: int):
+    """Listing pages per second through ParseStage.run_documents, inline and pooled"""
+    from parse_pool import ParseStage, shutdown_pool
+    from wellfound_engine import parse_listing_page
+    pages = []
+    for name in sorted(os.listdir(fixture_dir)):
+        if name.endswith('.html'):
+            with open(os.path.join(fixture_dir, name), encoding='utf-8') as f:
+                pages.append(f.read())
+    pages = pages * repeat
+    print(f"{'mode':<14}{'pages/s':>10}{'jobs':>8}")
+    for offload in (False, True):
+        stage = ParseStage('wellfound')
+        stage.workers = max(stage.workers, 2) if offload else 1
+        stage.document_bytes = 0
+        label = f"{stage.kind} x{stage.workers}" if offload else 'inline'
+        started = time.perf_counter()
+        jobs = await stage.run_documents(parse_listing_page, pages)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<14}{len(pages) / elapsed:>10.0f}{len(jobs):>8}")
+    shutdown_pool()
+
+if __name__ == "__main__":
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.basicConfig(level=logging.WARNING)
+
+    failures = _check_pages(fixture_dir)
+    with open(os.path.join(fixture_dir, 'expected.json'), encoding='utf-8') as f:
+        expected_jobs = sum(page['jobs'] for page in json.load(f).values())
+    served = asyncio.run(_fetch_served(fixture_dir))
+    if served != expected_jobs:
+        print(f"served fetch: expected {expected_jobs} jobs")
+        failures += 1
+    asyncio.run(_parse_rate(fixture_dir, repeat))
+    sys.exit(1 if failures else 0)
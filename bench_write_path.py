@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func, insert, select, text
+from load_generator import LoadProfile, SyntheticJobs, parse_source_mix
+from bench_common import git_revision
+
+logger = logging.getLogger("WritePathBenchmark")
+
+SOURCES = ['telegram', 'jooble', 'remotive', 'adzuna', 'wellfound']
+
+def _configure_env(database_url: str):
+    os.environ['DATABASE_URL'] = database_url
+    # Engines are only constructed for their save path; none of them connects
+    os.environ.setdefault('TELEGRAM_API_ID', '1')
+    os.environ.setdefault('TELEGRAM_API_HASH', 'bench')
+    os.environ.setdefault('TELEGRAM_SESSION_STRING', '')
+
+def _engines():
+    from telegram_engine import TelegramEngine
+    from jooble_engine import JoobleEngine
+    from remotive_engine import RemotiveEngine
+    from adzuna_engine import AdzunaEngine
+    from wellfound_engine import WellfoundEngine
+    return {
+        'telegram': TelegramEngine(),
+        'jooble': JoobleEngine(),
+        'remotive': RemotiveEngine(),
+        'adzuna': AdzunaEngine(),
+        'wellfound': WellfoundEngine(),
+    }
+
+class TableFiller:
+    """Grows the jobs tables with bulk Core inserts, mirroring what the engines write per row"""
+    def __init__(self, db, generator: SyntheticJobs, chunk_size: int, real_signature_tail: int):
+        import near_duplicates
+        import search
+        self.db = db
+        self.generator = generator
+        self.chunk_size = chunk_size
+        self.real_signature_tail = real_signature_tail
+        self.near_duplicates = near_duplicates
+        self.search = search
+        self.index_search = str(db.engine.url) in search._enabled_urls
+        self.near_dup_enabled = near_duplicates.NearDuplicateDetector().enabled
+        self.rng = random.Random(generator.profile.seed)
+
+    @staticmethod
+    def _tables():
+        from database import Base
+        return Base.metadata.tables
+
+    def _signature(self, job, description_text: str, real: bool):
+        if real:
+            return self.near_duplicates.minhash(self.near_duplicates.features(
+                job.title, job.company, job.description, description_text))
+        # Random signatures give the band index its real size without paying for MinHash on every row
+        return [self.rng.getrandbits(61) for _ in range(self.near_duplicates.NUM_PERM)]
+
+    def fill(self, rows: int) -> float:
+        """Insert `rows` unique jobs; returns rows/sec. The newest rows carry real signatures so
+        re-posts generated afterwards are detected exactly as in production."""
+        from database import PlatformEnum
+        tables = self._tables()
+        started = time.perf_counter()
+        # Ids are assigned here so the band and index rows can reference them; engines insert between fills
+        with self.db.engine.connect() as conn:
+            next_id = (conn.execute(select(func.max(tables['jobs'].c.id))).scalar() or 0) + 1
+            next_hash_id = (conn.execute(select(func.max(tables['job_hashes'].c.id))).scalar() or 0) + 1
+        remaining = rows
+        for jobs in self.generator.stream(rows, self.chunk_size, allow_duplicates=False):
+            remaining -= len(jobs)
+            hashes, job_rows, signatures, bands, index_rows = [], [], [], [], []
+            for offset, job in enumerate(jobs):
+                row_id, hash_id = next_id, next_hash_id
+                next_id += 1
+                next_hash_id += 1
+                hashes.append({'id': hash_id, 'content_hash': job.get_content_hash()})
+                fields = job.derived_fields()
+                job_rows.append({
+                    'id': row_id, 'hash_id': hash_id, 'source': PlatformEnum(job.source),
+                    'external_id': job.external_id, 'title': job.title, 'company': job.company,
+                    'location': job.location, 'salary_min': job.salary_min, 'salary_max': job.salary_max,
+                    'currency': job.currency, 'apply_link': job.apply_link, 'description_html': job.description,
+                    'raw_data': {'external_id': job.external_id}, 'posted_at_source': job.posted_at,
+                    'created_at': datetime.utcnow(), 'fingerprint': job.get_fingerprint(), **fields,
+                })
+                if self.near_dup_enabled:
+                    signature = self._signature(job, fields['description_text'], remaining + len(jobs) - offset <= self.real_signature_tail)
+                    signatures.append({'job_id': row_id, 'source': PlatformEnum(job.source),
+                                       'minhash': self.near_duplicates._pack(signature)})
+                    bands.extend({'band_key': key, 'job_id': row_id}
+                                 for key in set(self.near_duplicates.band_keys(signature)))
+                if self.index_search:
+                    index_rows.append({'job_id': row_id, 'title': job.title, 'company': job.company,
+                                       'location': job.location,
+                                       'description': fields['description_text']})
+            with self.db.engine.begin() as conn:
+                conn.execute(insert(tables['job_hashes']), hashes)
+                conn.execute(insert(tables['jobs']), job_rows)
+                if signatures:
+                    conn.execute(insert(tables['job_signatures']), signatures)
+                    conn.execute(insert(tables['job_signature_bands']), bands)
+                self.search._insert_rows(conn, index_rows)
+        elapsed = time.perf_counter() - started
+        return rows / elapsed if elapsed else 0.0
+
+def storage_sizes(db) -> dict:
+    """Bytes per table and per index (SQLite dbstat, MySQL information_schema)"""
+    dialect = db.engine.dialect.name
+    with db.engine.connect() as conn:
+        if dialect == 'sqlite':
+            try:
+                rows = conn.execute(text(
+                    "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY SUM(pgsize) DESC"
+                )).all()
+                return {'objects': {name: int(size) for name, size in rows}}
+            except Exception:
+                # Builds without SQLITE_ENABLE_DBSTAT_VTAB: whole-file size only
+                pages = conn.execute(text("PRAGMA page_count")).scalar()
+                page_size = conn.execute(text("PRAGMA page_size")).scalar()
+                return {'total_bytes': pages * page_size}
+        if dialect == 'mysql':
+            tables = conn.execute(text(
+                "SELECT table_name, data_length, index_length FROM information_schema.tables "
+                "WHERE table_schema = DATABASE()"
+            )).all()
+            indexes = conn.execute(text(
+                "SELECT table_name, index_name, stat_value * @@innodb_page_size FROM mysql.innodb_index_stats "
+                "WHERE database_name = DATABASE() AND stat_name = 'size'"
+            )).all()
+            return {
+                'tables': {name: {'data_bytes': int(data), 'index_bytes': int(index)} for name, data, index in tables},
+                'indexes': {f"{table}.{index}": int(size) for table, index, size in indexes},
+            }
+    return {}
+
+def measure_save(engines: dict, generator: SyntheticJobs, batch_size: int, batches: int) -> dict:
+    """Run real save_jobs_to_db batches against the current table size"""
+    import metrics
+    metrics.REGISTRY.begin_cycle()
+    totals = defaultdict(float)
+    started = time.perf_counter()
+    for _ in range(batches):
+        by_source = defaultdict(list)
+        for job in generator.batch(batch_size):
+            by_source[job.source].append(job)
+        for source, jobs in by_source.items():
+            inserted, duplicates = engines[source].save_jobs_to_db(jobs)
+            totals['jobs'] += len(jobs)
+            totals['inserted'] += inserted
+            totals['duplicates'] += duplicates
+    elapsed = time.perf_counter() - started
+    summary = metrics.REGISTRY.cycle_summary()
+
+    # Per-stage averages across engines, weighted by call count
+    stages = defaultdict(lambda: [0, 0.0])
+    for engine_summary in summary['engines'].values():
+        for stage, stats in engine_summary['stages'].items():
+            stages[stage][0] += stats['count']
+            stages[stage][1] += stats['total_s']
+    return {
+        'jobs': int(totals['jobs']),
+        'inserted': int(totals['inserted']),
+        'duplicates': int(totals['duplicates']),
+        'seconds': round(elapsed, 3),
+        'jobs_per_sec': round(totals['jobs'] / elapsed, 1) if elapsed else None,
+        'inserted_per_sec': round(totals['inserted'] / elapsed, 1) if elapsed else None,
+        'stages': {stage: {'count': count, 'total_s': round(total, 4),
+                           'avg_ms': round(total / count * 1000, 4) if count else 0.0}
+                   for stage, (count, total) in stages.items()},
+    }
+
+def run_benchmark(args) -> dict:
+    from database import DatabaseManager
+    db = DatabaseManager(os.environ['DATABASE_URL'])
+    db.create_tables()
+    profile = LoadProfile(duplicate_ratio=args.dup_ratio, near_duplicate_ratio=args.near_dup_ratio,
+                          description_min=args.desc_min, description_max=args.desc_max,
+                          source_mix=args.source_mix, seed=args.seed)
+    generator = SyntheticJobs(profile)
+    filler = TableFiller(db, generator, args.fill_chunk, real_signature_tail=profile.recent)
+    engines = _engines()
+
+    steps = []
+    with db.engine.connect() as conn:
+        current = conn.execute(text("SELECT COUNT(*) FROM jobs")).scalar()
+    for size in args.sizes:
+        fill_rate = None
+        if size > current:
+            fill_rate = filler.fill(size - current)
+        save = measure_save(engines, generator, args.batch_size, args.batches)
+        with db.engine.connect() as conn:
+            current = conn.execute(text("SELECT COUNT(*) FROM jobs")).scalar()
+        step = {
+            'table_rows': size,
+            'rows_after': current,
+            'fill_rows_per_sec': round(fill_rate, 1) if fill_rate else None,
+            'save': save,
+            'storage': storage_sizes(db),
+        }
+        steps.append(step)
+        print(f"{size:>12,}{step['fill_rows_per_sec'] or 0:>12.0f}{save['jobs_per_sec'] or 0:>10.0f}"
+              f"{save['inserted_per_sec'] or 0:>12.0f}{save['duplicates']:>7}"
+              f"{save['stages'].get('dedup_lookup', {}).get('avg_ms', 0):>11.3f}"
+              f"{save['stages'].get('near_dup', {}).get('avg_ms', 0):>10.3f}"
+              f"{save['stages'].get('commit', {}).get('avg_ms', 0):>11.2f}", flush=True)
+
+    return {
+        'run_at': datetime.utcnow().isoformat(),
+        'revision': git_revision(),
+        'dialect': db.engine.dialect.name,
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'database')},
+        'steps': steps,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Insert/dedup throughput and index size as the jobs table grows")
+    parser.add_argument('--database', help="Database URL (defaults to a throwaway SQLite file)")
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        type=lambda value: [int(float(size)) for size in value.split(',')],
+                        help="Table sizes to measure at, e.g. 1e6,1e7,5e7")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Jobs per measured save batch")
+    parser.add_argument('--batches', type=int, default=3, help="Measured batches per size")
+    parser.add_argument('--fill-chunk', type=int, default=5000, help="Rows per bulk fill transaction")
+    parser.add_argument('--dup-ratio', type=float, default=0.2)
+    parser.add_argument('--near-dup-ratio', type=float, default=0.05)
+    parser.add_argument('--desc-min', type=int, default=300, help="Shortest description (characters)")
+    parser.add_argument('--desc-max', type=int, default=3000, help="Longest description (characters)")
+    parser.add_argument('--source-mix', type=parse_source_mix,
+                        default='telegram=0.4,jooble=0.2,adzuna=0.2,remotive=0.1,wellfound=0.1')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Append the JSON report to this file for capacity planning")
+    args = parser.parse_args()
+
+    unknown = set(args.source_mix) - set(SOURCES)
+    if unknown:
+        sys.exit(f"Unknown sources: {', '.join(sorted(unknown))}")
+    database_url = args.database or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_write_path.db')}"
+    _configure_env(database_url)
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{'table rows':>12}{'fill r/s':>12}{'jobs/s':>10}{'insert/s':>12}{'dups':>7}"
+          f"{'lookup ms':>11}{'near ms':>10}{'commit ms':>11}")
+    report = run_benchmark(args)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + '\n')
@@ -0,0 +1,504 @@
+import os
+import re
+import sys
+import gzip
+import json
+import base64
+import asyncio
+import logging
+import functools
+import argparse
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("Cassette")
+
+# Credentials must never end up in a cassette; their values are masked in URLs and params
+_SECRET_ENV_RE = re.compile(r'(?:_KEY|_HASH|_SECRET|_TOKEN|_SESSION_STRING|_APP_ID)$')
+_SECRET_PARAM_RE = re.compile(r'key|token|secret|app_id|password', re.I)
+_MASK = '***'
+
+def _secret_values():
+    return [value for name, value in os.environ.items() if _SECRET_ENV_RE.search(name) and value and len(value) >= 6]
+
+def _redact_url(url: str) -> str:
+    for value in _secret_values():
+        url = url.replace(value, _MASK)
+    return url
+
+def _redact_params(params) -> dict:
+    if not params:
+        return {}
+    return {str(k): _MASK if _SECRET_PARAM_RE.search(str(k)) else str(v) for k, v in dict(params).items()}
+
+def _http_key(method: str, url: str, kwargs: dict):
+    """(exact request key, endpoint key) for matching recorded responses"""
+    url = _redact_url(str(url))
+    params = _redact_params(kwargs.get('params'))
+    body = json.dumps(kwargs.get('json'), sort_keys=True, default=str) if kwargs.get('json') is not None else ''
+    exact = f"{method} {url} {json.dumps(params, sort_keys=True)} {body}"
+    parts = urlsplit(url)
+    return exact, f"{method} {parts.scheme}://{parts.netloc}{parts.path}", params, body
+
+def _telegram_key(peer_id: int, kwargs: dict):
+    return f"{peer_id} {json.dumps(kwargs, sort_keys=True, default=str)}", str(peer_id)
+
+class Cassette:
+    """Append-only gzip JSONL of HTTP exchanges and Telegram calls, replayed by request key"""
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.recorded = 0
+        self.meta: Dict[str, object] = {}
+        self._exact: Dict[str, deque] = {}
+        self._endpoint: Dict[str, deque] = {}
+        if mode == 'replay':
+            self._load()
+        else:
+            self.write_meta('recorded_at', datetime.utcnow().isoformat())
+
+    def write(self, entry: dict):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Every write is its own gzip member, so interrupted runs and later cycles just append
+        with gzip.open(self.path, 'at', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.recorded += 1
+
+    def write_meta(self, name: str, value):
+        self.write({'kind': 'meta', 'key': name, 'value': value})
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry['kind'] == 'meta':
+                    self.meta.setdefault(entry['key'], entry['value'])  # First recording wins
+                    continue
+                entry['_used'] = False
+                self._exact.setdefault(f"{entry['kind']}:{entry['key']}", deque()).append(entry)
+                self._endpoint.setdefault(f"{entry['kind']}:{entry['endpoint']}", deque()).append(entry)
+        logger.info(f"Loaded cassette {self.path}: {sum(len(q) for q in self._exact.values())} entries")
+
+    @staticmethod
+    def _next_unused(queue: Optional[deque]):
+        while queue:
+            entry = queue.popleft()
+            if not entry['_used']:
+                entry['_used'] = True
+                return entry
+        return None
+
+    def take(self, kind: str, key: str, endpoint: str) -> Optional[dict]:
+        """Exact request first; otherwise the next unplayed response from the same endpoint"""
+        return (self._next_unused(self._exact.get(f"{kind}:{key}"))
+                or self._next_unused(self._endpoint.get(f"{kind}:{endpoint}")))
+
+_active: Optional[Cassette] = None
+
+def active() -> Optional[Cassette]:
+    """The cassette selected by CASSETTE_MODE (record|replay) and CASSETTE_PATH, if any"""
+    global _active
+    mode = os.getenv('CASSETTE_MODE', '').lower()
+    if mode not in ('record', 'replay'):
+        return None
+    path = os.getenv('CASSETTE_PATH', 'cassettes/cycle.jsonl.gz')
+    if _active is None or _active.mode != mode or _active.path != path:
+        _active = Cassette(path, mode)
+    return _active
+
+def replaying() -> bool:
+    return os.getenv('CASSETTE_MODE', '').lower() == 'replay'
+
+# HTTP
+
+def _record_http(cassette: Cassette, keys: tuple, status: int, body: bytes, started: float):
+    exact, endpoint, params, request_body = keys
+    entry = {
+        'kind': 'http', 'key': exact, 'endpoint': endpoint, 'params': params, 'request_body': request_body,
+        'status': status, 'elapsed': round(asyncio.get_running_loop().time() - started, 4)
+    }
+    try:
+        entry['body'] = body.decode('utf-8')
+    except UnicodeDecodeError:
+        entry['body_b64'] = base64.b64encode(body).decode('ascii')
+    cassette.write(entry)
+
+def _recorded_body(entry: Optional[dict]) -> bytes:
+    if entry is None:
+        return b''
+    return base64.b64decode(entry['body_b64']) if 'body_b64' in entry else entry['body'].encode('utf-8')
+
+class _RecordingResponse:
+    def __init__(self, response, cassette: Cassette, method: str, keys: tuple, started: float):
+        self._response = response
+        self._cassette = cassette
+        self._method = method
+        self._keys = keys
+        self._started = started
+        self.status = response.status
+        self.headers = response.headers
+
+    async def read(self) -> bytes:
+        body = await self._response.read()
+        _record_http(self._cassette, self._keys, self.status, body, self._started)
+        return body
+
+    async def json(self):
+        return json.loads(await self.read())
+
+class _RecordingRequest:
+    def __init__(self, request_cm, cassette: Cassette, method: str, keys: tuple):
+        self._request_cm = request_cm
+        self._cassette = cassette
+        self._method = method
+        self._keys = keys
+
+    async def __aenter__(self):
+        started = asyncio.get_running_loop().time()
+        response = await self._request_cm.__aenter__()
+        return _RecordingResponse(response, self._cassette, self._method, self._keys, started)
+
+    async def __aexit__(self, *exc):
+        return await self._request_cm.__aexit__(*exc)
+
+class _RecordingSession:
+    """Real aiohttp session that writes every response it reads to the cassette"""
+    def __init__(self, cassette: Cassette, **kwargs):
+        import aiohttp
+        self._cassette = cassette
+        self._session = aiohttp.ClientSession(**kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    def request(self, method: str, url, **kwargs):
+        return _RecordingRequest(self._session.request(method, url, **kwargs), self._cassette, method,
+                                 _http_key(method, url, kwargs))
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+class _ReplayResponse:
+    def __init__(self, entry: Optional[dict]):
+        self.status = 599 if entry is None else entry['status']  # 599: not in the cassette, logged like any failure
+        self._body = _recorded_body(entry)
+        self.headers = {}
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def json(self):
+        return json.loads(self._body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class _ReplaySession:
+    """Serves recorded responses with no network and no recorded latency"""
+    def __init__(self, cassette: Cassette, **kwargs):
+        self._cassette = cassette
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def request(self, method: str, url, **kwargs):
+        exact, endpoint, _, _ = _http_key(method, url, kwargs)
+        entry = self._cassette.take('http', exact, endpoint)
+        if entry is None:
+            logger.warning(f"No recorded response for {method} {_redact_url(str(url))}")
+        return _ReplayResponse(entry)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+def client_session(**kwargs):
+    """aiohttp.ClientSession, or its recording/replaying stand-in when a cassette is active"""
+    cassette = active()
+    if cassette is None:
+        import aiohttp
+        return aiohttp.ClientSession(**kwargs)
+    if cassette.mode == 'record':
+        return _RecordingSession(cassette, **kwargs)
+    return _ReplaySession(cassette, **kwargs)
+
+class _RecordingCurlSession:
+    """Real curl_cffi AsyncSession that writes every response to the cassette"""
+    def __init__(self, cassette: Cassette, **kwargs):
+        from curl_cffi.requests import AsyncSession
+        self._cassette = cassette
+        self._session = AsyncSession(**kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._session.close()
+
+    async def get(self, url, **kwargs):
+        started = asyncio.get_running_loop().time()
+        response = await self._session.get(url, **kwargs)
+        _record_http(self._cassette, _http_key('GET', url, kwargs), response.status_code, response.content, started)
+        return response
+
+class _ReplayCurlResponse:
+    def __init__(self, entry: Optional[dict]):
+        self.status_code = 599 if entry is None else entry['status']
+        self.content = _recorded_body(entry)
+        self.headers = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+class _ReplayCurlSession(_ReplaySession):
+    async def get(self, url, **kwargs):
+        exact, endpoint, _, _ = _http_key('GET', url, kwargs)
+        entry = self._cassette.take('http', exact, endpoint)
+        if entry is None:
+            logger.warning(f"No recorded response for GET {_redact_url(str(url))}")
+        return _ReplayCurlResponse(entry)
+
+def curl_session(**kwargs):
+    """curl_cffi AsyncSession (browser-impersonating, for scraped sources), or its cassette stand-in"""
+    cassette = active()
+    if cassette is None:
+        from curl_cffi.requests import AsyncSession
+        return AsyncSession(**kwargs)
+    if cassette.mode == 'record':
+        return _RecordingCurlSession(cassette, **kwargs)
+    return _ReplayCurlSession(cassette, **kwargs)
+
+# Telegram (Telethon is imported on first use, so HTTP-only processes never load it)
+
+def _peer_id(entity) -> int:
+    from telethon import utils as telethon_utils
+    return telethon_utils.get_peer_id(entity)
+
+def _peer_dict(entity) -> dict:
+    from telethon import utils as telethon_utils
+    from telethon.tl.types import InputPeerChannel, InputPeerChat
+    peer = telethon_utils.get_input_peer(entity)
+    title = getattr(entity, 'title', None) or getattr(entity, 'username', None)
+    if isinstance(peer, InputPeerChannel):
+        return {'type': 'channel', 'id': peer.channel_id, 'access_hash': peer.access_hash, 'title': title}
+    if isinstance(peer, InputPeerChat):
+        return {'type': 'chat', 'id': peer.chat_id, 'title': title}
+    return {'type': 'user', 'id': peer.user_id, 'access_hash': peer.access_hash, 'title': title}
+
+@functools.lru_cache(maxsize=None)
+def _replay_peer_types() -> dict:
+    """Telethon input peers that also answer .id like the entities get_entity returns"""
+    from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+
+    class _ReplayChannel(InputPeerChannel):
+        @property
+        def id(self):
+            return self.channel_id
+
+    class _ReplayChat(InputPeerChat):
+        @property
+        def id(self):
+            return self.chat_id
+
+    class _ReplayUser(InputPeerUser):
+        @property
+        def id(self):
+            return self.user_id
+
+    return {'channel': _ReplayChannel, 'chat': _ReplayChat, 'user': _ReplayUser}
+
+def _peer_from_dict(data: dict):
+    peer_types = _replay_peer_types()
+    if data['type'] == 'channel':
+        peer = peer_types['channel'](data['id'], data['access_hash'])
+    elif data['type'] == 'chat':
+        peer = peer_types['chat'](data['id'])
+    else:
+        peer = peer_types['user'](data['id'], data['access_hash'])
+    peer.title = data.get('title')
+    return peer
+
+class _ReplayMessage:
+    __slots__ = ('id', 'date', 'text')
+
+    def __init__(self, data: dict):
+        self.id = data['id']
+        self.date = datetime.fromisoformat(data['date'])
+        self.text = data['text']
+
+class _RecordingTelegramClient:
+    """Wraps a real TelegramClient and records entity lookups and history pages"""
+    def __init__(self, client, cassette: Cassette):
+        self._client = client
+        self._cassette = cassette
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    async def get_entity(self, group_name):
+        entity = await self._client.get_entity(group_name)
+        self._cassette.write({'kind': 'telegram', 'key': f"entity {group_name}", 'endpoint': f"entity {group_name}",
+                              'peer': _peer_dict(entity)})
+        return entity
+
+    async def get_messages(self, entity, **kwargs):
+        messages = await self._client.get_messages(entity, **kwargs)
+        key, endpoint = _telegram_key(_peer_id(entity), kwargs)
+        self._cassette.write({
+            'kind': 'telegram', 'key': key, 'endpoint': endpoint,
+            'messages': [{'id': m.id, 'date': m.date.isoformat(), 'text': m.text} for m in messages]
+        })
+        return messages
+
+class _ReplayTelegramClient:
+    """Offline TelegramClient stand-in fed from the cassette"""
+    def __init__(self, cassette: Cassette):
+        self._cassette = cassette
+        self._connected = False
+
+    async def connect(self):
+        self._connected = True
+
+    async def disconnect(self):
+        self._connected = False
+
+    def is_connected(self):
+        return self._connected
+
+    async def is_user_authorized(self):
+        return True
+
+    async def get_entity(self, group_name):
+        entry = self._cassette.take('telegram', f"entity {group_name}", f"entity {group_name}")
+        if entry is None:
+            raise ValueError(f"No recorded entity for {group_name}")
+        return _peer_from_dict(entry['peer'])
+
+    async def iter_dialogs(self):
+        return
+        yield
+
+    async def get_messages(self, entity, **kwargs):
+        key, endpoint = _telegram_key(_peer_id(entity), kwargs)
+        entry = self._cassette.take('telegram', key, endpoint)
+        return [_ReplayMessage(data) for data in entry['messages']] if entry else []
+
+def telegram_client(factory: Callable):
+    """Build the Telegram client, wrapped for recording or replaced for replay when a cassette is active"""
+    cassette = active()
+    if cassette is None:
+        return factory()
+    if cassette.mode == 'record':
+        return _RecordingTelegramClient(factory(), cassette)
+    return _ReplayTelegramClient(cassette)
+
+def _snapshot_state(cassette: Cassette):
+    """Record the state a cycle starts from: active queries, and the Telegram entity cache and
+    checkpoints (cached peers skip get_entity and checkpoints set min_id, so replay needs both)"""
+    from database import DatabaseManager, SearchQuery, TelegramEntity, TelegramCheckpoint
+    db = DatabaseManager(os.getenv('DATABASE_URL', 'sqlite:///jobs.db'))
+    db.create_tables()
+    session = db.get_session()
+    try:
+        cassette.write_meta('search_queries', [
+            {'platform': q.platform.value, 'value': q.value, 'location': q.location}
+            for q in session.query(SearchQuery).filter(SearchQuery.is_active == True)
+        ])
+        cassette.write_meta('telegram_entities', [
+            {'group_name': e.group_name, 'peer_type': e.peer_type, 'entity_id': e.entity_id,
+             'access_hash': e.access_hash, 'title': e.title}
+            for e in session.query(TelegramEntity)
+        ])
+        cassette.write_meta('telegram_checkpoints', [
+            {'group_name': c.group_name, 'last_message_id': c.last_message_id}
+            for c in session.query(TelegramCheckpoint)
+        ])
+    finally:
+        session.close()
+
+def _prepare_replay(cassette: Cassette):
+    """Seed the recorded starting state into an empty database and pin first-run cut-offs to the recording time"""
+    from database import DatabaseManager, SearchQuery, PlatformEnum, TelegramEntity, TelegramCheckpoint
+    recorded_at = datetime.fromisoformat(cassette.meta.get('recorded_at', datetime.utcnow().isoformat()))
+    lookback_hours = 24 + (datetime.utcnow() - recorded_at) / timedelta(hours=1)
+    os.environ.setdefault('WATERMARK_INITIAL_LOOKBACK_HOURS', str(lookback_hours))
+    os.environ.setdefault('TELEGRAM_INITIAL_LOOKBACK_HOURS', str(lookback_hours))
+
+    db = DatabaseManager(os.environ['DATABASE_URL'])
+    db.create_tables()
+    session = db.get_session()
+    try:
+        if session.query(SearchQuery).count() == 0:
+            for query in cassette.meta.get('search_queries', []):
+                session.add(SearchQuery(platform=PlatformEnum(query['platform']), value=query['value'],
+                                        location=query['location']))
+        if session.query(TelegramEntity).count() == 0:
+            session.add_all(TelegramEntity(**entity) for entity in cassette.meta.get('telegram_entities', []))
+        if session.query(TelegramCheckpoint).count() == 0:
+            session.add_all(TelegramCheckpoint(**checkpoint)
+                            for checkpoint in cassette.meta.get('telegram_checkpoints', []))
+        session.commit()
+    finally:
+        session.close()
+
+async def run_cycle(engines):
+    """One cycle of the selected engines under the active cassette, with a metrics summary"""
+    import metrics
+    from engine_registry import REGISTRY
+    metrics.REGISTRY.begin_cycle()
+    for engine in engines:
+        with metrics.stage(engine, 'cycle'):
+            await REGISTRY.get(engine).run_cycle()
+    return metrics.REGISTRY.cycle_summary()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record one cycle to a cassette, or replay one offline")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('path', help="Cassette file (gzip JSONL)")
+    parser.add_argument('--engines', default='telegram,jooble,remotive,adzuna',
+                        type=lambda value: value.split(','))
+    parser.add_argument('--database', help="Database URL (replay defaults to a throwaway SQLite file)")
+    args = parser.parse_args()
+
+    from log_config import setup_logging
+    setup_logging(console=sys.stderr)  # stdout carries the JSON summary
+
+    os.environ['CASSETTE_MODE'] = args.mode
+    os.environ['CASSETTE_PATH'] = args.path
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    elif args.mode == 'replay':
+        import tempfile
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replay.db')}"
+
+    # Engines import this file as the `cassette` module; share that instance rather than __main__'s
+    import cassette as cassette_module
+    if args.mode == 'record':
+        _snapshot_state(cassette_module.active())
+    else:
+        _prepare_replay(cassette_module.active())
+
+    summary = asyncio.run(run_cycle(args.engines))
+    json.dump(summary, sys.stdout, indent=2)
+    print()
@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Enum
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Enum, Index, BigInteger, LargeBinary, SmallInteger
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from models import derive_fields
 import enum
+import os
 
 Base = declarative_base()
 
@@ -33,6 +35,12 @@ class SearchQuery(Base):
     location = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
     last_run_at = Column(DateTime, nullable=True)
+    last_posted_at = Column(DateTime, nullable=True)  # Incremental watermark: newest posting seen for this query
+
+def _listed_at(context):
+    """COALESCE(posted_at_source, created_at) at insert time, so undated postings still sort by arrival"""
+    params = context.get_current_parameters()
+    return params.get('posted_at_source') or params.get('created_at') or datetime.utcnow()
 
 class Job(Base):
     __tablename__ = 'jobs'
@@ -52,8 +60,151 @@ class Job(Base):
     raw_data = Column(JSON, nullable=True)
     posted_at_source = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Listing order for the read API; 'backfill' fills rows that predate the column when it is added
+    listed_at = Column(DateTime, nullable=True, default=_listed_at,
+                       info={'backfill': 'COALESCE(posted_at_source, created_at)'})
+    # Derived once at ingest (models.derive_fields) so readers never strip HTML or re-normalize
+    description_text = Column(Text, nullable=True)
+    snippet = Column(String(300), nullable=True)
+    title_norm = Column(String(500), nullable=True)
+    company_norm = Column(String(255), nullable=True)
+    location_norm = Column(String(255), nullable=True)
+    # Change tracking for sources with stable ids (see upsert.ChangeTracker)
+    fingerprint = Column(String(16), nullable=True)
+    last_seen_at = Column(DateTime, nullable=True, default=datetime.utcnow)
     
     hash_ref = relationship("JobHash", back_populates="jobs")
+    
+    __table_args__ = (
+        Index('ix_jobs_created_at', 'created_at'),
+        Index('ix_jobs_source_posted_at', 'source', 'posted_at_source', 'id'),
+        Index('ix_jobs_listed_at', 'listed_at', 'id'),
+        Index('ix_jobs_source_listed_at', 'source', 'listed_at', 'id'),
+        Index('ix_jobs_company_title_norm', 'company_norm', 'title_norm'),
+        Index('ix_jobs_location_norm', 'location_norm'),
+        # Not unique: Telegram ids repeat across groups and older rows may hold edited copies
+        Index('ix_jobs_source_external_id', 'source', 'external_id'),
+    )
+
+@event.listens_for(Job, 'before_insert')
+def _fill_derived_fields(mapper, connection, target):
+    """Derive the plain-text/normalized columns for rows built without them"""
+    if target.description_text is None:
+        for name, value in derive_fields(target.title, target.company, target.location,
+                                         target.description_html).items():
+            setattr(target, name, value)
+
+class JobSignature(Base):
+    """MinHash of a job's normalized text for cross-source near-duplicate detection"""
+    __tablename__ = 'job_signatures'
+    
+    job_id = Column(Integer, ForeignKey('jobs.id'), primary_key=True, autoincrement=False)
+    source = Column(Enum(PlatformEnum), nullable=False)
+    minhash = Column(LargeBinary(256), nullable=False)
+    canonical_job_id = Column(Integer, nullable=True, index=True)  # Earliest cross-source match, if any
+    
+    job = relationship("Job")
+
+class JobSignatureBand(Base):
+    """LSH band keys; jobs sharing any key are near-duplicate candidates"""
+    __tablename__ = 'job_signature_bands'
+    
+    band_key = Column(BigInteger, primary_key=True, autoincrement=False)
+    job_id = Column(Integer, ForeignKey('jobs.id'), primary_key=True, autoincrement=False, index=True)
+    
+    job = relationship("Job")
+
+class LinkCheck(Base):
+    """Latest apply-link liveness result per job, written by link_checker"""
+    __tablename__ = 'link_checks'
+    
+    job_id = Column(Integer, primary_key=True, autoincrement=False)  # No FK: retention deletes it with the job
+    status = Column(SmallInteger, nullable=False)  # Final HTTP status, or a link_checker.STATUS_* code below 100
+    alive = Column(Boolean, nullable=True)  # None when the check was inconclusive
+    streak = Column(SmallInteger, nullable=False, default=0)  # Consecutive checks with the same outcome
+    checked_at = Column(DateTime, nullable=False)
+    next_check_at = Column(DateTime, nullable=False, index=True)
+
+class JobArchive(Base):
+    """Jobs moved out of the hot table by the retention job"""
+    __tablename__ = 'jobs_archive'
+    
+    id = Column(Integer, primary_key=True)
+    hash_id = Column(Integer, nullable=False)  # No FK: hashes are pruned independently
+    source = Column(Enum(PlatformEnum), nullable=False)
+    external_id = Column(String(255), nullable=True)
+    title = Column(String(500), nullable=False)
+    company = Column(String(255), nullable=False)
+    location = Column(String(255), nullable=False)
+    salary_min = Column(Integer, nullable=True)
+    salary_max = Column(Integer, nullable=True)
+    currency = Column(String(10), default='INR')
+    apply_link = Column(Text, nullable=True)
+    description_html = Column(Text, nullable=True)
+    raw_data = Column(JSON, nullable=True)
+    posted_at_source = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    listed_at = Column(DateTime, nullable=True)
+    description_text = Column(Text, nullable=True)
+    snippet = Column(String(300), nullable=True)
+    title_norm = Column(String(500), nullable=True)
+    company_norm = Column(String(255), nullable=True)
+    location_norm = Column(String(255), nullable=True)
+    fingerprint = Column(String(16), nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_jobs_archive_archived_at', 'archived_at'),
+    )
+
+class ArchivedHash(Base):
+    """Hashes of archived jobs, kept for a look-back window to block re-inserts"""
+    __tablename__ = 'archived_hashes'
+    
+    hash_id = Column(Integer, primary_key=True, autoincrement=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ExportCheckpoint(Base):
+    """Last exported (created_at, id) per named incremental export"""
+    __tablename__ = 'export_checkpoints'
+    
+    name = Column(String(100), primary_key=True)
+    last_job_id = Column(Integer, nullable=False, default=0)
+    last_created_at = Column(DateTime, nullable=True)  # None: checkpoint predates the created_at keyset
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TelegramEntity(Base):
+    """Cached group name -> input peer resolution, so cycles skip dialog scans"""
+    __tablename__ = 'telegram_entities'
+    
+    group_name = Column(String(255), primary_key=True)
+    peer_type = Column(String(20), nullable=False)  # 'channel', 'chat' or 'user'
+    entity_id = Column(BigInteger, nullable=False)
+    access_hash = Column(BigInteger, nullable=True)
+    title = Column(String(255), nullable=True)
+    resolved_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TelegramCheckpoint(Base):
+    """Highest message id already fetched from each Telegram group"""
+    __tablename__ = 'telegram_checkpoints'
+    
+    group_name = Column(String(255), primary_key=True)
+    last_message_id = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TelegramBackfill(Base):
+    """Resume cursor for a group's historical backfill"""
+    __tablename__ = 'telegram_backfills'
+    
+    group_name = Column(String(255), primary_key=True)
+    head_message_id = Column(BigInteger, nullable=False)  # Newest message when the backfill started
+    offset_id = Column(BigInteger, nullable=False)  # Next page starts below this id
+    stop_date = Column(DateTime, nullable=False)
+    messages_scanned = Column(Integer, default=0)
+    jobs_inserted = Column(Integer, default=0)
+    completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class DatabaseManager:
     def __init__(self, connection_string):
@@ -62,6 +213,28 @@ class DatabaseManager:
         
     def create_tables(self):
         Base.metadata.create_all(bind=self.engine)
+        # create_all skips existing tables, so add columns and indexes introduced later
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    self._add_column(table, column)
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        
+        # Full-text search index, kept in sync with inserts from every engine
+        if os.getenv('SEARCH_INDEX_ENABLED', '1') == '1':
+            from search import SearchIndex
+            SearchIndex(self).create()
+        
+    def _add_column(self, table, column):
+        """Add a column introduced after the table was created (added columns must be nullable)"""
+        column_type = column.type.compile(dialect=self.engine.dialect)
+        with self.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            if 'backfill' in column.info:
+                conn.execute(text(f"UPDATE {table.name} SET {column.name} = {column.info['backfill']}"))
         
     def get_session(self):
         return self.SessionLocal()
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+import logging
+import importlib
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from models import BaseAdapter
+
+logger = logging.getLogger("EngineRegistry")
+
+@dataclass(frozen=True)
+class AdapterSpec:
+    name: str
+    target: str  # "module:Class"; imported only when the engine actually runs
+    required_env: Tuple[str, ...] = ()
+    enabled_by_default: bool = True
+    note: str = ''  # Why it is off by default
+
+class AdapterRegistry:
+    """Engines the scheduler can run, in run order
+
+    Built-in engines are declared here with their env requirements, so deciding what is enabled
+    never imports an engine (and with it Telethon, aiohttp or the database layer). Out-of-tree sources
+    plug in through ENGINE_PLUGINS="module:Class,..."; their BaseAdapter subclass declares `name` and
+    `required_env` itself. ENGINES="telegram,jooble,..." overrides the default selection.
+    """
+    def __init__(self):
+        self.specs: Dict[str, AdapterSpec] = {}
+        self._adapters: Dict[str, BaseAdapter] = {}
+
+    def register(self, spec: AdapterSpec):
+        if spec.name in self.specs:
+            raise ValueError(f"Engine already registered: {spec.name}")
+        self.specs[spec.name] = spec
+
+    def load_plugins(self, value: str = None):
+        value = os.getenv('ENGINE_PLUGINS', '') if value is None else value
+        for target in filter(None, (part.strip() for part in value.split(','))):
+            try:
+                cls = self._import(target)
+                self.register(AdapterSpec(cls.name or cls.__name__.lower(), target, tuple(cls.required_env)))
+            except Exception as e:
+                logger.error(f"Failed to load engine plugin {target}: {e}")
+
+    @staticmethod
+    def missing_env(spec: AdapterSpec) -> List[str]:
+        return [key for key in spec.required_env if not os.getenv(key)]
+
+    def selected(self) -> List[AdapterSpec]:
+        """Specs chosen by ENGINES, or the default-on ones, in registration order"""
+        chosen = self._chosen()
+        if chosen:
+            return [spec for name, spec in self.specs.items() if name in chosen]
+        return [spec for spec in self.specs.values() if spec.enabled_by_default]
+
+    @staticmethod
+    def _chosen() -> List[str]:
+        return [name.strip() for name in os.getenv('ENGINES', '').split(',') if name.strip()]
+
+    def enabled(self) -> List[AdapterSpec]:
+        return [spec for spec in self.selected() if not self.missing_env(spec)]
+
+    def describe(self) -> List[str]:
+        """One status line per registered engine, for the startup log"""
+        chosen = self._chosen()
+        selected = {spec.name for spec in self.selected()}
+        lines = [f"unknown engine in ENGINES: {name}" for name in chosen if name not in self.specs]
+        for spec in self.specs.values():
+            missing = self.missing_env(spec)
+            if spec.name not in selected:
+                reason = 'not in ENGINES' if chosen else spec.note
+                lines.append(f"{spec.name}: disabled{f' ({reason})' if reason else ''}")
+            elif missing:
+                lines.append(f"{spec.name}: disabled (missing {', '.join(missing)})")
+            else:
+                lines.append(f"{spec.name}: enabled")
+        return lines
+
+    @staticmethod
+    def _import(target: str):
+        module_name, _, class_name = target.partition(':')
+        cls = getattr(importlib.import_module(module_name), class_name)
+        if not (isinstance(cls, type) and issubclass(cls, BaseAdapter)):
+            raise TypeError(f"{target} is not a BaseAdapter")
+        return cls
+
+    def get(self, name: str) -> BaseAdapter:
+        """The engine's adapter, importing its module on first use"""
+        adapter = self._adapters.get(name)
+        if adapter is None:
+            spec = self.specs[name]
+            adapter = self._import(spec.target)()
+            adapter.name = spec.name
+            adapter.required_env = spec.required_env
+            self._adapters[name] = adapter
+        return adapter
+
+REGISTRY = AdapterRegistry()
+REGISTRY.register(AdapterSpec('telegram', 'telegram_engine:TelegramAdapter',
+                              ('TELEGRAM_API_ID', 'TELEGRAM_API_HASH', 'TELEGRAM_SESSION_STRING')))
+REGISTRY.register(AdapterSpec('jooble', 'jooble_engine:JoobleAdapter', ('JOOBLE_API_KEY',)))
+REGISTRY.register(AdapterSpec('remotive', 'remotive_engine:RemotiveAdapter'))
+REGISTRY.register(AdapterSpec('wellfound', 'wellfound_engine:WellfoundAdapter'))
+REGISTRY.register(AdapterSpec('adzuna', 'adzuna_engine:AdzunaAdapter', ('ADZUNA_APP_ID', 'ADZUNA_APP_KEY')))
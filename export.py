@@ -0,0 +1,236 @@
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import select, and_, or_
+from database import DatabaseManager, Job, PlatformEnum, ExportCheckpoint
+from log_config import setup_logging
+
+logger = logging.getLogger("Export")
+
+EXPORT_COLUMNS = [
+    'id', 'source', 'external_id', 'title', 'company', 'location', 'salary_min', 'salary_max',
+    'currency', 'apply_link', 'description_html', 'description_text', 'snippet', 'posted_at_source', 'created_at'
+]
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+def _serialize(row) -> dict:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record['source'] = record['source'].value if record['source'] else None
+    for key in ('posted_at_source', 'created_at'):
+        if record[key] is not None:
+            record[key] = record[key].isoformat()
+    return record
+
+class JobExporter:
+    def __init__(self, db: DatabaseManager, batch_size: int = 5000, settle_seconds: float = 600):
+        self.db = db
+        self.batch_size = batch_size
+        # Incremental exports skip rows this young: ids are handed out before commit, so a lower id can
+        # still become visible after a higher one. Must exceed the longest engine save transaction.
+        self.settle = timedelta(seconds=settle_seconds)
+
+    def iter_batches(self, after_id: int = 0, source: Optional[PlatformEnum] = None,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     after_created: Optional[datetime] = None,
+                     settled_before: Optional[datetime] = None) -> Iterator[List[dict]]:
+        """Stream jobs one short read per page so writers are never blocked for long
+
+        Full exports go in id order. Incremental ones (settled_before given) go in (created_at, id)
+        order after the checkpoint and stop at rows created since settled_before.
+        """
+        columns = [getattr(Job, name) for name in EXPORT_COLUMNS]
+        keyset = settled_before is not None
+        last_id, last_created = after_id, after_created
+
+        while True:
+            if last_created is not None:
+                query = select(*columns).where(or_(
+                    Job.created_at > last_created,
+                    and_(Job.created_at == last_created, Job.id > last_id)
+                ))
+            else:
+                query = select(*columns).where(Job.id > last_id)
+            if source is not None:
+                query = query.where(Job.source == source)
+            if since is not None:
+                query = query.where(Job.created_at >= since)
+            if until is not None:
+                query = query.where(Job.created_at < until)
+            if keyset:
+                query = query.where(Job.created_at < settled_before).order_by(Job.created_at, Job.id)
+            else:
+                query = query.order_by(Job.id)
+            query = query.limit(self.batch_size)
+
+            with self.db.engine.connect() as conn:
+                rows = conn.execute(query).all()
+            if not rows:
+                return
+
+            last_id = rows[-1].id
+            if keyset:
+                last_created = rows[-1].created_at
+            yield [_serialize(row) for row in rows]
+
+    def get_checkpoint(self, name: str) -> Tuple[Optional[datetime], int]:
+        """(created_at, id) of the last exported row; (None, 0) for a new export"""
+        session = self.db.get_session()
+        try:
+            checkpoint = session.get(ExportCheckpoint, name)
+            return (checkpoint.last_created_at, checkpoint.last_job_id) if checkpoint else (None, 0)
+        finally:
+            session.close()
+
+    def save_checkpoint(self, name: str, last_created_at: datetime, last_job_id: int):
+        session = self.db.get_session()
+        try:
+            checkpoint = session.get(ExportCheckpoint, name)
+            if checkpoint:
+                checkpoint.last_created_at = last_created_at
+                checkpoint.last_job_id = last_job_id
+            else:
+                session.add(ExportCheckpoint(name=name, last_created_at=last_created_at, last_job_id=last_job_id))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def export(self, output: str, fmt: str = 'jsonl', source: Optional[PlatformEnum] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None,
+               incremental: Optional[str] = None) -> int:
+        """Write matching jobs to a file (or '-' for stdout); returns rows written"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if fmt == 'parquet' and output == '-':
+            raise ValueError("Parquet export needs a file path")
+
+        if incremental:
+            after_created, after_id = self.get_checkpoint(incremental)
+            batches = self.iter_batches(after_id, source, since, until, after_created,
+                                        settled_before=datetime.utcnow() - self.settle)
+        else:
+            after_id = 0
+            batches = self.iter_batches(after_id, source, since, until)
+
+        # Write to a temp file and rename so readers never see a partial export
+        target = output if output == '-' else f"{output}.tmp"
+        writer = {'jsonl': self._write_jsonl, 'csv': self._write_csv, 'parquet': self._write_parquet}[fmt]
+        try:
+            row_count, last = writer(target, batches)
+        except Exception:
+            if output != '-' and os.path.exists(target):
+                os.remove(target)
+            raise
+
+        if output != '-':
+            os.replace(target, output)
+        if incremental and last is not None:
+            self.save_checkpoint(incremental, datetime.fromisoformat(last['created_at']), last['id'])
+
+        logger.info(f"Exported {row_count} jobs to {output} ({fmt}, after id {after_id})")
+        return row_count
+
+    def _open_text(self, target: str):
+        if target == '-':
+            return sys.stdout
+        return open(target, 'w', encoding='utf-8', newline='')
+
+    def _write_jsonl(self, target: str, batches) -> tuple[int, Optional[dict]]:
+        row_count, last = 0, None
+        f = self._open_text(target)
+        try:
+            for batch in batches:
+                f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+                row_count += len(batch)
+                last = batch[-1]
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        return row_count, last
+
+    def _write_csv(self, target: str, batches) -> tuple[int, Optional[dict]]:
+        row_count, last = 0, None
+        f = self._open_text(target)
+        try:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for batch in batches:
+                writer.writerows(batch)
+                row_count += len(batch)
+                last = batch[-1]
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        return row_count, last
+
+    def _write_parquet(self, target: str, batches) -> tuple[int, Optional[dict]]:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        schema = pa.schema([
+            ('id', pa.int64()), ('source', pa.string()), ('external_id', pa.string()),
+            ('title', pa.string()), ('company', pa.string()), ('location', pa.string()),
+            ('salary_min', pa.int64()), ('salary_max', pa.int64()), ('currency', pa.string()),
+            ('apply_link', pa.string()), ('description_html', pa.string()),
+            ('description_text', pa.string()), ('snippet', pa.string()),
+            ('posted_at_source', pa.string()), ('created_at', pa.string()),
+        ])
+
+        row_count, last = 0, None
+        # One row group per page keeps memory flat regardless of table size
+        with pq.ParquetWriter(target, schema, compression='zstd') as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                row_count += len(batch)
+                last = batch[-1]
+        return row_count, last
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream jobs to JSONL, CSV or Parquet")
+    parser.add_argument('output', help="Output file path, or '-' for stdout")
+    parser.add_argument('--format', choices=FORMATS, default='jsonl')
+    parser.add_argument('--source', choices=[p.value for p in PlatformEnum])
+    parser.add_argument('--since', type=_parse_date, help="Only jobs collected at or after this ISO time")
+    parser.add_argument('--until', type=_parse_date, help="Only jobs collected before this ISO time")
+    parser.add_argument('--incremental', metavar='NAME', help="Resume after the last export with this name")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--settle-seconds', type=float,
+                        help="Incremental exports leave rows this recent for the next run (default EXPORT_SETTLE_SECONDS or 600)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    db = DatabaseManager(os.getenv('DATABASE_URL', 'sqlite:///jobs.db'))
+    db.create_tables()
+
+    settle_seconds = args.settle_seconds
+    if settle_seconds is None:
+        settle_seconds = float(os.getenv('EXPORT_SETTLE_SECONDS', 600))
+    exporter = JobExporter(db, batch_size=args.batch_size, settle_seconds=settle_seconds)
+    exporter.export(
+        args.output,
+        fmt=args.format,
+        source=PlatformEnum(args.source) if args.source else None,
+        since=args.since,
+        until=args.until,
+        incremental=args.incremental,
+    )
+
+if __name__ == "__main__":
+    # Logs go to stderr so '-' can stream data on stdout
+    setup_logging(console=sys.stderr)
+    main()
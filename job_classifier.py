@@ -0,0 +1,124 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Read at import so parse workers pick the settings up without extra plumbing
+FILTER_ENABLED = os.getenv('TELEGRAM_JOB_FILTER_ENABLED', '1') != '0'
+MIN_SCORE = float(os.getenv('TELEGRAM_JOB_MIN_SCORE', 3))
+
+# (pattern, weight): every pattern counts once per message, however often it matches
+_SIGNALS = [
+    (re.compile(r"\b(?:we(?:'re| are)? hiring|is hiring|hiring for|now hiring|#hiring|hiring)\b", re.I), 3.0),
+    (re.compile(r'\b(?:job openings?|openings?|vacanc(?:y|ies)|job alert|walk[- ]?in drive|off[- ]?campus drive)\b', re.I), 2.5),
+    (re.compile(r'\b(?:looking for (?:an? )?|seeking (?:an? )?)(?:\w+ ){0,3}(?:engineers?|developers?|analysts?|designers?|managers?|interns?|candidates?)\b', re.I), 2.5),
+    (re.compile(r'\b(?:apply (?:now|here|link|at|via|before)|how to apply|send (?:your )?(?:cv|resume)|share (?:your )?(?:cv|resume))\b', re.I), 2.0),
+    (re.compile(r'\b(?:job description|jd|roles? (?:&|and) responsibilit(?:y|ies)|requirements|qualifications?|eligibility|skills? required)\b', re.I), 1.5),
+    (re.compile(r'\b(?:\d+\s*(?:\+|-|to)\s*\d*\s*(?:years?|yrs?)|experience\s*[:\-–]|freshers?|batch(?:es)?\s*[:\-–]?\s*20\d\d)\b', re.I), 1.5),
+    (re.compile(r'\b(?:ctc|lpa|salary|stipend|compensation|package)\b', re.I), 1.5),
+    (re.compile(r'\b(?:engineer|developer|analyst|architect|designer|scientist|intern(?:ship)?|sde|devops|full[- ]?stack|backend|frontend)\b', re.I), 1.0),
+    (re.compile(r'\b(?:full[- ]?time|part[- ]?time|contract|remote|hybrid|on[- ]?site|work from home|wfh)\b', re.I), 1.0),
+    (re.compile(r'https?://\S*(?:careers?|jobs?|lever\.co|greenhouse\.io|workday|naukri|linkedin\.com/jobs|apply|forms\.gle)\S*', re.I), 2.0),
+    # Chatter and promotions
+    (re.compile(r'^\s*(?:hi|hello|hey|good (?:morning|evening|night)|thanks?|thank you|ok(?:ay)?|welcome)\b', re.I), -3.0),
+    (re.compile(r'\b(?:join (?:our|my|this) (?:channel|group)|subscribe|t\.me/(?:\+|joinchat)|follow us)\b', re.I), -2.5),
+    (re.compile(r'\b(?:course|certification|bootcamp|webinar|masterclass|enroll|discount|\d+% off|coupon|free (?:pdf|notes|ebook))\b', re.I), -2.5),
+    (re.compile(r'\b(?:earn (?:money|daily|upto|up to|₹|rs)|crypto|trading|investment|forex|refer (?:and|&) earn|giveaway)\b', re.I), -3.0),
+    (re.compile(r'\b(?:anyone|does anybody|can someone|any update|please help|pls help)\b', re.I), -2.0),
+]
+
+_LABELLED_COMPANY_RE = re.compile(r'^\s*(?:company(?: name)?|organi[sz]ation|employer|client)\s*[:\-–]\s*(.+?)\s*$', re.I | re.M)
+_HIRING_COMPANY_RE = re.compile(r"^\W*([A-Z][\w&.'\- ]{1,50}?)\s+(?:is\s+)?(?:hiring|are hiring)\b", re.M)
+_AT_COMPANY_RE = re.compile(r"\b(?:at|@)\s+([A-Z][\w&.'\-]*(?: [A-Z][\w&.'\-]*){0,3})")
+_NOT_COMPANIES = frozenset({'we', 'we are', 'hiring', 'now', 'urgent', 'urgently', 'immediate', 'immediately', 'actively'})
+
+_LABELLED_LOCATION_RE = re.compile(r'^\s*(?:job |work )?(?:location|loc|based in|place)\s*[:\-–]\s*(.+?)\s*$', re.I | re.M)
+_CITY_RE = re.compile(
+    r'\b(bangalore|bengaluru|hyderabad|pune|chennai|mumbai|delhi|new delhi|gurgaon|gurugram|noida|kolkata|'
+    r'ahmedabad|kochi|jaipur|indore|chandigarh|coimbatore|trivandrum|remote|work from home|wfh)\b', re.I)
+_CITY_ALIASES = {'bengaluru': 'Bangalore', 'gurugram': 'Gurgaon', 'new delhi': 'Delhi',
+                 'work from home': 'Remote', 'wfh': 'Remote'}
+
+_LPA_RANGE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:-|–|to)\s*(\d+(?:\.\d+)?)\s*(?:lpa|lakhs?|l\b)', re.I)
+_LPA_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:lpa|lakhs? per annum)', re.I)
+_USD_RANGE_RE = re.compile(r'\$\s*(\d+(?:,\d{3})*)(k)?\s*(?:-|–|to)\s*\$?\s*(\d+(?:,\d{3})*)(k)?', re.I)
+_INR_RANGE_RE = re.compile(r'(?:₹|rs\.?|inr)\s*(\d+(?:,\d+)*)\s*(?:-|–|to)\s*(?:₹|rs\.?|inr)?\s*(\d+(?:,\d+)*)', re.I)
+_PERIOD_RE = re.compile(r'\s*(?:per|/|a|p\.?)\s*(month|mo|m\b|hour|hr|h\b|week|day)', re.I)
+_PERIOD_MULTIPLIERS = {'month': 12, 'mo': 12, 'm': 12}
+
+@dataclass(slots=True)
+class JobPostFields:
+    score: float
+    company: Optional[str] = None
+    location: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    currency: Optional[str] = None
+
+def score_message(text: str) -> float:
+    """Weighted keyword score; job posts land well above MIN_SCORE, chatter and ads below zero"""
+    score = sum(weight for pattern, weight in _SIGNALS if pattern.search(text))
+    if len(text) < 40:
+        score -= 2.0  # One-liners are almost never postings
+    return score
+
+def _extract_company(text: str) -> Optional[str]:
+    for pattern in (_LABELLED_COMPANY_RE, _HIRING_COMPANY_RE, _AT_COMPANY_RE):
+        match = pattern.search(text)
+        if match:
+            company = match.group(1).strip(' .,-–|')
+            if company.lower() not in _NOT_COMPANIES and not _CITY_RE.fullmatch(company):
+                return company[:255]
+    return None
+
+def _extract_location(text: str) -> Optional[str]:
+    match = _LABELLED_LOCATION_RE.search(text)
+    if match:
+        return match.group(1).strip(' .,-–|')[:255]
+    match = _CITY_RE.search(text)
+    if match:
+        city = match.group(1).lower()
+        return _CITY_ALIASES.get(city, city.title())
+    return None
+
+def _extract_salary(text: str):
+    """Return (min, max, currency) in whole annual units where the unit is clear"""
+    match = _LPA_RANGE_RE.search(text)
+    if match:
+        return int(float(match.group(1)) * 100_000), int(float(match.group(2)) * 100_000), 'INR'
+    match = _LPA_RE.search(text)
+    if match:
+        value = int(float(match.group(1)) * 100_000)
+        return value, value, 'INR'
+    for pattern, currency in ((_USD_RANGE_RE, 'USD'), (_INR_RANGE_RE, 'INR')):
+        match = pattern.search(text)
+        if not match:
+            continue
+        if currency == 'USD':
+            low = int(match.group(1).replace(',', '')) * (1000 if match.group(2) else 1)
+            high = int(match.group(3).replace(',', '')) * (1000 if match.group(4) or match.group(2) else 1)
+        else:
+            low, high = int(match.group(1).replace(',', '')), int(match.group(2).replace(',', ''))
+        period = _PERIOD_RE.match(text, match.end())
+        if period:
+            multiplier = _PERIOD_MULTIPLIERS.get(period.group(1).lower())
+            if multiplier is None:
+                return None, None, None  # Hourly/daily rates do not map onto an annual range
+            low, high = low * multiplier, high * multiplier
+        return low, high, currency
+    return None, None, None
+
+def classify_message(text: str, min_score: float = None) -> Optional[JobPostFields]:
+    """Score a message and, if it looks like a job post, pull out structured fields in the same call"""
+    score = score_message(text)
+    if FILTER_ENABLED and score < (MIN_SCORE if min_score is None else min_score):
+        return None
+    salary_min, salary_max, currency = _extract_salary(text)
+    return JobPostFields(
+        score=score,
+        company=_extract_company(text),
+        location=_extract_location(text),
+        salary_min=salary_min,
+        salary_max=salary_max,
+        currency=currency
+    )
@@ -0,0 +1,275 @@
+import os
+import time
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import aiohttp
+from dotenv import load_dotenv
+from sqlalchemy import select, insert, bindparam
+from database import DatabaseManager, Job, LinkCheck
+import metrics
+from log_config import setup_logging
+
+logger = logging.getLogger("LinkChecker")
+
+# LinkCheck.status codes for checks that produced no HTTP status
+STATUS_NETWORK_ERROR = 0
+STATUS_DISALLOWED = 1  # robots.txt forbids the path
+STATUS_UNSUPPORTED = 2  # Not an http(s) link
+
+DEAD_STATUSES = {404, 410}
+HEAD_REJECTED = {403, 405, 501}  # Servers that refuse HEAD often answer a ranged GET
+THROTTLED = {429, 503}
+
+@dataclass
+class LinkResult:
+    job_id: int
+    status: int
+    alive: Optional[bool]
+
+class HostGate:
+    """Per-host concurrency cap, request spacing and robots.txt rules"""
+    def __init__(self, per_host: int, delay: float):
+        self.slots = asyncio.Semaphore(per_host)
+        self.delay = delay
+        self.next_at = 0.0
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_lock = asyncio.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Seconds until this request may start, or None if the host is booked further out than max_wait"""
+        now = time.monotonic()
+        start = max(now, self.next_at)
+        if start - now > max_wait:
+            return None
+        self.next_at = start + self.delay
+        return start - now
+
+    def back_off(self, seconds: float):
+        self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+class LinkChecker:
+    def __init__(self, db: DatabaseManager = None):
+        load_dotenv()
+
+        self.concurrency = int(os.getenv('LINK_CHECK_CONCURRENCY', 50))
+        self.per_host = int(os.getenv('LINK_CHECK_PER_HOST', 2))
+        self.host_delay = float(os.getenv('LINK_CHECK_HOST_DELAY_MS', 250)) / 1000
+        self.max_host_delay = float(os.getenv('LINK_CHECK_MAX_HOST_DELAY_SECONDS', 10))  # Cap on Crawl-delay
+        self.max_wait = float(os.getenv('LINK_CHECK_MAX_WAIT_SECONDS', 30))  # Longer queues defer to the next run
+        self.timeout = float(os.getenv('LINK_CHECK_TIMEOUT_SECONDS', 10))
+        self.batch_size = int(os.getenv('LINK_CHECK_BATCH_SIZE', 500))
+        self.interval = timedelta(hours=float(os.getenv('LINK_CHECK_INTERVAL_HOURS', 24)))
+        self.max_interval = timedelta(days=float(os.getenv('LINK_CHECK_MAX_INTERVAL_DAYS', 30)))
+        self.retry_interval = timedelta(minutes=float(os.getenv('LINK_CHECK_RETRY_MINUTES', 30)))
+        self.user_agent = os.getenv('LINK_CHECK_USER_AGENT', 'JobAggregatorLinkChecker/1.0')
+
+        if db is None:
+            db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
+            db = DatabaseManager(db_url)
+            db.create_tables()
+        self.db = db
+        self.gates: Dict[str, HostGate] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    # Scheduling
+
+    def next_check(self, now: datetime, status: int, alive: Optional[bool], streak: int) -> datetime:
+        """Exponential re-check: each repeat of the same outcome doubles the wait, up to the cap"""
+        if status in (STATUS_DISALLOWED, STATUS_UNSUPPORTED):
+            return now + self.max_interval  # Nothing to learn sooner
+        if alive is None:
+            return now + min(self.retry_interval * (2 ** min(streak, 16)), self.interval)
+        return now + min(self.interval * (2 ** min(streak, 16)), self.max_interval)
+
+    def _new_links(self, limit: int, before_id: Optional[int]) -> List[Tuple[int, str]]:
+        """Never-checked jobs, newest first"""
+        query = (
+            select(Job.id, Job.apply_link)
+            .outerjoin(LinkCheck, LinkCheck.job_id == Job.id)
+            .where(LinkCheck.job_id.is_(None), Job.apply_link.isnot(None))
+        )
+        if before_id is not None:
+            query = query.where(Job.id < before_id)
+        with self.db.engine.connect() as conn:
+            return conn.execute(query.order_by(Job.id.desc()).limit(limit)).all()
+
+    def _due_links(self, limit: int, now: datetime, after: Optional[Tuple[datetime, int]]):
+        """Previously checked jobs whose next check is due, most overdue first"""
+        query = (
+            select(Job.id, Job.apply_link, LinkCheck.alive, LinkCheck.streak, LinkCheck.next_check_at)
+            .join(LinkCheck, LinkCheck.job_id == Job.id)
+            .where(LinkCheck.next_check_at <= now)
+        )
+        if after is not None:
+            query = query.where((LinkCheck.next_check_at > after[0]) |
+                                ((LinkCheck.next_check_at == after[0]) & (Job.id > after[1])))
+        with self.db.engine.connect() as conn:
+            return conn.execute(query.order_by(LinkCheck.next_check_at, Job.id).limit(limit)).all()
+
+    async def stream_batches(self, limit: int) -> AsyncIterator[Tuple[List[tuple], Dict[int, tuple]]]:
+        """(links, previous results) batches: due re-checks first, then never-checked jobs"""
+        remaining = limit or float('inf')
+        now = datetime.utcnow()
+        after = None
+        while remaining > 0:
+            rows = self._due_links(int(min(self.batch_size, remaining)), now, after)
+            if not rows:
+                break
+            after = (rows[-1].next_check_at, rows[-1].id)
+            remaining -= len(rows)
+            yield [(row.id, row.apply_link) for row in rows], {row.id: (row.alive, row.streak) for row in rows}
+
+        before_id = None
+        while remaining > 0:
+            rows = self._new_links(int(min(self.batch_size, remaining)), before_id)
+            if not rows:
+                break
+            before_id = rows[-1].id
+            remaining -= len(rows)
+            yield [(row.id, row.apply_link) for row in rows], {}
+
+    # HTTP
+
+    async def _gate(self, scheme: str, host: str) -> HostGate:
+        gate = self.gates.get(host)
+        if gate is None:
+            gate = self.gates[host] = HostGate(self.per_host, self.host_delay)
+        if gate.robots is None:
+            async with gate.robots_lock:
+                if gate.robots is None:
+                    gate.robots = await self._fetch_robots(scheme, host)
+                    crawl_delay = gate.robots.crawl_delay(self.user_agent)
+                    if crawl_delay:
+                        gate.delay = min(max(gate.delay, float(crawl_delay)), self.max_host_delay)
+        return gate
+
+    async def _fetch_robots(self, scheme: str, host: str) -> RobotFileParser:
+        """robots.txt for a host; unreachable or missing files allow everything"""
+        robots = RobotFileParser()
+        try:
+            async with self.session.get(f"{scheme}://{host}/robots.txt") as response:
+                body = await response.text(errors='replace') if response.status == 200 else ''
+        except Exception:
+            body = ''
+        robots.parse(body.splitlines())
+        return robots
+
+    async def _request(self, url: str) -> int:
+        async with self.session.head(url, allow_redirects=True) as response:
+            status = response.status
+        if status in HEAD_REJECTED:
+            async with self.session.get(url, headers={'Range': 'bytes=0-0'}, allow_redirects=True) as response:
+                status = response.status
+        return status
+
+    async def check(self, job_id: int, url: str) -> Optional[LinkResult]:
+        """One link's status, or None when its host is too busy and the check is deferred"""
+        parts = urlsplit(url.strip())
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            return LinkResult(job_id, STATUS_UNSUPPORTED, None)
+
+        gate = await self._gate(parts.scheme, parts.netloc)
+        if not gate.robots.can_fetch(self.user_agent, url):
+            return LinkResult(job_id, STATUS_DISALLOWED, None)
+
+        wait = gate.reserve(self.max_wait)
+        if wait is None:
+            return None
+        if wait:
+            await asyncio.sleep(wait)
+
+        async with gate.slots:
+            started = time.perf_counter()
+            try:
+                status = await self._request(url)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.debug(f"Link check failed for {url}: {e}")
+                status = STATUS_NETWORK_ERROR
+            metrics.record_http('link_checker', '', status, time.perf_counter() - started, 0)
+
+        if status in THROTTLED:
+            gate.back_off(self.max_host_delay)
+        if status in DEAD_STATUSES:
+            return LinkResult(job_id, status, False)
+        if 200 <= status < 400:
+            return LinkResult(job_id, status, True)
+        return LinkResult(job_id, status, None)
+
+    # Storage
+
+    def save_results(self, results: List[LinkResult], previous: Dict[int, tuple]) -> None:
+        """Insert first checks and update re-checks, one statement each per batch"""
+        now = datetime.utcnow()
+        inserts, updates = [], []
+        for result in results:
+            prior = previous.get(result.job_id)
+            streak = prior[1] + 1 if prior and prior[0] == result.alive else 0
+            row = {'status': result.status, 'alive': result.alive, 'streak': streak, 'checked_at': now,
+                   'next_check_at': self.next_check(now, result.status, result.alive, streak)}
+            if prior:
+                updates.append({'check_id': result.job_id, **row})
+            else:
+                inserts.append({'job_id': result.job_id, **row})
+
+        table = LinkCheck.__table__
+        with self.db.engine.begin() as conn:
+            if inserts:
+                conn.execute(insert(table), inserts)
+            if updates:
+                conn.execute(table.update().where(table.c.job_id == bindparam('check_id')), updates)
+
+    async def run(self, limit: int = 0) -> Dict[str, int]:
+        """Check up to `limit` links (0: everything due); returns outcome counts"""
+        counts = {'alive': 0, 'dead': 0, 'unknown': 0, 'deferred': 0}
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': self.user_agent}) as session:
+            self.session = session
+            # The connector caps connections overall and per host; host gates space the requests out
+            async for links, previous in self.stream_batches(limit):
+                checked = await asyncio.gather(*[self.check(job_id, url) for job_id, url in links])
+                results = [result for result in checked if result is not None]
+                counts['deferred'] += len(checked) - len(results)
+                for result in results:
+                    outcome = 'unknown' if result.alive is None else 'alive' if result.alive else 'dead'
+                    counts[outcome] += 1
+                self.save_results(results, previous)
+            self.session = None
+
+        for outcome, count in counts.items():
+            metrics.record_jobs('link_checker', outcome, count)
+        logger.info(f"Link check complete - Alive: {counts['alive']}, Dead: {counts['dead']}, "
+                    f"Unknown: {counts['unknown']}, Deferred: {counts['deferred']}")
+        return counts
+
+async def run_link_checker(limit: int = None) -> Dict[str, int]:
+    """Single entry function for one pass (LINK_CHECK_MAX_PER_RUN caps it when no limit is given)"""
+    try:
+        checker = LinkChecker()
+        return await checker.run(int(os.getenv('LINK_CHECK_MAX_PER_RUN', 5000)) if limit is None else limit)
+    except Exception as e:
+        logger.error(f"Error in link checker: {e}")
+        return {}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check apply links for dead postings")
+    parser.add_argument('--limit', type=int, help="Links per pass (default LINK_CHECK_MAX_PER_RUN, 0 = all due)")
+    parser.add_argument('--loop', type=float, metavar='MINUTES', help="Keep running, one pass every MINUTES")
+    args = parser.parse_args()
+    setup_logging()
+
+    async def main():
+        while True:
+            await run_link_checker(args.limit)
+            if not args.loop:
+                break
+            await asyncio.sleep(args.loop * 60)
+
+    asyncio.run(main())
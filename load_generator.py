@@ -0,0 +1,126 @@
+import random
+import dataclasses
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from models import UnifiedJob
+
+DEFAULT_SOURCE_MIX = {'telegram': 0.4, 'jooble': 0.2, 'adzuna': 0.2, 'remotive': 0.1, 'wellfound': 0.1}
+
+_TITLES = ['Software Engineer', 'Backend Engineer', 'Frontend Developer', 'Python Developer', 'Java Developer',
+           'Data Scientist', 'Data Engineer', 'ML Engineer', 'DevOps Engineer', 'Cloud Architect', 'SRE',
+           'QA Automation Engineer', 'Android Developer', 'iOS Developer', 'Product Manager', 'Full Stack Developer']
+_SENIORITY = ['', '', 'Junior', 'Senior', 'Lead', 'Staff', 'Principal', 'SDE II']
+_LOCATIONS = ['Bangalore', 'Hyderabad', 'Pune', 'Chennai', 'Mumbai', 'Delhi', 'Noida', 'Gurgaon', 'Remote', 'India']
+_SKILLS = ('kubernetes docker aws gcp azure postgres mysql redis kafka spark airflow django flask fastapi react '
+           'angular vue typescript golang rust scala terraform linux microservices graphql grpc pandas numpy '
+           'pytorch tensorflow llm nlp etl agile scrum').split()
+_FILLER = ('we are looking for an experienced engineer to join our growing team you will own services end to end '
+           'work closely with product and design ship features to customers mentor juniors and improve reliability '
+           'requirements include strong fundamentals clear communication and a bias for action benefits include '
+           'health insurance flexible hours learning budget equity and a hybrid work policy').split()
+
+@dataclass
+class LoadProfile:
+    duplicate_ratio: float = 0.2  # Exact re-posts (same content hash) of a recent record
+    near_duplicate_ratio: float = 0.05  # Same posting re-listed on another source with its own link
+    description_min: int = 300  # Characters
+    description_max: int = 3000
+    salary_ratio: float = 0.3  # Share of records with a salary range
+    source_mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_SOURCE_MIX))
+    recent: int = 5000  # How far back re-posts reach
+    seed: int = 1
+
+def parse_source_mix(value: str) -> Dict[str, float]:
+    """'telegram=0.5,jooble=0.5' -> weights"""
+    mix = {}
+    for part in value.split(','):
+        source, _, weight = part.partition('=')
+        mix[source.strip()] = float(weight)
+    return mix
+
+class SyntheticJobs:
+    """Realistic UnifiedJob records with tunable duplicate rates, text lengths and source mix
+
+    Descriptions are stitched from a fixed pool of paragraphs, so generating millions of records is
+    cheap while their lengths and vocabulary still look like real postings.
+    """
+    def __init__(self, profile: LoadProfile = None):
+        self.profile = profile or LoadProfile()
+        self.rng = random.Random(self.profile.seed)
+        self.sources = list(self.profile.source_mix)
+        self.weights = [self.profile.source_mix[source] for source in self.sources]
+        self.paragraphs = [self._paragraph() for _ in range(1000)]
+        self.companies = [f"Company {i}" for i in range(20000)]
+        self.recent: deque = deque(maxlen=self.profile.recent)
+        self.counter = 0
+        self.now = datetime.utcnow()
+
+    def _paragraph(self) -> str:
+        words = [self.rng.choice(_FILLER) for _ in range(self.rng.randint(30, 90))]
+        for _ in range(self.rng.randint(2, 6)):
+            words.insert(self.rng.randrange(len(words)), self.rng.choice(_SKILLS))
+        return ' '.join(words)
+
+    def _description(self) -> str:
+        # Log-uniform lengths: most postings are short, a few are very long
+        low, high = self.profile.description_min, self.profile.description_max
+        target = int(low * (high / low) ** self.rng.random()) if high > low else low
+        parts = []
+        size = 0
+        while size < target:
+            paragraph = self.rng.choice(self.paragraphs)
+            parts.append(f"<p>{paragraph}</p>")
+            size += len(paragraph) + 7
+        parts.append(f"<p>Ref {self.counter}</p>")
+        return ''.join(parts)
+
+    def _fresh(self) -> UnifiedJob:
+        self.counter += 1
+        source = self.rng.choices(self.sources, self.weights)[0]
+        salary_min = salary_max = None
+        if self.rng.random() < self.profile.salary_ratio:
+            salary_min = self.rng.randrange(300000, 4000000, 50000)
+            salary_max = salary_min + self.rng.randrange(100000, 2000000, 50000)
+        return UnifiedJob(
+            title=f"{self.rng.choice(_SENIORITY)} {self.rng.choice(_TITLES)}".strip(),
+            company=self.rng.choice(self.companies),
+            location=self.rng.choice(_LOCATIONS),
+            description=self._description(),
+            apply_link=f"https://jobs.example.com/{source}/{self.counter}",
+            posted_at=self.now - timedelta(minutes=self.rng.randint(0, 90 * 24 * 60)),
+            source=source,
+            external_id=f"{source}-{self.counter}",
+            salary_min=salary_min,
+            salary_max=salary_max,
+        )
+
+    def _repost(self, original: UnifiedJob) -> UnifiedJob:
+        """The same posting found on another source"""
+        self.counter += 1
+        others = [source for source in self.sources if source != original.source] or self.sources
+        source = self.rng.choice(others)
+        return dataclasses.replace(original, source=source, apply_link=f"https://jobs.example.com/{source}/{self.counter}",
+                                   external_id=f"{source}-{self.counter}")
+
+    def job(self, allow_duplicates: bool = True) -> UnifiedJob:
+        roll = self.rng.random()
+        near_from = self.profile.duplicate_ratio if allow_duplicates else 0.0
+        if self.recent and roll < near_from:
+            return dataclasses.replace(self.rng.choice(self.recent))
+        if self.recent and roll < near_from + self.profile.near_duplicate_ratio:
+            job = self._repost(self.rng.choice(self.recent))
+        else:
+            job = self._fresh()
+        self.recent.append(job)
+        return job
+
+    def batch(self, size: int, allow_duplicates: bool = True) -> List[UnifiedJob]:
+        return [self.job(allow_duplicates) for _ in range(size)]
+
+    def stream(self, count: int, chunk_size: int = 5000, allow_duplicates: bool = True) -> Iterator[List[UnifiedJob]]:
+        while count > 0:
+            size = min(chunk_size, count)
+            yield self.batch(size, allow_duplicates)
+            count -= size
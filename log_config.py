@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through `extra=` and goes into JSON output
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+
+class TextFormatter(logging.Formatter):
+    """The classic one-line format, noting how many records sampling dropped since the last one"""
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        sampled_out = getattr(record, 'sampled_out', 0)
+        return f"{line} (+{sampled_out} similar suppressed)" if sampled_out else line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any `extra=` fields and the traceback"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class CallSiteSampler(logging.Filter):
+    """Caps each logging call site at `burst` records per window, then keeps 1 in `every`
+
+    Per-job messages (parse errors, per-query chatter) come from a handful of lines in a loop, so
+    limiting by call site tames floods without touching once-per-cycle messages. The next record
+    let through carries the number suppressed since (`sampled_out`). ERROR and above are never sampled.
+    """
+    def __init__(self, burst: int, window: float, every: int):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.every = max(every, 1)
+        self.lock = threading.Lock()
+        self.sites: Dict[Tuple[str, int], List] = {}  # (path, line) -> [window start, seen, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True  # Failures are rare and each one matters; only chatter is sampled
+        now = time.monotonic()
+        with self.lock:
+            site = self.sites.get((record.pathname, record.lineno))
+            if site is None or now - site[0] >= self.window:
+                suppressed = site[2] if site else 0
+                site = self.sites[(record.pathname, record.lineno)] = [now, 0, suppressed]
+            site[1] += 1
+            if site[1] > self.burst and (site[1] - self.burst) % self.every:
+                site[2] += 1
+                return False
+            if site[2]:
+                record.sampled_out = site[2]
+                site[2] = 0
+        return True
+
+class _LoopSafeQueueHandler(QueueHandler):
+    """QueueHandler that writes directly when running in a forked worker, where no listener drains the queue"""
+    def __init__(self, log_queue, handlers: List[logging.Handler]):
+        super().__init__(log_queue)
+        self.pid = os.getpid()
+        self.direct_handlers = handlers
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: freeze the message but leave formatting (and tracebacks) to the listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        if os.getpid() == self.pid:
+            super().emit(record)
+            return
+        for handler in self.direct_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+def _build_handlers(log_format: str, console) -> List[logging.Handler]:
+    formatter = JsonFormatter() if log_format == 'json' else TextFormatter(TEXT_FORMAT)
+    handlers = []
+
+    log_file = os.getenv('LOG_FILE', 'app.log')
+    if log_file:
+        handlers.append(RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024)),
+            backupCount=int(os.getenv('LOG_BACKUP_COUNT', 5)),
+            encoding='utf-8',
+        ))
+
+    if console is not None and os.getenv('LOG_CONSOLE', '1') == '1':
+        # Windows consoles default to a legacy code page; group titles and posts are full of emoji
+        if hasattr(console, 'reconfigure'):
+            try:
+                console.reconfigure(encoding='utf-8', errors='replace')
+            except (ValueError, OSError):
+                pass
+        handlers.append(logging.StreamHandler(console))
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+def setup_logging(console=sys.stdout, level: str = None):
+    """Configure the root logger once per process: callers enqueue, a listener thread does the I/O
+
+    LOG_LEVEL, LOG_FORMAT (text|json), LOG_FILE (empty disables), LOG_MAX_BYTES, LOG_BACKUP_COUNT,
+    LOG_CONSOLE and LOG_SAMPLE_BURST / LOG_SAMPLE_WINDOW / LOG_SAMPLE_EVERY (burst 0 disables sampling).
+    """
+    global _listener
+    if _listener is not None:
+        return
+    load_dotenv()  # LOG_* may live in .env, and entry points call this before anything else
+    root = logging.getLogger()
+    root.setLevel((level or os.getenv('LOG_LEVEL', 'INFO')).upper())
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handlers = _build_handlers(os.getenv('LOG_FORMAT', 'text').lower(), console)
+    log_queue = queue.SimpleQueue()  # Unbounded: enqueueing never blocks the event loop
+    queue_handler = _LoopSafeQueueHandler(log_queue, handlers)
+
+    burst = int(os.getenv('LOG_SAMPLE_BURST', 50))
+    if burst > 0:
+        queue_handler.addFilter(CallSiteSampler(
+            burst, float(os.getenv('LOG_SAMPLE_WINDOW', 60)), int(os.getenv('LOG_SAMPLE_EVERY', 100))
+        ))
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Drain the queue and close handlers (also registered with atexit)"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
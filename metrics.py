@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import functools
+import logging
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Sequence, Tuple
+
+logger = logging.getLogger("Metrics")
+
+# Seconds; covers sub-millisecond hash lookups up to slow API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, registry: 'Registry', name: str, help_text: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            self.registry._cycle_count(self.name, key, amount)
+
+    def render(self):
+        for key, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = value
+            self.registry._cycle_peak(self.name, key, value)
+
+    def render(self):
+        for key, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Tuple, list] = {}  # key -> [per-bucket counts..., +Inf count, sum]
+        self.samples: Dict[Tuple, list] = {}  # Raw values, only while registry.record_samples is set
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+            self.registry._cycle_observe(self.name, key, value)
+            if self.registry.record_samples:
+                self.samples.setdefault(key, []).append(value)
+
+    def render(self):
+        for key, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-1]:.6f}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+class Registry:
+    """Process-wide metrics plus a per-cycle aggregate that is flushed as one JSON summary"""
+    def __init__(self):
+        self.lock = threading.Lock()  # Save paths run in executor threads
+        self.metrics = []
+        self.record_samples = False  # Benchmarks want exact percentiles, not bucket estimates
+        self.cycle_started = datetime.utcnow()
+        self._cycle: Dict[Tuple[str, Tuple], list] = {}
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, **kwargs))
+
+    # Per-cycle aggregates: [count, total, max]
+    def _cycle_observe(self, name, key, value):
+        entry = self._cycle.setdefault((name, key), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += value
+        entry[2] = max(entry[2], value)
+
+    def _cycle_count(self, name, key, amount):
+        entry = self._cycle.setdefault((name, key), [0, 0.0, 0.0])
+        entry[1] += amount
+
+    def _cycle_peak(self, name, key, value):
+        entry = self._cycle.setdefault((name, key), [0, 0.0, 0.0])
+        entry[2] = max(entry[2], value)
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def begin_cycle(self):
+        with self.lock:
+            self._cycle = {}
+            self.cycle_started = datetime.utcnow()
+
+    def cycle_summary(self) -> dict:
+        """Per-engine stage timings, job outcomes, rows/sec and duplicate ratio for the current cycle"""
+        with self.lock:
+            cycle = dict(self._cycle)
+        engines: Dict[str, dict] = {}
+        queues = {}
+
+        def engine_summary(engine: str) -> dict:
+            return engines.setdefault(engine, {'stages': {}, 'jobs': {}, 'http': {}})
+
+        for (name, key), (count, total, peak) in cycle.items():
+            if name == STAGE_SECONDS.name:
+                engine, stage = key
+                engine_summary(engine)['stages'][stage] = {
+                    'count': count, 'total_s': round(total, 4), 'max_s': round(peak, 4),
+                    'avg_ms': round(total / count * 1000, 3) if count else 0.0
+                }
+            elif name == JOBS.name:
+                engine, outcome = key
+                jobs = engine_summary(engine)['jobs']
+                jobs[outcome] = jobs.get(outcome, 0) + int(total)
+            elif name == HTTP_SECONDS.name:
+                engine, query, status = key
+                http = engine_summary(engine)['http']
+                entry = http.setdefault(query, {'requests': 0, 'total_s': 0.0, 'max_s': 0.0, 'bytes': 0})
+                entry['requests'] += count
+                entry['total_s'] = round(entry['total_s'] + total, 4)
+                entry['max_s'] = round(max(entry['max_s'], peak), 4)
+            elif name == HTTP_BYTES.name:
+                engine, query = key
+                http = engine_summary(engine)['http']
+                http.setdefault(query, {'requests': 0, 'total_s': 0.0, 'max_s': 0.0, 'bytes': 0})['bytes'] += int(total)
+            elif name == QUEUE_DEPTH.name:
+                queues[key[0]] = int(peak)
+
+        for summary in engines.values():
+            inserted = summary['jobs'].get('inserted', 0)
+            duplicates = summary['jobs'].get('duplicate', 0) + summary['jobs'].get('near_duplicate', 0)
+            cycle_seconds = summary['stages'].get('cycle', {}).get('total_s', 0)
+            save_seconds = summary['stages'].get('save', {}).get('total_s', 0)
+            summary['rows_per_sec'] = round(inserted / cycle_seconds, 2) if cycle_seconds else None
+            summary['insert_rows_per_sec'] = round(inserted / save_seconds, 2) if save_seconds else None
+            summary['duplicate_ratio'] = round(duplicates / (inserted + duplicates), 4) if inserted + duplicates else None
+
+        return {
+            'cycle_started': self.cycle_started.isoformat(),
+            'duration_s': round((datetime.utcnow() - self.cycle_started).total_seconds(), 3),
+            'engines': engines,
+            'peak_queue_depth': queues
+        }
+
+    def end_cycle(self, path: str = None) -> dict:
+        """Append the cycle summary as one JSON line and start a fresh cycle"""
+        summary = self.cycle_summary()
+        path = path or os.getenv('METRICS_SUMMARY_PATH', 'metrics_cycles.jsonl')
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(summary) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to write cycle summary: {e}")
+        self.begin_cycle()
+        return summary
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram('scraper_stage_seconds', 'Time spent in each pipeline stage', ('engine', 'stage'))
+HTTP_SECONDS = REGISTRY.histogram('scraper_http_request_seconds', 'Source API request latency including body read',
+                                  ('engine', 'query', 'status'))
+HTTP_BYTES = REGISTRY.counter('scraper_http_response_bytes_total', 'Source API response bytes', ('engine', 'query'))
+JOBS = REGISTRY.counter('scraper_jobs_total', 'Jobs by pipeline outcome (fetched, stale, inserted, duplicate, ...)',
+                        ('engine', 'outcome'))
+QUEUE_DEPTH = REGISTRY.gauge('scraper_queue_depth', 'Items waiting in an in-process queue', ('queue',))
+
+class StageTimer:
+    """Reusable `with` timer feeding scraper_stage_seconds; cheap enough for per-row use"""
+    __slots__ = ('engine', 'stage', '_started')
+
+    def __init__(self, engine: str, stage: str):
+        self.engine = engine
+        self.stage = stage
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self._started, engine=self.engine, stage=self.stage)
+        return False
+
+def stage(engine: str, name: str) -> StageTimer:
+    return StageTimer(engine, name)
+
+def timed(engine: str, name: str):
+    """Decorator form of stage() for whole synchronous methods"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with StageTimer(engine, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_http(engine: str, query: str, status: int, seconds: float, size: int):
+    HTTP_SECONDS.observe(seconds, engine=engine, query=query, status=status)
+    HTTP_BYTES.inc(size, engine=engine, query=query)
+
+def record_jobs(engine: str, outcome: str, count: int = 1):
+    if count:
+        JOBS.inc(count, engine=engine, outcome=outcome)
+
+async def start_metrics_server(host: str = None, port: int = None):
+    """Serve /metrics in Prometheus text format; returns the runner (None when disabled)"""
+    host = host or os.getenv('METRICS_HOST', '127.0.0.1')
+    port = int(os.getenv('METRICS_PORT', 9108)) if port is None else port
+    if not port:
+        return None
+    from aiohttp import web  # Only processes that serve /metrics need the web stack
+
+    async def handle_metrics(request):
+        return web.Response(body=REGISTRY.render().encode('utf-8'),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        # Metrics are best-effort; never take the scheduler down with them
+        logger.error(f"Metrics endpoint unavailable on {host}:{port}: {e}")
+        await runner.cleanup()
+        return None
+    logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+    return runner
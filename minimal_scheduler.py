@@ -1,28 +1,20 @@
 import asyncio
 import logging
 import signal
-import sys
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import os
-from telegram_engine import run_telegram_engine
-from jooble_engine import run_jooble_engine
-from remotive_engine import run_remotive_engine
-# from wellfound_engine import run_wellfound_engine  # Disabled: API blocked
-from adzuna_engine import run_adzuna_engine
+# Engines are imported lazily through the registry, only when enabled
+from engine_registry import REGISTRY
+import metrics
+from profiling import PROFILER
+from log_config import setup_logging
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Setup logging (once, for every engine; log I/O runs on a background thread)
+setup_logging()
 logger = logging.getLogger("Scheduler")
 
 class MinimalScheduler:
@@ -30,6 +22,10 @@ class MinimalScheduler:
         self.running = True
         self.interval_ms = int(os.getenv('SCHEDULE_INTERVAL_MS', 21600000))  # Default 6 hours
         self.interval_seconds = self.interval_ms / 1000
+        # 'poll' fetches Telegram history each cycle; 'listen' keeps a live connection instead
+        self.telegram_mode = os.getenv('TELEGRAM_MODE', 'poll').lower()
+        self.telegram_listener = None
+        REGISTRY.load_plugins()
         
         # Log environment loading
         logger.info("Loaded environment variables from .env")
@@ -40,25 +36,18 @@ class MinimalScheduler:
         signal.signal(signal.SIGTERM, self._shutdown_handler)
     
     def _log_enabled_engines(self):
-        """Log which engines are enabled based on available API keys"""
-        enabled_engines = []
-        
-        # Check Telegram
-        if os.getenv('TELEGRAM_API_ID') and os.getenv('TELEGRAM_API_HASH') and os.getenv('TELEGRAM_SESSION_STRING'):
-            enabled_engines.append('Telegram')
-        
-        # Check Jooble
-        if os.getenv('JOOBLE_API_KEY'):
-            enabled_engines.append('Jooble')
-        
-        # Remotive and Adzuna don't need keys
-        enabled_engines.extend(['Remotive', 'Adzuna'])
-        
-        # Wellfound disabled (403, will be re-enabled during scraping phase)
-        logger.info("Wellfound disabled (403, will be re-enabled during scraping phase)")
+        """Log which engines are enabled based on ENGINES and available API keys"""
+        for line in REGISTRY.describe():
+            logger.info(line)
         
+        enabled_engines = [spec.name for spec in REGISTRY.enabled()]
+        if 'telegram' in enabled_engines and self.telegram_mode == 'listen':
+            enabled_engines[enabled_engines.index('telegram')] = 'telegram (listener)'
         logger.info(f"Enabled engines: {', '.join(enabled_engines)}")
     
+    def _telegram_configured(self) -> bool:
+        return any(spec.name == 'telegram' for spec in REGISTRY.enabled())
+    
     def _shutdown_handler(self, signum, frame):
         logger.info("Shutdown signal received. Stopping scheduler...")
         self.running = False
@@ -67,35 +56,53 @@ class MinimalScheduler:
         """Main scheduler loop"""
         logger.info(f"Minimal Scheduler started - Active engines (Interval: {self.interval_seconds/3600:.1f}h)")
         
+        metrics_runner = await metrics.start_metrics_server()
+        
+        listener_task = None
+        if self.telegram_mode == 'listen' and self._telegram_configured():
+            logger.info("Starting Telegram listener")
+            from telegram_listener import TelegramListener, run_telegram_listener
+            self.telegram_listener = TelegramListener()
+            listener_task = asyncio.create_task(run_telegram_listener(self.telegram_listener))
+        
         while self.running:
             try:
                 # Log start
                 start_time = datetime.now()
+                metrics.REGISTRY.begin_cycle()
+                PROFILER.begin_cycle()  # No-op unless PROFILE_* is set or the trigger file exists
                 
-                # Run Telegram engine
-                logger.info("Running Telegram cycle")
-                await run_telegram_engine()
-                
-                # Run Jooble engine
-                logger.info("Running Jooble cycle")
-                await run_jooble_engine()
+                # Run each enabled engine in registry order (the listener covers Telegram in listen mode)
+                for spec in REGISTRY.enabled():
+                    if spec.name == 'telegram' and listener_task is not None:
+                        continue
+                    logger.info(f"Running {spec.name} cycle")
+                    with metrics.stage(spec.name, 'cycle'), PROFILER.engine(spec.name):
+                        await REGISTRY.get(spec.name).run_cycle()
                 
-                # Run Remotive engine
-                logger.info("Running Remotive cycle")
-                await run_remotive_engine()
+                # Archive old jobs and prune stale hashes (no-op unless RETENTION_DAYS is set)
+                if int(os.getenv('RETENTION_DAYS', 0)) > 0:
+                    logger.info("Running retention cycle")
+                    from retention import run_retention
+                    with PROFILER.engine('retention'):
+                        await run_retention()
                 
-                # Wellfound disabled (403, will be re-enabled during scraping phase)
-                # logger.info("Running Wellfound cycle")
-                # await run_wellfound_engine()
-                
-                # Run Adzuna engine
-                logger.info("Running Adzuna cycle")
-                await run_adzuna_engine()
+                # Re-check apply links that are due (no-op unless LINK_CHECK_MAX_PER_RUN is set)
+                if int(os.getenv('LINK_CHECK_MAX_PER_RUN', 0)) > 0:
+                    logger.info("Running link check")
+                    from link_checker import run_link_checker
+                    with PROFILER.engine('link_checker'):
+                        await run_link_checker()
                 
                 # Log end and next run time
                 end_time = datetime.now()
                 next_run = end_time + timedelta(seconds=self.interval_seconds)
                 logger.info(f"All cycles completed in {(end_time - start_time).total_seconds():.1f}s")
+                summary = metrics.REGISTRY.end_cycle()
+                PROFILER.end_cycle()
+                for engine, stats in summary['engines'].items():
+                    logger.info(f"{engine}: {stats['jobs'].get('inserted', 0)} inserted, "
+                                f"{stats['rows_per_sec']} rows/s, duplicate ratio {stats['duplicate_ratio']}")
                 logger.info(f"Next run in {self.interval_seconds/3600:.1f} hours at {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
                 
                 # Sleep until next cycle
@@ -103,8 +110,15 @@ class MinimalScheduler:
                 
             except Exception as e:
                 logger.error(f"Error in scheduler cycle: {e}")
+                PROFILER.end_cycle()  # Keep whatever was captured; the failing cycle is the interesting one
                 # Wait a bit before retrying
                 await self._smart_sleep(60)
+        
+        if listener_task is not None:
+            await self.telegram_listener.stop()
+            await listener_task
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
     
     async def _smart_sleep(self, seconds):
         """Sleep in short bursts to allow for rapid shutdown"""
@@ -0,0 +1,312 @@
+import os
+import json
+import asyncio
+import random
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from aiohttp import web
+from telethon.tl.types import InputPeerChannel
+
+_WORDS = ('python django react node aws kubernetes docker postgres redis kafka spark airflow terraform '
+          'microservices api design scalable backend frontend team product customers growth platform '
+          'experience years building systems ownership collaborate remote hybrid benefits equity '
+          'insurance learning mentoring startup fintech healthtech ecommerce data pipelines testing').split()
+_TITLES = ['Backend Engineer', 'Frontend Developer', 'Data Engineer', 'DevOps Engineer', 'Full Stack Developer',
+           'Data Scientist', 'SDE II', 'QA Automation Engineer', 'Android Developer', 'Product Designer']
+_COMPANIES = [f"Company {i}" for i in range(500)]
+_LOCATIONS = ['Bangalore', 'Hyderabad', 'Pune', 'Chennai', 'Mumbai', 'Delhi', 'Remote', 'Gurgaon', 'Noida']
+_CHATTER = ['Good morning everyone', 'Anyone got the results yet?', 'Thanks for sharing!',
+            'Join our channel for daily updates t.me/joinchat/xyz', 'Flat 50% off on our DSA course, enroll now']
+
+@dataclass
+class MockConfig:
+    page_size: int = 50  # Postings per response
+    latency_ms: float = 50.0
+    payload_bytes: int = 2000  # Approximate description size per posting
+    duplicate_ratio: float = 0.2  # Share of each page repeating postings already served
+    chatter_ratio: float = 0.3  # Share of Telegram messages that are not job posts
+    seed: int = 1
+
+class JobGenerator:
+    """Platform-neutral postings; every page after the first repeats a share of earlier ones"""
+    def __init__(self, config: MockConfig, name: str):
+        self.config = config
+        self.name = name
+        self.rng = random.Random(f"{config.seed}:{name}")
+        self.served: List[dict] = []
+        self.counter = 0
+
+    def _description(self) -> str:
+        words = []
+        size = 0
+        while size < self.config.payload_bytes:
+            word = self.rng.choice(_WORDS)
+            words.append(word)
+            size += len(word) + 1
+        return f"<p>{' '.join(words)}</p>"
+
+    def _new(self) -> dict:
+        self.counter += 1
+        return {
+            'id': f"{self.name}-{self.counter}",
+            'title': self.rng.choice(_TITLES),
+            'company': self.rng.choice(_COMPANIES),
+            'location': self.rng.choice(_LOCATIONS),
+            'description': self._description(),
+            'url': f"https://jobs.example.com/{self.name}/{self.counter}",
+            'posted_at': (datetime.now(timezone.utc) - timedelta(minutes=self.rng.randint(0, 120))).isoformat()
+        }
+
+    def page(self, size: int = None) -> List[dict]:
+        size = size or self.config.page_size
+        repeats = min(len(self.served), round(size * self.config.duplicate_ratio))
+        jobs = self.rng.sample(self.served, repeats) if repeats else []
+        fresh = [self._new() for _ in range(size - repeats)]
+        self.served.extend(fresh)
+        jobs.extend(fresh)
+        self.rng.shuffle(jobs)
+        return jobs
+
+def _jooble(job: dict) -> dict:
+    return {'id': job['id'], 'title': job['title'], 'company': job['company'], 'location': job['location'],
+            'snippet': job['description'], 'link': job['url'], 'updated': job['posted_at']}
+
+def _remotive(job: dict) -> dict:
+    return {'id': job['id'], 'title': job['title'], 'company_name': job['company'],
+            'candidate_required_location': job['location'], 'description': job['description'],
+            'url': job['url'], 'publication_date': job['posted_at']}
+
+def _adzuna(job: dict) -> dict:
+    return {'id': job['id'], 'title': job['title'], 'company': {'display_name': job['company']},
+            'location': {'display_name': job['location']}, 'description': job['description'],
+            'redirect_url': job['url'], 'created': job['posted_at']}
+
+def _wellfound_page(jobs: List[dict]) -> str:
+    """A listing page shaped like Wellfound's: cards in an Apollo cache inside __NEXT_DATA__"""
+    data = {}
+    for job in jobs:
+        key = f"JobListingSearchResult:{job['id']}"
+        data[key] = {'id': job['id'], 'title': job['title'], 'slug': job['title'].lower().replace(' ', '-'),
+                     'locationNames': {'type': 'json', 'json': [job['location']]}, 'remote': job['location'] == 'Remote',
+                     'compensation': '₹12L – ₹24L', 'description': job['description'],
+                     'liveStartAt': int(datetime.fromisoformat(job['posted_at']).timestamp())}
+        data[f"StartupSearchResult:{job['id']}"] = {'name': job['company'], 'highlightedJobListings': [{'__ref': key}]}
+    payload = json.dumps({'props': {'pageProps': {'apolloState': {'data': data}}}}, ensure_ascii=False)
+    return (f'<!DOCTYPE html><html><head><title>Jobs</title></head><body><div id="__next"></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{payload}</script></body></html>')
+
+class MockSources:
+    """Local stand-ins for the Jooble, Adzuna, Remotive and Wellfound endpoints on one port"""
+    def __init__(self, config: MockConfig, wellfound_fixtures: str = None):
+        self.config = config
+        # Saved listing pages (page-1.html, page-2.html, ...) to serve instead of generated ones
+        self.wellfound_fixtures = wellfound_fixtures
+        self.generators = {name: JobGenerator(config, name) for name in ('jooble', 'remotive', 'adzuna', 'wellfound')}
+        self.requests: Dict[str, int] = {}
+        self.runner = None
+        self.base_url = None
+
+    async def _respond(self, platform: str, shape, key: str):
+        self.requests[platform] = self.requests.get(platform, 0) + 1
+        if self.config.latency_ms:
+            await asyncio.sleep(self.config.latency_ms / 1000)
+        return web.json_response({key: [shape(job) for job in self.generators[platform].page()]})
+
+    async def _handle_jooble(self, request):
+        await request.read()
+        return await self._respond('jooble', _jooble, 'jobs')
+
+    async def _handle_remotive(self, request):
+        return await self._respond('remotive', _remotive, 'jobs')
+
+    async def _handle_adzuna(self, request):
+        return await self._respond('adzuna', _adzuna, 'results')
+
+    async def _handle_wellfound(self, request):
+        self.requests['wellfound'] = self.requests.get('wellfound', 0) + 1
+        if self.config.latency_ms:
+            await asyncio.sleep(self.config.latency_ms / 1000)
+        page = int(request.query.get('page', 1))
+        if self.wellfound_fixtures:
+            path = os.path.join(self.wellfound_fixtures, f"page-{page}.html")
+            if not os.path.exists(path):
+                raise web.HTTPNotFound()
+            with open(path, encoding='utf-8') as f:
+                body = f.read()
+        else:
+            body = _wellfound_page(self.generators['wellfound'].page())
+        return web.Response(text=body, content_type='text/html')
+
+    async def start(self, host: str = '127.0.0.1') -> str:
+        app = web.Application()
+        app.router.add_post('/jooble/{api_key}', self._handle_jooble)
+        app.router.add_get('/remotive', self._handle_remotive)
+        app.router.add_get('/adzuna/{country}/search/{page}', self._handle_adzuna)
+        app.router.add_get('/wellfound/role/{path:.*}', self._handle_wellfound)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((host, 0))
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.SockSite(self.runner, sock).start()
+        self.base_url = f"http://{host}:{sock.getsockname()[1]}"
+        return self.base_url
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides pointing the engines at this server"""
+        return {
+            'JOOBLE_BASE_URL': f"{self.base_url}/jooble",
+            'REMOTIVE_BASE_URL': f"{self.base_url}/remotive",
+            'ADZUNA_BASE_URL': f"{self.base_url}/adzuna",
+            'WELLFOUND_BASE_URL': f"{self.base_url}/wellfound",
+        }
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+class MockLinks:
+    """Local stand-in for employer career pages, for the apply-link checker
+
+    /job/{n} answers by n % 10: 0-5 live, 6 redirects to a live page, 7 is 404, 8 is 410 and 9
+    rejects HEAD (405) but answers a ranged GET. /private/* is disallowed by robots.txt. Tracks
+    the peak number of in-flight requests per Host header.
+    """
+    def __init__(self, crawl_delay: float = 0, latency_ms: float = 20):
+        self.crawl_delay = crawl_delay
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.in_flight: Dict[str, int] = {}
+        self.peak_in_flight: Dict[str, int] = {}
+        self.runner = None
+        self.port = None
+
+    @staticmethod
+    def expected(n: int) -> bool:
+        return n % 10 not in (7, 8)
+
+    async def _robots(self, request):
+        lines = ['User-agent: *', 'Disallow: /private/']
+        if self.crawl_delay:
+            lines.append(f"Crawl-delay: {self.crawl_delay:g}")
+        return web.Response(text='\n'.join(lines) + '\n')
+
+    async def _job(self, request):
+        host = request.headers.get('Host', '')
+        self.requests += 1
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak_in_flight[host] = max(self.peak_in_flight.get(host, 0), self.in_flight[host])
+        try:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+            kind = int(request.match_info['n']) % 10
+            if kind == 6:
+                raise web.HTTPFound(f"/job/{int(request.match_info['n']) - 6}")
+            if kind in (7, 8):
+                return web.Response(status=404 if kind == 7 else 410)
+            if kind == 9:
+                if request.method == 'HEAD':
+                    return web.Response(status=405)
+                return web.Response(status=206, body=b'<')
+            return web.Response(text='<html>Apply now</html>', content_type='text/html')
+        finally:
+            self.in_flight[host] -= 1
+
+    async def start(self, host: str = '127.0.0.1') -> int:
+        app = web.Application()
+        app.router.add_get('/robots.txt', self._robots)
+        app.router.add_route('*', '/job/{n}', self._job)
+        app.router.add_route('*', '/private/{n}', self._job)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((host, 0))
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.SockSite(self.runner, sock).start()
+        self.port = sock.getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+class _FakeChannel(InputPeerChannel):
+    """Input peer that also answers the attributes the engine logs for resolved entities"""
+    @property
+    def id(self):
+        return self.channel_id
+
+    @property
+    def title(self):
+        return f"Bench group {self.channel_id}"
+
+@dataclass
+class _FakeMessage:
+    id: int
+    date: datetime
+    text: str
+
+class FakeTelegramClient:
+    """Drop-in for telethon.TelegramClient serving generated group history (newest id = highest)"""
+    config = MockConfig()
+    groups: Dict[str, List[_FakeMessage]] = {}
+    requests = 0
+    _post_generator = JobGenerator(config, 'telegram')
+    _rng = random.Random(config.seed)
+
+    def __init__(self, *args, **kwargs):
+        self._connected = False
+
+    @classmethod
+    def reset(cls, config: MockConfig):
+        cls.config = config
+        cls.groups = {}
+        cls.requests = 0
+        cls._post_generator = JobGenerator(config, 'telegram')
+        cls._rng = random.Random(config.seed)
+
+    @classmethod
+    def post(cls, group_name: str, count: int):
+        """Append `count` new messages to a group: job posts, repeats and chatter"""
+        history = cls.groups.setdefault(group_name, [])
+        jobs = iter(cls._post_generator.page(count))
+        now = datetime.now(timezone.utc)
+        for _ in range(count):
+            if cls._rng.random() < cls.config.chatter_ratio:
+                text = cls._rng.choice(_CHATTER)
+            else:
+                job = next(jobs)
+                text = (f"{job['company']} is hiring {job['title']}\nLocation: {job['location']}\n"
+                        f"Experience: 2+ years\nApply here {job['url']}\n{job['description']}")
+            history.append(_FakeMessage(id=len(history) + 1, date=now, text=text))
+
+    async def connect(self):
+        self._connected = True
+
+    async def disconnect(self):
+        self._connected = False
+
+    def is_connected(self):
+        return self._connected
+
+    async def is_user_authorized(self):
+        return True
+
+    async def get_entity(self, group_name: str):
+        index = sorted(self.groups).index(group_name)
+        return _FakeChannel(channel_id=1000 + index, access_hash=index)
+
+    async def iter_dialogs(self):
+        return
+        yield
+
+    async def get_messages(self, entity, limit: int = 100, offset_id: int = 0, min_id: int = 0):
+        FakeTelegramClient.requests += 1
+        if self.config.latency_ms:
+            await asyncio.sleep(self.config.latency_ms / 1000)
+        group_name = sorted(self.groups)[entity.channel_id - 1000]
+        history = self.groups[group_name]
+        upper = offset_id - 1 if offset_id else len(history)
+        return [message for message in reversed(history[max(min_id, upper - limit):upper])]
@@ -1,23 +1,93 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from html import unescape
+from typing import Dict, Optional, Tuple
 import hashlib
+import re
 
-@dataclass
+_WHITESPACE_RE = re.compile(r'\s+')
+# Precompiled HTML stripping for the stored plain-text description
+_SCRIPT_RE = re.compile(r'<(script|style)[^>]*>.*?</\1>', re.S | re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+SNIPPET_LENGTH = 280
+
+@lru_cache(maxsize=65536)
+def normalize_text(value: str) -> str:
+    """Lowercase, trim and collapse whitespace (company/location values repeat heavily)"""
+    return _WHITESPACE_RE.sub(' ', value.lower().strip())
+
+def html_to_text(html: Optional[str]) -> str:
+    """Strip tags and entities from a description"""
+    if not html:
+        return ""
+    text_value = _SCRIPT_RE.sub(' ', html)
+    text_value = _TAG_RE.sub(' ', text_value)
+    return _WHITESPACE_RE.sub(' ', unescape(text_value)).strip()
+
+def make_snippet(text_value: str, length: int = SNIPPET_LENGTH) -> str:
+    """First `length` characters of plain text, cut back to a word boundary"""
+    if len(text_value) <= length:
+        return text_value
+    cut = text_value.rfind(' ', 0, length)
+    return text_value[:cut if cut > length // 2 else length].rstrip() + '…'
+
+def derive_fields(title: Optional[str], company: Optional[str], location: Optional[str],
+                  description_html: Optional[str]) -> Dict[str, str]:
+    """Plain-text and normalized columns stored next to the raw ones (see Job.description_text)"""
+    description_text = html_to_text(description_html)
+    return {
+        'description_text': description_text,
+        'snippet': make_snippet(description_text),
+        'title_norm': normalize_text(title)[:500] if title else '',
+        'company_norm': normalize_text(company)[:255] if company else '',
+        'location_norm': normalize_text(location)[:255] if location else '',
+    }
+
+@dataclass(slots=True)
 class UnifiedJob:
     title: str
     company: str
     location: str
     description: str
     apply_link: Optional[str] = None
+    posted_at: Optional[datetime] = None
+    source: str = ''
+    external_id: Optional[str] = None
     salary_min: Optional[int] = None
     salary_max: Optional[int] = None
     currency: str = 'INR'
     raw_data: Optional[dict] = None
-    
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
     def get_content_hash(self) -> str:
-        content = f"{self.title}{self.company}{self.location}".lower().strip()
-        return hashlib.sha256(content.encode()).hexdigest()
+        """Generate standardized content hash: title + company + location + platform + source_url"""
+        if self._content_hash is None:
+            self.hash_as(self.company, self.location)
+        return self._content_hash
+
+    def hash_as(self, company: str, location: str) -> 'UnifiedJob':
+        """Key the content hash on these company/location values instead of the stored ones"""
+        title_norm = normalize_text(self.title) if self.title else ""
+        company_norm = normalize_text(company) if company else ""
+        location_norm = normalize_text(location) if location else ""
+        source_url_norm = self.apply_link.lower().strip() if self.apply_link else ""
+
+        hash_input = f"{title_norm}|{company_norm}|{location_norm}|{self.source}|{source_url_norm}"
+        self._content_hash = hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+        return self
+
+    def get_fingerprint(self) -> str:
+        """Short digest of the fields a provider may edit in place; a change means the stored row is stale"""
+        editable = (self.title, self.company, self.location, self.salary_min, self.salary_max,
+                    self.currency, self.apply_link, self.description)
+        return hashlib.blake2b(repr(editable).encode('utf-8'), digest_size=8).hexdigest()
+
+    def derived_fields(self) -> Dict[str, str]:
+        """Job columns derived from the raw text; not memoized, so call it once per stored row"""
+        return derive_fields(self.title, self.company, self.location, self.description)
 
 @dataclass
 class QueryModel:
@@ -26,6 +96,10 @@ class QueryModel:
     location: Optional[str] = None
 
 class BaseAdapter(ABC):
+    """A job source the scheduler can run (see engine_registry for registration and lazy loading)"""
+    name: str = ''
+    required_env: Tuple[str, ...] = ()  # All must be set for the source to be enabled
+
     @abstractmethod
-    async def fetch(self, query: QueryModel) -> List[UnifiedJob]:
-        pass
\ No newline at end of file
+    async def run_cycle(self):
+        """One full fetch-and-save cycle"""
@@ -0,0 +1,126 @@
+import os
+import re
+import random
+import logging
+import hashlib
+from typing import List, Optional
+from database import JobSignature, JobSignatureBand, PlatformEnum
+from models import html_to_text
+
+logger = logging.getLogger("NearDuplicates")
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# 8 bands x 4 rows: a pair shares a band with probability 1-(1-s^4)^8 for Jaccard s, i.e. ~0.67 at 0.6,
+# ~0.89 at 0.7 (the default NEAR_DUP_MIN_SIMILARITY) and ~0.98 at 0.8. Band keys are persisted, so
+# changing the banding means rebuilding job_signature_bands.
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)  # Fixed seed: signatures are persisted and must stay comparable
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def _tokens(value: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(value.lower()) if value else []
+
+def features(title: str, company: str, description: str, description_text: Optional[str] = None) -> set:
+    """Normalized title/company words plus description word bigrams (from the plain text when given)"""
+    result = {'t:' + token for token in _tokens(title)}
+
+    # Telegram "companies" are group names, not employers
+    company = company.lower() if company else ''
+    if not company.startswith('telegram:'):
+        result.update('c:' + token for token in _tokens(company))
+
+    words = _tokens(description_text if description_text is not None else html_to_text(description))
+    result.update(f"d:{first} {second}" for first, second in zip(words, words[1:]))
+    return result
+
+def minhash(feature_set: set) -> List[int]:
+    hashes = [_feature_hash(feature) for feature in feature_set] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+def band_keys(signature: List[int]) -> List[int]:
+    """One positive 63-bit key per band, salted with the band index"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr((band, rows)).encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big') >> 1)
+    return keys
+
+def similarity(first: List[int], second: List[int]) -> float:
+    """MinHash estimate of Jaccard similarity"""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+def _pack(signature: List[int]) -> bytes:
+    return b''.join(value.to_bytes(8, 'big') for value in signature)
+
+def _unpack(blob: bytes) -> List[int]:
+    return [int.from_bytes(blob[i:i + 8], 'big') for i in range(0, len(blob), 8)]
+
+class NearDuplicateDetector:
+    def __init__(self):
+        # 'link' stores cross-source duplicates with a pointer to the first copy,
+        # 'suppress' skips inserting them, 'off' disables the check
+        self.mode = os.getenv('NEAR_DUP_MODE', 'link').lower()
+        self.min_similarity = float(os.getenv('NEAR_DUP_MIN_SIMILARITY', 0.7))
+
+        if self.mode not in ('link', 'suppress', 'off'):
+            raise ValueError(f"Unknown NEAR_DUP_MODE: {self.mode}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    @property
+    def suppress(self) -> bool:
+        return self.mode == 'suppress'
+
+    def signature(self, job, description_text: Optional[str] = None) -> List[int]:
+        return minhash(features(job.title, job.company, job.description, description_text))
+
+    def find_duplicate(self, session, signature: List[int], source: PlatformEnum) -> Optional[int]:
+        """Canonical job id of a near-identical posting from another source, if any"""
+        candidates = session.query(
+            JobSignature.job_id, JobSignature.minhash, JobSignature.canonical_job_id
+        ).join(
+            JobSignatureBand, JobSignatureBand.job_id == JobSignature.job_id
+        ).filter(
+            JobSignatureBand.band_key.in_(band_keys(signature)),
+            JobSignature.source != source
+        ).distinct().all()
+
+        best = None
+        for job_id, blob, canonical_id in candidates:
+            score = similarity(signature, _unpack(blob))
+            if score >= self.min_similarity and (best is None or score > best[0]):
+                best = (score, canonical_id or job_id)
+        return best[1] if best else None
+
+    def record(self, session, job_entry, signature: List[int], canonical_id: Optional[int]):
+        """Store the signature and its band keys alongside a newly added Job row"""
+        session.add(JobSignature(
+            job=job_entry,
+            source=job_entry.source,
+            minhash=_pack(signature),
+            canonical_job_id=canonical_id,
+        ))
+        for key in set(band_keys(signature)):
+            session.add(JobSignatureBand(band_key=key, job=job_entry))
+
+    def replace(self, connection, job_id: int, signature: List[int]):
+        """Swap the stored signature and band keys of a job whose text was edited in place"""
+        updated = connection.execute(JobSignature.__table__.update().where(JobSignature.job_id == job_id)
+                                     .values(minhash=_pack(signature)))
+        if not updated.rowcount:
+            return  # Stored before near-duplicate detection was on
+        connection.execute(JobSignatureBand.__table__.delete().where(JobSignatureBand.job_id == job_id))
+        keys = set(band_keys(signature))
+        connection.execute(JobSignatureBand.__table__.insert(), [{'band_key': key, 'job_id': job_id} for key in keys])
@@ -0,0 +1,111 @@
+import os
+import time
+import atexit
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+from models import UnifiedJob
+import metrics
+
+logger = logging.getLogger("ParsePool")
+
+# One pool per process, shared by every engine and cycle (worker start-up is not free)
+_executor: Optional[Executor] = None
+
+def _get_executor(kind: str, workers: int) -> Executor:
+    global _executor
+    if _executor is None:
+        if kind == 'thread':
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parse')
+        else:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        logger.info(f"Parse pool started ({kind}, {workers} workers)")
+    return _executor
+
+def shutdown_pool():
+    """Stop the shared pool; the next large batch starts a fresh one"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+def parse_chunk(parse_fn: Callable, payloads: Sequence) -> List[UnifiedJob]:
+    """Parse raw payloads and compute content hashes; runs inside a worker"""
+    return _parse_chunk_timed(parse_fn, payloads)[0]
+
+def _hash(jobs: List[UnifiedJob]) -> float:
+    """Content hashes, memoized on the record and shipped back with it; returns the seconds taken"""
+    started = time.perf_counter()
+    for job in jobs:
+        job.get_content_hash()
+    return time.perf_counter() - started
+
+def _parse_chunk_timed(parse_fn: Callable, payloads: Sequence):
+    """parse_chunk plus (parse, hash) seconds, reported back to the parent for metrics"""
+    jobs = []
+    started = time.perf_counter()
+    for payload in payloads:
+        job = parse_fn(payload)
+        if job:
+            jobs.append(job)
+    parse_seconds = time.perf_counter() - started
+    return jobs, parse_seconds, _hash(jobs)
+
+def _parse_documents_timed(parse_fn: Callable, documents: Sequence):
+    """Like _parse_chunk_timed for documents that each yield many jobs (e.g. HTML listing pages)"""
+    jobs = []
+    started = time.perf_counter()
+    for document in documents:
+        jobs.extend(parse_fn(document))
+    parse_seconds = time.perf_counter() - started
+    return jobs, parse_seconds, _hash(jobs)
+
+class ParseStage:
+    def __init__(self, source: str = 'default'):
+        self.source = source  # Metrics label
+        self.threshold = int(os.getenv('PARSE_POOL_THRESHOLD', 500))
+        self.kind = os.getenv('PARSE_POOL_KIND', 'process').lower()  # 'process' or 'thread'
+        self.workers = int(os.getenv('PARSE_POOL_WORKERS', 0)) or os.cpu_count() or 1
+        self.chunk_size = int(os.getenv('PARSE_POOL_CHUNK_SIZE', 250))
+        # Whole documents are worth a worker once there is this much markup to parse
+        self.document_bytes = int(os.getenv('PARSE_POOL_DOCUMENT_BYTES', 65536))
+
+        if self.kind not in ('process', 'thread'):
+            raise ValueError(f"Unknown PARSE_POOL_KIND: {self.kind}")
+
+    async def _execute(self, worker_fn: Callable, parse_fn: Callable, chunks: List[Sequence], offload: bool):
+        if not offload:
+            results = [worker_fn(parse_fn, chunk) for chunk in chunks]
+        else:
+            loop = asyncio.get_running_loop()
+            executor = _get_executor(self.kind, self.workers)
+            metrics.QUEUE_DEPTH.set(len(chunks), queue='parse_pool')
+            results = await asyncio.gather(*[
+                loop.run_in_executor(executor, worker_fn, parse_fn, chunk) for chunk in chunks
+            ])
+            metrics.QUEUE_DEPTH.set(0, queue='parse_pool')
+
+        # Worker-side seconds, summed over chunks (CPU time, not wall time, when pooled)
+        metrics.STAGE_SECONDS.observe(sum(r[1] for r in results), engine=self.source, stage='parse')
+        metrics.STAGE_SECONDS.observe(sum(r[2] for r in results), engine=self.source, stage='hash')
+        return [job for result in results for job in result[0]]
+
+    async def run(self, parse_fn: Callable, payloads: Sequence) -> List[UnifiedJob]:
+        """Parse a batch, offloading to the pool once it is large enough to pay for the transfer"""
+        if len(payloads) < self.threshold or self.workers < 2:
+            jobs = await self._execute(_parse_chunk_timed, parse_fn, [payloads], offload=False)
+        else:
+            chunks = [payloads[i:i + self.chunk_size] for i in range(0, len(payloads), self.chunk_size)]
+            jobs = await self._execute(_parse_chunk_timed, parse_fn, chunks, offload=True)
+        metrics.record_jobs(self.source, 'parsed', len(jobs))
+        metrics.record_jobs(self.source, 'rejected', len(payloads) - len(jobs))
+        return jobs
+
+    async def run_documents(self, parse_fn: Callable, documents: Sequence[str]) -> List[UnifiedJob]:
+        """Parse documents that each hold many postings (parse_fn returns a list), one document per task"""
+        offload = self.workers >= 2 and sum(len(document) for document in documents) >= self.document_bytes
+        jobs = await self._execute(_parse_documents_timed, parse_fn, [[document] for document in documents], offload)
+        metrics.record_jobs(self.source, 'parsed', len(jobs))
+        return jobs
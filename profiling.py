@@ -0,0 +1,177 @@
+import os
+import io
+import json
+import time
+import shutil
+import pstats
+import cProfile
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("Profiling")
+
+def _flag(name: str) -> bool:
+    return os.getenv(name, '0').lower() in ('1', 'true', 'yes')
+
+class CycleProfiler:
+    """Opt-in per-cycle diagnostics: cProfile per engine, tracemalloc peaks/top allocations, slow SQL
+
+    Controlled by PROFILE_CPU, PROFILE_MEMORY and PROFILE_SLOW_QUERY_MS. Creating PROFILE_TRIGGER_PATH
+    (e.g. `touch profile.trigger`) profiles the next cycle with everything on, without a restart.
+    Each profiled cycle gets its own directory under PROFILE_DIR; only the newest PROFILE_KEEP_CYCLES stay.
+    """
+    def __init__(self):
+        self.directory = os.getenv('PROFILE_DIR', 'profiles')
+        self.keep = int(os.getenv('PROFILE_KEEP_CYCLES', 20))
+        self.trigger_path = os.getenv('PROFILE_TRIGGER_PATH', 'profile.trigger')
+        self.top_allocations = int(os.getenv('PROFILE_TOP_ALLOCATIONS', 25))
+        self.cpu = self.memory = False
+        self.slow_query_ms = 0.0
+        self.cycle_dir: Optional[str] = None
+        self.current_engine = 'other'  # Engines run one at a time, so a plain attribute is enough
+        self.engines: Dict[str, dict] = {}
+        self.slow_queries: List[dict] = []
+        self._hooks_installed = False
+
+    @property
+    def active(self) -> bool:
+        return self.cycle_dir is not None
+
+    def begin_cycle(self):
+        self.cpu = _flag('PROFILE_CPU')
+        self.memory = _flag('PROFILE_MEMORY')
+        self.slow_query_ms = float(os.getenv('PROFILE_SLOW_QUERY_MS', 0))
+        if os.path.exists(self.trigger_path):
+            os.remove(self.trigger_path)
+            self.cpu = self.memory = True
+            self.slow_query_ms = self.slow_query_ms or 100.0
+            logger.info("Profile trigger found; profiling this cycle")
+
+        self.engines = {}
+        self.slow_queries = []
+        self.current_engine = 'other'
+        if not (self.cpu or self.memory or self.slow_query_ms):
+            self.cycle_dir = None
+            return
+
+        self.cycle_dir = os.path.join(self.directory, datetime.now().strftime('cycle-%Y%m%d-%H%M%S'))
+        os.makedirs(self.cycle_dir, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(int(os.getenv('PROFILE_TRACEMALLOC_FRAMES', 1)))
+        if self.slow_query_ms:
+            self._install_query_hooks()
+
+    # Slow queries
+
+    def _install_query_hooks(self):
+        """Listen on the Engine class so every DatabaseManager is covered, including ones built mid-cycle"""
+        if self._hooks_installed:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._hooks_installed = True
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.slow_query_ms:
+            conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('profile_started')
+        if not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        if self.active and elapsed_ms >= self.slow_query_ms:
+            self.slow_queries.append({
+                'engine': self.current_engine,
+                'ms': round(elapsed_ms, 3),
+                'statement': statement[:2000],
+                'parameters': repr(parameters)[:500],
+                'executemany': executemany,
+            })
+
+    # Per engine
+
+    @contextmanager
+    def engine(self, name: str):
+        """Profile one engine run inside the current cycle (no-op when profiling is off)"""
+        if not self.active:
+            yield
+            return
+        self.current_engine = name
+        stats = self.engines.setdefault(name, {})
+        profile = cProfile.Profile() if self.cpu else None
+        before = None
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            if before is not None:
+                self._record_memory(before, stats)  # Before writing the profile, which allocates itself
+            if profile:
+                self._write_cpu_profile(name, profile, stats)
+            self.current_engine = 'other'
+
+    def _write_cpu_profile(self, name: str, profile: cProfile.Profile, stats: dict):
+        path = os.path.join(self.cycle_dir, f"{name}.prof")
+        profile.dump_stats(path)  # Open with `python -m pstats` or snakeviz
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(40)
+        with open(os.path.join(self.cycle_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+        stats['cpu_profile'] = path
+
+    def _record_memory(self, before: tracemalloc.Snapshot, stats: dict):
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        stats['peak_mb'] = round(peak / 1024 / 1024, 2)
+        stats['top_allocations'] = [
+            {'where': str(diff.traceback), 'size_kb': round(diff.size_diff / 1024, 1), 'count': diff.count_diff}
+            for diff in after.compare_to(before, 'lineno')[:self.top_allocations]
+        ]
+
+    # Cycle artifacts
+
+    def end_cycle(self) -> Optional[str]:
+        """Write summary.json for the cycle, rotate old cycles and return the cycle directory"""
+        if not self.active:
+            return None
+        cycle_dir = self.cycle_dir
+        self.slow_queries.sort(key=lambda query: query['ms'], reverse=True)
+        summary = {
+            'cycle': os.path.basename(cycle_dir),
+            'cpu': self.cpu,
+            'memory': self.memory,
+            'slow_query_ms': self.slow_query_ms,
+            'engines': self.engines,
+            'slow_queries': self.slow_queries,
+        }
+        with open(os.path.join(cycle_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()  # Tracing is not free; only pay for it in profiled cycles
+        self.cycle_dir = None
+        self._rotate()
+        logger.info(f"Profile written to {cycle_dir} ({len(summary['slow_queries'])} slow queries)")
+        return cycle_dir
+
+    def _rotate(self):
+        cycles = sorted(name for name in os.listdir(self.directory) if name.startswith('cycle-'))
+        for name in cycles[:max(len(cycles) - self.keep, 0)]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+PROFILER = CycleProfiler()
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from aiohttp import web
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select, and_, or_, text
+from sqlalchemy.engine import make_url
+from database import DatabaseManager, Job, PlatformEnum
+from models import normalize_text
+from log_config import setup_logging
+
+logger = logging.getLogger("ReadAPI")
+
+LIST_COLUMNS = [
+    Job.id, Job.source, Job.external_id, Job.title, Job.company, Job.location,
+    Job.salary_min, Job.salary_max, Job.currency, Job.apply_link, Job.snippet, Job.posted_at_source, Job.created_at,
+    Job.listed_at
+]
+MAX_PAGE_SIZE = 200
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed number of seconds"""
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+def _encode_cursor(listed_at: datetime, job_id: int) -> str:
+    raw = json.dumps([listed_at.isoformat(), job_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    listed_at, job_id = json.loads(base64.urlsafe_b64decode(padded))
+    return datetime.fromisoformat(listed_at), int(job_id)
+
+def _serialize(row) -> dict:
+    record = dict(row._mapping)
+    record['source'] = record['source'].value if record['source'] else None
+    for key in ('posted_at_source', 'created_at', 'listed_at'):
+        if record[key] is not None:
+            record[key] = record[key].isoformat()
+    return record
+
+def create_read_engine(db_url: str):
+    """Separate engine for the read service so it never queues behind engine writes"""
+    url = make_url(db_url)
+    if url.get_backend_name() == 'sqlite':
+        # WAL lets readers and the single writer proceed concurrently (persistent per file)
+        writer = create_engine(db_url)
+        with writer.connect() as conn:
+            conn.execute(text("PRAGMA journal_mode=WAL"))
+        writer.dispose()
+        return create_engine(f"sqlite:///file:{url.database}?mode=ro&uri=true")
+    # Plain consistent reads; no gap or next-key locks against inserts
+    return create_engine(db_url, isolation_level="READ COMMITTED", pool_pre_ping=True)
+
+class JobReadService:
+    def __init__(self, engine, cache_ttl: float = 5.0):
+        self.engine = engine
+        self.cache = TTLCache(cache_ttl)
+
+    def _list_jobs(self, source: Optional[PlatformEnum], location: Optional[str],
+                   since: Optional[datetime], until: Optional[datetime],
+                   cursor: Optional[str], limit: int) -> dict:
+        """Keyset page ordered by (listed_at, id) descending; undated postings sort by when they were stored"""
+        query = select(*LIST_COLUMNS)
+        if source is not None:
+            query = query.where(Job.source == source)
+        if location:
+            query = query.where(Job.location_norm == normalize_text(location))
+        if since is not None:
+            query = query.where(Job.listed_at >= since)
+        if until is not None:
+            query = query.where(Job.listed_at < until)
+        if cursor:
+            listed_at, job_id = _decode_cursor(cursor)
+            query = query.where(or_(
+                Job.listed_at < listed_at,
+                and_(Job.listed_at == listed_at, Job.id < job_id)
+            ))
+        query = query.order_by(Job.listed_at.desc(), Job.id.desc()).limit(limit + 1)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].listed_at, rows[-1].id)
+        return {'jobs': [_serialize(row) for row in rows], 'next_cursor': next_cursor}
+
+    def _get_job(self, job_id: int) -> Optional[dict]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(*LIST_COLUMNS, Job.description_html, Job.description_text).where(Job.id == job_id)
+            ).first()
+        return _serialize(row) if row else None
+
+    def _respond(self, request: web.Request, body: bytes, etag: str) -> web.Response:
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+
+    async def _cached(self, request: web.Request, build, *args) -> web.Response:
+        """Serve from the TTL cache, building the body off the event loop on a miss"""
+        key = request.path_qs
+        cached = self.cache.get(key)
+        if cached is None:
+            payload = await asyncio.get_running_loop().run_in_executor(None, build, *args)
+            if payload is None:
+                raise web.HTTPNotFound()
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            cached = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+            self.cache.set(key, cached)
+        return self._respond(request, *cached)
+
+    async def list_jobs(self, request: web.Request) -> web.Response:
+        params = request.query
+        try:
+            source = PlatformEnum(params['source']) if 'source' in params else None
+            since = datetime.fromisoformat(params['since']) if 'since' in params else None
+            until = datetime.fromisoformat(params['until']) if 'until' in params else None
+            limit = int(params.get('limit', 50))
+            if limit < 1:
+                raise ValueError(f"limit must be a positive integer, got {limit}")
+            limit = min(limit, MAX_PAGE_SIZE)
+            cursor = params.get('cursor')
+            if cursor:
+                _decode_cursor(cursor)
+        except (ValueError, KeyError, TypeError) as e:
+            raise web.HTTPBadRequest(text=f"Invalid query parameter: {e}")
+
+        return await self._cached(request, self._list_jobs, source, params.get('location'),
+                                  since, until, cursor, limit)
+
+    async def get_job(self, request: web.Request) -> web.Response:
+        try:
+            job_id = int(request.match_info['job_id'])
+        except ValueError:
+            raise web.HTTPBadRequest(text="Invalid job id")
+        return await self._cached(request, self._get_job, job_id)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok', 'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses})
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/jobs', self.list_jobs)
+        app.router.add_get('/jobs/{job_id}', self.get_job)
+        app.router.add_get('/health', self.health)
+        return app
+
+def build_service() -> JobReadService:
+    load_dotenv()
+    db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
+
+    # Make sure tables and the listing index exist before opening read-only
+    DatabaseManager(db_url).create_tables()
+    return JobReadService(create_read_engine(db_url), cache_ttl=float(os.getenv('READ_API_CACHE_TTL', 5)))
+
+if __name__ == "__main__":
+    setup_logging()
+    service = build_service()
+    web.run_app(
+        service.create_app(),
+        host=os.getenv('READ_API_HOST', '127.0.0.1'),
+        port=int(os.getenv('READ_API_PORT', 8080)),
+    )
@@ -1,64 +1,74 @@
 import os
+import time
+import json
 import logging
-import hashlib
-import aiohttp
-import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Optional
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from database import DatabaseManager, JobHash, Job, PlatformEnum, SearchQuery
+from near_duplicates import NearDuplicateDetector
+from upsert import ChangeTracker
+from models import UnifiedJob, BaseAdapter
+from parse_pool import ParseStage
+import metrics
+from log_config import setup_logging
+import cassette
+from watermarks import QueryWatermarks
 import asyncio
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("RemotiveEngine")
 
-class RemotiveJob:
-    def __init__(self, title: str, company: str, location: str, description: str, 
-                 apply_link: Optional[str] = None, posted_at: Optional[datetime] = None, 
-                 source: str = "remotive", external_id: Optional[str] = None):
-        self.title = title
-        self.company = company
-        self.location = location
-        self.description = description
-        self.apply_link = apply_link
-        self.posted_at = posted_at
-        self.source = source
-        self.external_id = external_id
-    
-    def get_content_hash(self) -> str:
-        """Generate standardized content hash: title + company + location + platform + source_url"""
-        # Normalize all components
-        title_norm = re.sub(r'\s+', ' ', self.title.lower().strip()) if self.title else ""
-        company_norm = re.sub(r'\s+', ' ', self.company.lower().strip()) if self.company else ""
-        location_norm = re.sub(r'\s+', ' ', self.location.lower().strip()) if self.location else ""
-        platform_norm = "remotive"
-        source_url_norm = self.apply_link.lower().strip() if self.apply_link else ""
-        
-        # Combine all components
-        hash_input = f"{title_norm}|{company_norm}|{location_norm}|{platform_norm}|{source_url_norm}"
-        return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+def parse_job(job_data: dict) -> Optional[UnifiedJob]:
+    """Parse a Remotive job into normalized Job schema"""
+    try:
+        title = job_data.get('title', 'Job Posting')[:100]
+        company = job_data.get('company_name', 'Unknown Company')
+        location = job_data.get('candidate_required_location', 'Remote')
+        description = job_data.get('description', '')
+        apply_link = job_data.get('url')
+        external_id = str(job_data.get('id', ''))
+
+        # Parse posted date; undated postings stay None so the watermark filter keeps them without advancing
+        posted_at = None
+        if job_data.get('publication_date'):
+            try:
+                posted_at = datetime.fromisoformat(job_data['publication_date'].replace('Z', '+00:00'))
+            except ValueError:
+                posted_at = None
+
+        return UnifiedJob(
+            title=title,
+            company=company,
+            location=location,
+            description=description,
+            apply_link=apply_link,
+            posted_at=posted_at,
+            external_id=external_id,
+            source="remotive"
+        )
+    except Exception as e:
+        logger.error(f"Error parsing job: {e}")
+        return None
 
 class RemotiveEngine:
     def __init__(self):
         load_dotenv()
         
         # No API key required for Remotive
-        self.base_url = "https://remotive.com/api/remote-jobs"
+        self.base_url = os.getenv('REMOTIVE_BASE_URL', "https://remotive.com/api/remote-jobs")
         
         # Initialize database
         db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
         self.db = DatabaseManager(db_url)
         self.db.create_tables()
+        self.near_dups = NearDuplicateDetector()
+        self.changes = ChangeTracker('remotive', PlatformEnum.REMOTIVE, self.db, self.near_dups)
+        self.parse_stage = ParseStage('remotive')
+        # Pause between queries (none when replaying a cassette)
+        self.query_delay = float(os.getenv('QUERY_DELAY_SECONDS', 0 if cassette.replaying() else 1))
+        self.watermarks = QueryWatermarks(self.db)
     
     async def connect(self):
         """No API key validation needed for Remotive"""
@@ -69,23 +79,7 @@ class RemotiveEngine:
             logger.error(f"Failed to connect to Remotive: {e}")
             return False
     
-    async def get_last_db_timestamp(self) -> datetime:
-        """Get the timestamp of the most recent job from database"""
-        session = self.db.get_session()
-        try:
-            latest_job = session.query(Job).filter(
-                Job.source == PlatformEnum.REMOTIVE
-            ).order_by(Job.posted_at_source.desc()).first()
-            
-            if latest_job and latest_job.posted_at_source:
-                return latest_job.posted_at_source
-            else:
-                # If no Remotive jobs exist, fetch from last 24 hours
-                return datetime.now() - timedelta(hours=24)
-        finally:
-            session.close()
-    
-    async def fetch_jobs(self, keywords: str, location: str, since_timestamp: datetime) -> List[RemotiveJob]:
+    async def fetch_jobs(self, keywords: str, location: str, since_timestamp: datetime) -> List[UnifiedJob]:
         """Fetch jobs from Remotive API"""
         jobs = []
         try:
@@ -95,16 +89,20 @@ class RemotiveEngine:
                 "search": keywords
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with cassette.client_session() as session:
+                started = time.perf_counter()
                 async with session.get(self.base_url, params=params) as response:
+                    body = await response.read()
+                    metrics.record_http('remotive', keywords, response.status, time.perf_counter() - started, len(body))
                     if response.status == 200:
-                        data = await response.json()
+                        data = json.loads(body)
                         job_list = data.get('jobs', [])
                         
-                        for job_data in job_list:
-                            job = self._parse_job(job_data)
-                            if job and self._is_job_newer(job, since_timestamp):
-                                jobs.append(job)
+                        # Parse and hash, offloaded to the parse pool for large batches
+                        parsed = await self.parse_stage.run(parse_job, job_list)
+                        jobs = [job for job in parsed if self._is_job_newer(job, since_timestamp)]
+                        metrics.record_jobs('remotive', 'fetched', len(job_list))
+                        metrics.record_jobs('remotive', 'stale', len(parsed) - len(jobs))
                         
                         logger.info(f"Jobs fetched: {len(jobs)}")
                     else:
@@ -115,66 +113,63 @@ class RemotiveEngine:
         
         return jobs
     
-    def _parse_job(self, job_data: dict) -> Optional[RemotiveJob]:
+    def _parse_job(self, job_data: dict) -> Optional[UnifiedJob]:
         """Parse a Remotive job into normalized Job schema"""
-        try:
-            title = job_data.get('title', 'Job Posting')[:100]
-            company = job_data.get('company_name', 'Unknown Company')
-            location = job_data.get('candidate_required_location', 'Remote')
-            description = job_data.get('description', '')
-            apply_link = job_data.get('url')
-            external_id = str(job_data.get('id', ''))
-            
-            # Parse posted date
-            posted_at = None
-            if job_data.get('publication_date'):
-                try:
-                    posted_at = datetime.fromisoformat(job_data['publication_date'].replace('Z', '+00:00'))
-                except:
-                    posted_at = datetime.now()
-            else:
-                posted_at = datetime.now()
-            
-            return RemotiveJob(
-                title=title,
-                company=company,
-                location=location,
-                description=description,
-                apply_link=apply_link,
-                posted_at=posted_at,
-                external_id=external_id
-            )
-        except Exception as e:
-            logger.error(f"Error parsing job: {e}")
-            return None
+        return parse_job(job_data)
     
-    def _is_job_newer(self, job: RemotiveJob, since_timestamp: datetime) -> bool:
-        """Always return True - timestamp filtering temporarily disabled"""
-        return True
+    def _is_job_newer(self, job: UnifiedJob, since_timestamp: datetime) -> bool:
+        """Drop postings older than the query's watermark (minus the overlap window)"""
+        return self.watermarks.is_newer(job.posted_at, since_timestamp)
     
-    def save_jobs_to_db(self, jobs: List[RemotiveJob]) -> tuple[int, int]:
+    @metrics.timed('remotive', 'save')
+    def save_jobs_to_db(self, jobs: List[UnifiedJob]) -> tuple[int, int]:
         """Save jobs to database with deduplication"""
         if not jobs:
             return 0, 0
         
+        # Known postings (same source and external id) are touched or updated in place, not re-inserted
+        jobs, unchanged_count, _ = self.changes.apply(jobs)
+        
         session = self.db.get_session()
+        # Pending rows go out in the timed flush/commit below rather than inside the lookups
+        session.autoflush = False
+        lookup_timer = metrics.stage('remotive', 'dedup_lookup')
+        near_dup_timer = metrics.stage('remotive', 'near_dup')
+        insert_timer = metrics.stage('remotive', 'insert')
+        fields_timer = metrics.stage('remotive', 'fields')
         inserted_count = 0
-        duplicate_count = 0
+        duplicate_count = unchanged_count
         
         try:
             for job in jobs:
                 content_hash = job.get_content_hash()
                 
                 # Check for duplicates
-                existing_hash = session.query(JobHash).filter_by(content_hash=content_hash).first()
+                with lookup_timer:
+                    existing_hash = session.query(JobHash).filter_by(content_hash=content_hash).first()
                 if existing_hash:
                     duplicate_count += 1
                     continue
                 
+                # Plain-text and normalized columns, derived once for the signature and the row
+                with fields_timer:
+                    fields = job.derived_fields()
+                
+                # Cross-source near-duplicate check
+                canonical_id = None
+                if self.near_dups.enabled:
+                    with near_dup_timer:
+                        signature = self.near_dups.signature(job, fields['description_text'])
+                        canonical_id = self.near_dups.find_duplicate(session, signature, PlatformEnum.REMOTIVE)
+                    if canonical_id and self.near_dups.suppress:
+                        duplicate_count += 1
+                        continue
+                
                 # Insert hash first
                 job_hash = JobHash(content_hash=content_hash)
                 session.add(job_hash)
-                session.flush()  # Get the ID
+                with insert_timer:
+                    session.flush()  # Get the ID
                 
                 # Insert job
                 job_entry = Job(
@@ -187,14 +182,19 @@ class RemotiveEngine:
                     apply_link=job.apply_link,
                     description_html=job.description,
                     posted_at_source=job.posted_at,
-                    raw_data={'external_id': job.external_id}
+                    fingerprint=job.get_fingerprint(),
+                    raw_data={'external_id': job.external_id},
+                    **fields
                 )
                 session.add(job_entry)
+                if self.near_dups.enabled:
+                    self.near_dups.record(session, job_entry, signature, canonical_id)
                 inserted_count += 1
             
             # Single commit at the end
             if inserted_count > 0:
-                session.commit()
+                with metrics.stage('remotive', 'commit'):
+                    session.commit()
                 logger.info(f"DB COMMIT SUCCESS: {inserted_count} jobs inserted")
             
             if duplicate_count > 0:
@@ -211,6 +211,8 @@ class RemotiveEngine:
         finally:
             session.close()
         
+        metrics.record_jobs('remotive', 'inserted', inserted_count)
+        metrics.record_jobs('remotive', 'duplicate', duplicate_count)
         return inserted_count, duplicate_count
 
 async def run_remotive_engine():
@@ -222,9 +224,6 @@ async def run_remotive_engine():
         return
     
     try:
-        # Get last timestamp from database
-        last_timestamp = await engine.get_last_db_timestamp()
-        
         # Load queries from search_queries table
         session = engine.db.get_session()
         queries = session.query(SearchQuery).filter(
@@ -234,20 +233,32 @@ async def run_remotive_engine():
         session.close()
         
         all_jobs = []
+        jobs_by_query = {}
         
-        # Fetch from all queries
+        # Fetch from all queries, each from its own watermark
         for query in queries:
-            jobs = await engine.fetch_jobs(query.value, query.location or "", last_timestamp)
+            jobs = await engine.fetch_jobs(query.value, query.location or "", engine.watermarks.since(query))
+            jobs_by_query[query.id] = jobs
             all_jobs.extend(jobs)
-            await asyncio.sleep(1)  # Rate limiting
+            await asyncio.sleep(engine.query_delay)  # Rate limiting
         
         # Save to database
         inserted, duplicates = engine.save_jobs_to_db(all_jobs)
         
+        # Watermarks only move once their jobs are stored
+        for query_id, jobs in jobs_by_query.items():
+            engine.watermarks.advance(query_id, jobs)
+        
         logger.info(f"Remotive cycle complete - Inserted: {inserted}, Duplicates: {duplicates}")
         
     except Exception as e:
         logger.error(f"Error in Remotive engine: {e}")
 
+class RemotiveAdapter(BaseAdapter):
+    """Remotive remote-jobs API, as registered in engine_registry"""
+    async def run_cycle(self):
+        await run_remotive_engine()
+
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(run_remotive_engine())
\ No newline at end of file
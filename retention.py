@@ -0,0 +1,189 @@
+import os
+import gzip
+import json
+import logging
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+from dotenv import load_dotenv
+from sqlalchemy import select, insert, update, delete, literal, exists
+from database import DatabaseManager, Job, JobHash, JobArchive, ArchivedHash, JobSignature, JobSignatureBand, LinkCheck
+from log_config import setup_logging
+
+logger = logging.getLogger("Retention")
+
+# Columns copied verbatim from jobs into jobs_archive
+ARCHIVE_COLUMNS = [
+    'id', 'hash_id', 'source', 'external_id', 'title', 'company', 'location',
+    'salary_min', 'salary_max', 'currency', 'apply_link', 'description_html',
+    'raw_data', 'posted_at_source', 'created_at', 'listed_at', 'description_text', 'snippet', 'title_norm',
+    'company_norm', 'location_norm', 'fingerprint', 'last_seen_at'
+]
+
+class RetentionManager:
+    def __init__(self, db: DatabaseManager = None):
+        load_dotenv()
+
+        # Retention settings from .env (0 days disables archival)
+        self.retention_days = int(os.getenv('RETENTION_DAYS', 0))
+        self.hash_lookback_days = int(os.getenv('RETENTION_HASH_LOOKBACK_DAYS', 30))
+        self.mode = os.getenv('RETENTION_MODE', 'table').lower()  # 'table' or 'file'
+        self.archive_dir = os.getenv('RETENTION_ARCHIVE_DIR', 'archive')
+        self.batch_size = int(os.getenv('RETENTION_BATCH_SIZE', 1000))
+        self.throttle_seconds = float(os.getenv('RETENTION_THROTTLE_MS', 200)) / 1000
+
+        if self.mode not in ('table', 'file'):
+            raise ValueError(f"Unknown RETENTION_MODE: {self.mode}")
+
+        # Initialize database
+        if db is None:
+            db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
+            db = DatabaseManager(db_url)
+            db.create_tables()
+        self.db = db
+
+    def _next_batch_ids(self, session, cutoff: datetime) -> List[int]:
+        """Oldest job ids created before the cutoff, one batch at a time"""
+        rows = session.execute(
+            select(Job.id)
+            .where(Job.created_at < cutoff)
+            .order_by(Job.id)
+            .limit(self.batch_size)
+        ).scalars().all()
+        return list(rows)
+
+    def _archive_to_table(self, session, ids: List[int]):
+        """Copy rows server-side so job bodies never pass through Python"""
+        columns = [getattr(Job, name) for name in ARCHIVE_COLUMNS]
+        session.execute(
+            insert(JobArchive.__table__).from_select(
+                ARCHIVE_COLUMNS,
+                select(*columns).where(Job.id.in_(ids))
+            )
+        )
+
+    def _archive_to_file(self, session, ids: List[int]):
+        """Append rows to a gzipped JSONL file named after the archive date"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"jobs-{datetime.utcnow():%Y%m%d}.jsonl.gz")
+        columns = [getattr(Job, name) for name in ARCHIVE_COLUMNS]
+        rows = session.execute(select(*columns).where(Job.id.in_(ids))).all()
+
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for row in rows:
+                record = dict(zip(ARCHIVE_COLUMNS, row))
+                record['source'] = record['source'].value if record['source'] else None
+                f.write(json.dumps(record, default=str) + '\n')
+
+    async def archive_jobs(self) -> int:
+        """Move jobs older than RETENTION_DAYS out of the hot table in throttled batches"""
+        if self.retention_days <= 0:
+            logger.info("Job archival disabled (RETENTION_DAYS not set)")
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        archived_count = 0
+
+        while True:
+            session = self.db.get_session()
+            try:
+                ids = self._next_batch_ids(session, cutoff)
+                if not ids:
+                    break
+
+                if self.mode == 'table':
+                    self._archive_to_table(session, ids)
+                else:
+                    self._archive_to_file(session, ids)
+
+                # Remember the hashes so prune_hashes honours the look-back window. A hash can already be
+                # there (restored and re-archived jobs, jobs sharing a hash across batches): restart its window
+                now = datetime.utcnow()
+                batch_hashes = select(Job.hash_id).where(Job.id.in_(ids))
+                session.execute(
+                    update(ArchivedHash.__table__)
+                    .where(ArchivedHash.hash_id.in_(batch_hashes))
+                    .values(archived_at=now)
+                )
+                session.execute(
+                    insert(ArchivedHash.__table__).from_select(
+                        ['hash_id', 'archived_at'],
+                        select(Job.hash_id, literal(now)).where(
+                            Job.id.in_(ids),
+                            ~exists().where(ArchivedHash.hash_id == Job.hash_id)
+                        ).distinct()
+                    )
+                )
+                session.execute(delete(JobSignatureBand).where(JobSignatureBand.job_id.in_(ids)))
+                session.execute(delete(JobSignature).where(JobSignature.job_id.in_(ids)))
+                session.execute(delete(LinkCheck).where(LinkCheck.job_id.in_(ids)))
+                session.execute(delete(Job).where(Job.id.in_(ids)))
+                session.commit()
+                archived_count += len(ids)
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Archive batch failed: {e}")
+                raise
+            finally:
+                session.close()
+
+            # Yield to the writers between batches
+            await asyncio.sleep(self.throttle_seconds)
+
+        logger.info(f"Jobs archived: {archived_count} (older than {self.retention_days} days, mode={self.mode})")
+        return archived_count
+
+    def _next_stale_hash_ids(self, session, lookback_cutoff: datetime) -> List[int]:
+        """Hashes of archived jobs whose look-back window has passed"""
+        rows = session.execute(
+            select(ArchivedHash.hash_id)
+            .where(ArchivedHash.archived_at < lookback_cutoff)
+            .where(ArchivedHash.hash_id.notin_(select(Job.hash_id)))
+            .order_by(ArchivedHash.hash_id)
+            .limit(self.batch_size)
+        ).scalars().all()
+        return list(rows)
+
+    async def prune_hashes(self) -> int:
+        """Delete job_hashes rows that no longer guard against re-inserts"""
+        if self.retention_days <= 0:
+            return 0
+
+        lookback_cutoff = datetime.utcnow() - timedelta(days=self.hash_lookback_days)
+        pruned_count = 0
+
+        while True:
+            session = self.db.get_session()
+            try:
+                ids = self._next_stale_hash_ids(session, lookback_cutoff)
+                if not ids:
+                    break
+                session.execute(delete(JobHash).where(JobHash.id.in_(ids)))
+                session.execute(delete(ArchivedHash).where(ArchivedHash.hash_id.in_(ids)))
+                session.commit()
+                pruned_count += len(ids)
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Hash prune batch failed: {e}")
+                raise
+            finally:
+                session.close()
+
+            await asyncio.sleep(self.throttle_seconds)
+
+        logger.info(f"Stale hashes pruned: {pruned_count} (look-back {self.hash_lookback_days} days)")
+        return pruned_count
+
+async def run_retention():
+    """Single entry function that performs one archive + prune pass"""
+    try:
+        manager = RetentionManager()
+        archived = await manager.archive_jobs()
+        pruned = await manager.prune_hashes()
+        logger.info(f"Retention cycle complete - Archived: {archived}, Hashes pruned: {pruned}")
+    except Exception as e:
+        logger.error(f"Error in retention: {e}")
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(run_retention())
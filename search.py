@@ -0,0 +1,253 @@
+import os
+import re
+import sys
+import logging
+from typing import List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, event, inspect, text, select
+from database import DatabaseManager, Job, PlatformEnum
+from models import derive_fields, html_to_text
+from log_config import setup_logging
+
+logger = logging.getLogger("Search")
+
+_TERM_RE = re.compile(r'\w+', re.U)
+
+# SQLite keeps the index in an FTS5 virtual table
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, location, description,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    # Keep the index in sync with every delete path, including bulk deletes
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        DELETE FROM jobs_fts WHERE rowid = old.id;
+    END""",
+]
+
+# MySQL keeps it in an InnoDB table with a FULLTEXT key; the FK cascade handles deletes
+MYSQL_DDL = [
+    """CREATE TABLE IF NOT EXISTS job_search (
+        job_id INT NOT NULL PRIMARY KEY,
+        title VARCHAR(500),
+        company VARCHAR(255),
+        location VARCHAR(255),
+        description MEDIUMTEXT,
+        FULLTEXT KEY ft_job_search (title, company, location, description),
+        CONSTRAINT fk_job_search_job FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+]
+
+# Index table per dialect, and statements that only run when it is first created
+INDEX_TABLES = {'sqlite': 'jobs_fts', 'mysql': 'job_search'}
+
+SETUP_SQL = {
+    # Column weights for the built-in rank: title > company > location > description
+    'sqlite': ["INSERT INTO jobs_fts(jobs_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 1.0)')"],
+    'mysql': [],
+}
+
+INSERT_SQL = {
+    'sqlite': text("INSERT INTO jobs_fts(rowid, title, company, location, description) "
+                   "VALUES (:job_id, :title, :company, :location, :description)"),
+    'mysql': text("INSERT INTO job_search(job_id, title, company, location, description) "
+                  "VALUES (:job_id, :title, :company, :location, :description)"),
+}
+
+DELETE_SQL = {
+    'sqlite': text("DELETE FROM jobs_fts WHERE rowid = :job_id"),
+    'mysql': text("DELETE FROM job_search WHERE job_id = :job_id"),
+}
+
+CLEAR_SQL = {
+    'sqlite': text("DELETE FROM jobs_fts"),
+    'mysql': text("DELETE FROM job_search"),
+}
+
+# Engines (by URL) whose search index has been created successfully
+_enabled_urls = set()
+
+def _description_text(description_text: Optional[str], description_html: Optional[str]) -> str:
+    """The stored plain text; rows written before it existed are stripped here"""
+    return description_text if description_text is not None else html_to_text(description_html)
+
+def _index_row(job: Job) -> dict:
+    return {
+        'job_id': job.id,
+        'title': job.title or "",
+        'company': job.company or "",
+        'location': job.location or "",
+        'description': _description_text(job.description_text, job.description_html),
+    }
+
+def _insert_rows(connection, rows: List[dict]):
+    """Write index rows using the dialect-specific table"""
+    if rows:
+        connection.execute(INSERT_SQL[connection.dialect.name], rows)
+
+def reindex_rows(connection, rows: List[dict]):
+    """Replace the index rows of jobs updated in place (no-op when the index is off)"""
+    if not rows or str(connection.engine.url) not in _enabled_urls:
+        return
+    connection.execute(DELETE_SQL[connection.dialect.name], [{'job_id': row['job_id']} for row in rows])
+    _insert_rows(connection, rows)
+
+@event.listens_for(Job, 'after_insert')
+def _index_inserted_job(mapper, connection, target):
+    """Index each job in the same transaction as its insert"""
+    if str(connection.engine.url) not in _enabled_urls:
+        return
+    _insert_rows(connection, [_index_row(target)])
+
+def _quote_terms(query: str) -> List[str]:
+    """Split a free-text query into terms safe for MATCH syntax"""
+    return _TERM_RE.findall(query.lower())
+
+def backfill_derived_fields(db: DatabaseManager, batch_size: int = 5000) -> int:
+    """Fill the derived text columns on rows stored before they existed, in keyset-paginated batches"""
+    jobs = Job.__table__
+    statement = jobs.update().where(jobs.c.id == bindparam('job_id'))
+    filled_count = 0
+    last_id = 0
+
+    while True:
+        with db.engine.begin() as conn:
+            rows = conn.execute(
+                select(Job.id, Job.title, Job.company, Job.location, Job.description_html)
+                .where(Job.id > last_id, Job.description_text.is_(None))
+                .order_by(Job.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            conn.execute(statement, [
+                {'job_id': row.id, **derive_fields(row.title, row.company, row.location, row.description_html)}
+                for row in rows
+            ])
+            last_id = rows[-1].id
+            filled_count += len(rows)
+
+    logger.info(f"Derived fields backfilled: {filled_count} jobs")
+    return filled_count
+
+class SearchIndex:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self.dialect = db.engine.dialect.name
+
+    def create(self) -> bool:
+        """Create the full-text index and start syncing inserts into it; a new index is filled from jobs first"""
+        try:
+            ddl_statements = {'sqlite': SQLITE_DDL, 'mysql': MYSQL_DDL}.get(self.dialect)
+            if ddl_statements is None:
+                logger.warning(f"Full-text search not supported on {self.dialect}")
+                return False
+            with self.db.engine.begin() as conn:
+                created = not inspect(conn).has_table(INDEX_TABLES[self.dialect])
+                for ddl in ddl_statements:
+                    conn.execute(text(ddl))
+                if created:
+                    for statement in SETUP_SQL[self.dialect]:
+                        conn.execute(text(statement))
+            # Jobs stored before the index existed are only reachable through a rebuild
+            if created:
+                self.rebuild()
+        except Exception as e:
+            # Older SQLite builds ship without FTS5; inserts must keep working
+            logger.error(f"Failed to create search index: {e}")
+            return False
+
+        _enabled_urls.add(str(self.db.engine.url))
+        return True
+
+    def rebuild(self, batch_size: int = 5000) -> int:
+        """Re-index all jobs in keyset-paginated batches"""
+        indexed_count = 0
+        last_id = 0
+
+        with self.db.engine.begin() as conn:
+            conn.execute(CLEAR_SQL[self.dialect])
+
+        while True:
+            with self.db.engine.begin() as conn:
+                rows = conn.execute(
+                    select(Job.id, Job.title, Job.company, Job.location, Job.description_text, Job.description_html)
+                    .where(Job.id > last_id)
+                    .order_by(Job.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+
+                _insert_rows(conn, [
+                    {
+                        'job_id': row.id,
+                        'title': row.title or "",
+                        'company': row.company or "",
+                        'location': row.location or "",
+                        'description': _description_text(row.description_text, row.description_html),
+                    }
+                    for row in rows
+                ])
+                last_id = rows[-1].id
+                indexed_count += len(rows)
+
+        logger.info(f"Search index rebuilt: {indexed_count} jobs")
+        return indexed_count
+
+    def search(self, query: str, limit: int = 20, source: Optional[PlatformEnum] = None) -> List[dict]:
+        """Ranked keyword search; every term must match"""
+        terms = _quote_terms(query)
+        if not terms:
+            return []
+
+        params = {'limit': limit}
+        source_filter = ""
+        if source is not None:
+            source_filter = " AND j.source = :source"
+            params['source'] = source.name
+
+        if self.dialect == 'sqlite':
+            params['match'] = ' '.join(f'"{term}"' for term in terms)
+            if source is None:
+                # Let FTS5 pick the top hits by rank before touching jobs
+                hits = "SELECT rowid, rank FROM jobs_fts WHERE jobs_fts MATCH :match ORDER BY rank LIMIT :limit"
+            else:
+                hits = ("SELECT jobs_fts.rowid, jobs_fts.rank FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid "
+                        f"WHERE jobs_fts MATCH :match{source_filter} ORDER BY jobs_fts.rank LIMIT :limit")
+            sql = (
+                "SELECT j.id, j.source, j.title, j.company, j.location, j.apply_link, j.posted_at_source, "
+                f"f.rank AS score FROM ({hits}) f JOIN jobs j ON j.id = f.rowid ORDER BY f.rank"
+            )
+        else:
+            params['match'] = ' '.join(f'+{term}' for term in terms)
+            sql = (
+                "SELECT j.id, j.source, j.title, j.company, j.location, j.apply_link, j.posted_at_source, "
+                "MATCH(s.title, s.company, s.location, s.description) AGAINST (:match IN BOOLEAN MODE) AS score "
+                "FROM job_search s JOIN jobs j ON j.id = s.job_id "
+                "WHERE MATCH(s.title, s.company, s.location, s.description) AGAINST (:match IN BOOLEAN MODE)"
+                f"{source_filter} ORDER BY score DESC LIMIT :limit"
+            )
+
+        with self.db.engine.connect() as conn:
+            rows = conn.execute(text(sql), params).mappings().all()
+        return [dict(row) for row in rows]
+
+if __name__ == "__main__":
+    setup_logging()
+    load_dotenv()
+
+    db = DatabaseManager(os.getenv('DATABASE_URL', 'sqlite:///jobs.db'))
+    db.create_tables()
+    index = SearchIndex(db)
+
+    if len(sys.argv) < 2:
+        print("Usage: python search.py <keywords> | --rebuild | --backfill-fields")
+    elif sys.argv[1] == '--rebuild':
+        index.rebuild()
+    elif sys.argv[1] == '--backfill-fields':
+        backfill_derived_fields(db)
+    else:
+        for hit in index.search(' '.join(sys.argv[1:])):
+            print(f"[{hit['source']}] {hit['title']} - {hit['company']} ({hit['location']}) {hit['apply_link'] or ''}")
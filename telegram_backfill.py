@@ -0,0 +1,147 @@
+import os
+import logging
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from telethon.errors import FloodWaitError
+from database import TelegramBackfill
+from telegram_engine import TelegramEngine, parse_message
+from log_config import setup_logging
+
+logger = logging.getLogger("TelegramBackfill")
+
+class TelegramBackfiller:
+    """Walks a group's history newest-to-oldest in chunks, committing jobs and a resume cursor per chunk"""
+    def __init__(self, engine: TelegramEngine = None, chunk_size: int = None, use_takeout: bool = False):
+        self.engine = engine or TelegramEngine()
+        self.chunk_size = chunk_size or int(os.getenv('TELEGRAM_BACKFILL_CHUNK_SIZE', 500))
+        self.use_takeout = use_takeout
+
+    def _load_cursor(self, group_name: str):
+        session = self.engine.db.get_session()
+        try:
+            cursor = session.get(TelegramBackfill, group_name)
+            if cursor:
+                session.expunge(cursor)
+            return cursor
+        finally:
+            session.close()
+
+    def _save_cursor(self, cursor: TelegramBackfill):
+        session = self.engine.db.get_session()
+        try:
+            session.merge(cursor)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @asynccontextmanager
+    async def _history_client(self):
+        """Takeout sessions get far more lenient flood limits for bulk exports"""
+        if self.use_takeout:
+            async with self.engine.client.takeout(finalize=True, contacts=False, users=False,
+                                                  chats=True, megagroups=True, channels=True) as takeout:
+                yield takeout
+        else:
+            yield self.engine.client
+
+    async def _get_chunk(self, client, entity, offset_id: int):
+        """Fetch one chunk, sitting out flood waits (nothing else runs in this command)"""
+        while True:
+            try:
+                await self.engine.budget.acquire()
+                return await client.get_messages(entity, limit=self.chunk_size, offset_id=offset_id)
+            except FloodWaitError as e:
+                logger.warning(f"Flood wait during backfill: {e.seconds} seconds")
+                await asyncio.sleep(e.seconds)
+
+    async def backfill(self, group_name: str, stop_date: datetime, restart: bool = False) -> TelegramBackfill:
+        entity = await self.engine.resolve_group_entity(group_name)
+        if not entity:
+            raise RuntimeError(f"Telegram group not found: {group_name}")
+
+        cursor = None if restart else self._load_cursor(group_name)
+        if cursor and cursor.completed_at:
+            logger.info(f"Backfill of {group_name} already completed at {cursor.completed_at}")
+            return cursor
+
+        async with self._history_client() as client:
+            if cursor is None:
+                head = await client.get_messages(entity, limit=1)
+                if not head:
+                    raise RuntimeError(f"Telegram group has no messages: {group_name}")
+                cursor = TelegramBackfill(
+                    group_name=group_name,
+                    head_message_id=head[0].id,
+                    offset_id=head[0].id + 1,
+                    stop_date=stop_date,
+                    messages_scanned=0,
+                    jobs_inserted=0
+                )
+                # Incremental fetches carry on from the head, the backfill covers everything below it
+                if self.engine._load_checkpoint(group_name) is None:
+                    self.engine.advance_checkpoint(group_name, head[0].id)
+                    self.engine.save_checkpoints()
+                self._save_cursor(cursor)
+            else:
+                logger.info(f"Resuming backfill of {group_name} below message {cursor.offset_id}")
+
+            while True:
+                messages = await self._get_chunk(client, entity, cursor.offset_id)
+                if not messages:
+                    break
+
+                payloads = []
+                reached_stop = False
+                for message in messages:
+                    if message.date.replace(tzinfo=None) < cursor.stop_date:
+                        reached_stop = True
+                        break
+                    if message.text:
+                        payloads.append((message.text, message.date, message.id, group_name))
+
+                # Parse, hash and commit this chunk before moving the cursor past it
+                jobs = await self.engine.parse_stage.run(parse_message, payloads)
+                inserted, _ = self.engine.save_jobs_to_db(jobs)
+
+                cursor.offset_id = messages[-1].id
+                cursor.messages_scanned += len(messages)
+                cursor.jobs_inserted += inserted
+                self._save_cursor(cursor)
+                logger.info(f"Backfill {group_name}: {cursor.messages_scanned} messages scanned, "
+                            f"{cursor.jobs_inserted} jobs inserted, at {messages[-1].date:%Y-%m-%d}")
+
+                if reached_stop or len(messages) < self.chunk_size:
+                    break
+
+        cursor.completed_at = datetime.utcnow()
+        self._save_cursor(cursor)
+        logger.info(f"Backfill of {group_name} complete: {cursor.jobs_inserted} jobs inserted")
+        return cursor
+
+async def run_telegram_backfill(group_name: str, days: int, restart: bool = False, use_takeout: bool = False):
+    """Entry point: backfill one group down to `days` ago, resuming any interrupted run"""
+    backfiller = TelegramBackfiller(use_takeout=use_takeout)
+    if not await backfiller.engine.connect():
+        return
+    try:
+        await backfiller.backfill(group_name, datetime.utcnow() - timedelta(days=days), restart=restart)
+    except Exception as e:
+        logger.error(f"Error in Telegram backfill: {e}")
+    finally:
+        await backfiller.engine.client.disconnect()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable historical backfill of a Telegram group")
+    parser.add_argument('group', help="Group name, @username or id (as in TELEGRAM_GROUPS)")
+    parser.add_argument('--days', type=int, default=90, help="How far back to go")
+    parser.add_argument('--restart', action='store_true', help="Ignore a saved cursor and start from the newest message")
+    parser.add_argument('--takeout', action='store_true', help="Use a takeout session (must be approved in the app)")
+    args = parser.parse_args()
+    setup_logging()
+
+    asyncio.run(run_telegram_backfill(args.group, args.days, restart=args.restart, use_takeout=args.takeout))
@@ -1,59 +1,112 @@
 import os
 import logging
-import hashlib
-import sys
 from datetime import datetime, timedelta
 from typing import List, Optional
 from dotenv import load_dotenv
 from telethon import TelegramClient
 from telethon.sessions import StringSession
-from telethon.errors import FloodWaitError
+from telethon.errors import (
+    FloodWaitError, ChannelInvalidError, ChannelPrivateError, ChatIdInvalidError, PeerIdInvalidError, UserIdInvalidError
+)
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser
+from telethon import utils as telethon_utils
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from database import DatabaseManager, JobHash, Job, PlatformEnum
+from database import DatabaseManager, JobHash, Job, PlatformEnum, TelegramEntity, TelegramCheckpoint
+from near_duplicates import NearDuplicateDetector
+from models import UnifiedJob, BaseAdapter
+from parse_pool import ParseStage
+import metrics
+from log_config import setup_logging
+import cassette
+from job_classifier import classify_message
 import asyncio
 import re
+import time
+from dataclasses import dataclass, field
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log", encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-# Set console handler encoding for Windows
-for handler in logging.getLogger().handlers:
-    if isinstance(handler, logging.StreamHandler) and handler.stream == sys.stdout:
-        handler.stream.reconfigure(encoding='utf-8', errors='replace')
 logger = logging.getLogger("TelegramEngine")
 
-class TelegramJob:
-    def __init__(self, title: str, company: str, location: str, description: str, 
-                 apply_link: Optional[str] = None, posted_at: Optional[datetime] = None, 
-                 source: str = "telegram", external_id: Optional[str] = None):
-        self.title = title
-        self.company = company
-        self.location = location
-        self.description = description
-        self.apply_link = apply_link
-        self.posted_at = posted_at
-        self.source = source
-        self.external_id = external_id
+# Errors meaning a cached peer no longer points at the group (left, migrated, access hash revoked).
+# Anything else (timeouts, dropped connections) is transient and must not touch the cache or checkpoint
+STALE_PEER_ERRORS = (ValueError, ChannelInvalidError, ChannelPrivateError, ChatIdInvalidError,
+                     PeerIdInvalidError, UserIdInvalidError)
+
+_URL_RE = re.compile(r'https?://[^\s]+')
+
+def parse_message(payload: tuple) -> Optional[UnifiedJob]:
+    """Parse a raw (text, date, message_id, group_name) payload into a normalized Job schema"""
+    text, date, message_id, group_name = payload
+    text = text.strip() if text else ""
+    if not text:
+        return None
     
-    def get_content_hash(self) -> str:
-        """Generate standardized content hash: title + company + location + platform + source_url"""
-        # Normalize all components
-        title_norm = re.sub(r'\s+', ' ', self.title.lower().strip()) if self.title else ""
-        company_norm = re.sub(r'\s+', ' ', self.company.lower().strip()) if self.company else ""
-        location_norm = re.sub(r'\s+', ' ', self.location.lower().strip()) if self.location else ""
-        platform_norm = "telegram"
-        source_url_norm = self.apply_link.lower().strip() if self.apply_link else ""
-        
-        # Combine all components
-        hash_input = f"{title_norm}|{company_norm}|{location_norm}|{platform_norm}|{source_url_norm}"
-        return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+    # Drop chatter and ads before any hashing or DB work
+    fields = classify_message(text)
+    if fields is None:
+        return None
+    
+    lines = text.split('\n')
+    
+    # Extract title (first line, truncated to 100 chars)
+    title = lines[0][:100] if lines else "Job Posting"
+    
+    # Extract apply link (first URL found)
+    match = _URL_RE.search(text)
+    apply_link = match.group(0) if match else None
+    
+    # Company/location from the post itself, falling back to the group and India
+    fallback_company = f"Telegram: {group_name}"
+    
+    job = UnifiedJob(
+        title=title,
+        company=fields.company or fallback_company,
+        location=fields.location or "India",
+        description=text,
+        apply_link=apply_link,
+        posted_at=date,
+        external_id=str(message_id),
+        source="telegram",
+        salary_min=fields.salary_min,
+        salary_max=fields.salary_max,
+        currency=fields.currency or 'INR',
+        raw_data={'group': group_name, 'job_score': fields.score}
+    )
+    # The hash keeps the fallback identity so messages stored before extraction existed stay duplicates
+    return job.hash_as(fallback_company, "India")
+
+class RequestBudget:
+    """Token bucket shared by all concurrent group fetches"""
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+@dataclass
+class GroupFetch:
+    """Progress of one group's fetch; survives FloodWait reschedules"""
+    group_name: str
+    entity: object = None
+    from_cache: bool = False
+    min_id: Optional[int] = None
+    offset_id: int = 0
+    max_id: int = 0
+    message_count: int = 0
+    complete: bool = False
+    payloads: list = field(default_factory=list)
 
 class TelegramEngine:
     def __init__(self):
@@ -64,14 +117,36 @@ class TelegramEngine:
         self.api_hash = os.getenv('TELEGRAM_API_HASH')
         self.session_string = os.getenv('TELEGRAM_SESSION_STRING')
         self.groups = [g.strip() for g in os.getenv('TELEGRAM_GROUPS', '').split(',') if g.strip()]
+        # Message cap for a group's first fetch, before it has a checkpoint
+        self.initial_limit = int(os.getenv('TELEGRAM_INITIAL_LIMIT', 500))
+        # Time window for a fetch with nothing stored yet (message dates are UTC)
+        self.initial_lookback = timedelta(hours=float(os.getenv('TELEGRAM_INITIAL_LOOKBACK_HOURS', 24)))
+        self.pending_checkpoints = {}
+        
+        # Concurrent group fetching under one shared request budget
+        self.concurrency = int(os.getenv('TELEGRAM_CONCURRENCY', 5))
+        self.max_flood_wait = int(os.getenv('TELEGRAM_MAX_FLOOD_WAIT', 600))
+        self.page_size = 100
+        self.budget = RequestBudget(
+            float(os.getenv('TELEGRAM_REQUESTS_PER_SECOND', 1000 if cassette.replaying() else 5)),
+            int(os.getenv('TELEGRAM_REQUEST_BURST', 10))
+        )
+        self._slots = asyncio.Semaphore(self.concurrency)
         
         # Initialize Telethon client with StringSession
-        self.client = TelegramClient(StringSession(self.session_string), self.api_id, self.api_hash)
+        # flood_sleep_threshold=0: every FloodWait is parked by our scheduler instead of
+        # sleeping inline while holding a concurrency slot
+        # (wrapped for recording, or replaced for replay, when a cassette is active)
+        self.client = cassette.telegram_client(lambda: TelegramClient(
+            StringSession(self.session_string), self.api_id, self.api_hash, flood_sleep_threshold=0
+        ))
         
         # Initialize database
         db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
         self.db = DatabaseManager(db_url)
         self.db.create_tables()
+        self.near_dups = NearDuplicateDetector()
+        self.parse_stage = ParseStage('telegram')
     
     async def connect(self):
         """Connect to Telegram"""
@@ -96,8 +171,48 @@ class TelegramEngine:
             if latest_job and latest_job.posted_at_source:
                 return latest_job.posted_at_source
             else:
-                # If no Telegram jobs exist, fetch from last 24 hours
-                return datetime.now() - timedelta(hours=24)
+                # If no Telegram jobs exist, fetch from the initial lookback window (24 hours by default)
+                return datetime.utcnow() - self.initial_lookback
+        finally:
+            session.close()
+    
+    def _load_checkpoint(self, group_name: str) -> Optional[int]:
+        """Last message id fetched from the group, or None on its first fetch"""
+        session = self.db.get_session()
+        try:
+            checkpoint = session.get(TelegramCheckpoint, group_name)
+            return checkpoint.last_message_id if checkpoint else None
+        finally:
+            session.close()
+    
+    def advance_checkpoint(self, group_name: str, message_id: int):
+        """Record a fetched message id for the next save; checkpoints never move backwards"""
+        self.pending_checkpoints[group_name] = max(self.pending_checkpoints.get(group_name, 0), message_id)
+    
+    def save_checkpoints(self):
+        """Persist checkpoints for this cycle; call only after its jobs are saved"""
+        if not self.pending_checkpoints:
+            return
+        # Swap first so new checkpoints can accumulate while this batch is written
+        checkpoints, self.pending_checkpoints = self.pending_checkpoints, {}
+        session = self.db.get_session()
+        try:
+            for group_name, last_message_id in checkpoints.items():
+                session.merge(TelegramCheckpoint(group_name=group_name, last_message_id=last_message_id))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            for group_name, last_message_id in checkpoints.items():
+                self.advance_checkpoint(group_name, last_message_id)
+            logger.error(f"Failed to save Telegram checkpoints: {e}")
+        finally:
+            session.close()
+    
+    def _clear_checkpoint(self, group_name: str):
+        session = self.db.get_session()
+        try:
+            session.query(TelegramCheckpoint).filter_by(group_name=group_name).delete()
+            session.commit()
         finally:
             session.close()
     
@@ -108,7 +223,70 @@ class TelegramEngine:
         # Replace common problematic Unicode characters
         return text.encode('ascii', errors='replace').decode('ascii')
     
+    def _load_cached_entity(self, group_name: str):
+        """Input peer for a previously resolved group, or None"""
+        session = self.db.get_session()
+        try:
+            cached = session.get(TelegramEntity, group_name)
+            if not cached:
+                return None
+            if cached.peer_type == 'channel':
+                return InputPeerChannel(cached.entity_id, cached.access_hash)
+            if cached.peer_type == 'chat':
+                return InputPeerChat(cached.entity_id)
+            return InputPeerUser(cached.entity_id, cached.access_hash)
+        finally:
+            session.close()
+    
+    def _store_cached_entity(self, group_name: str, entity):
+        """Persist the id and access hash of a freshly resolved entity"""
+        peer = telethon_utils.get_input_peer(entity)
+        if isinstance(peer, InputPeerChannel):
+            peer_type, entity_id, access_hash = 'channel', peer.channel_id, peer.access_hash
+        elif isinstance(peer, InputPeerChat):
+            peer_type, entity_id, access_hash = 'chat', peer.chat_id, None
+        elif isinstance(peer, InputPeerUser):
+            peer_type, entity_id, access_hash = 'user', peer.user_id, peer.access_hash
+        else:
+            return
+        
+        session = self.db.get_session()
+        try:
+            title = getattr(entity, 'title', None) or getattr(entity, 'username', None)
+            session.merge(TelegramEntity(
+                group_name=group_name,
+                peer_type=peer_type,
+                entity_id=entity_id,
+                access_hash=access_hash,
+                title=title[:255] if title else None
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Could not cache entity for {group_name}: {e}")
+        finally:
+            session.close()
+    
+    def _invalidate_cached_entity(self, group_name: str):
+        session = self.db.get_session()
+        try:
+            session.query(TelegramEntity).filter_by(group_name=group_name).delete()
+            session.commit()
+        finally:
+            session.close()
+    
     async def resolve_group_entity(self, group_name: str):
+        """Resolve group string to an entity, using the persistent cache when possible"""
+        peer = self._load_cached_entity(group_name)
+        if peer:
+            return peer
+        
+        entity = await self._resolve_group_entity_remote(group_name)
+        if entity:
+            self._store_cached_entity(group_name, entity)
+        return entity
+    
+    async def _resolve_group_entity_remote(self, group_name: str):
         """Resolve group string to entity using display name, username, or ID"""
         try:
             # First try direct entity resolution (for @username or ID)
@@ -118,6 +296,8 @@ class TelegramEngine:
                 safe_title = self._sanitize_for_log(title)
                 logger.info(f"Resolved Telegram group: {safe_title} (id={entity.id})")
                 return entity
+            except FloodWaitError:
+                raise
             except:
                 pass
             
@@ -157,76 +337,128 @@ class TelegramEngine:
             logger.error(f"Telegram group not found: {group_name}")
             return None
             
+        except FloodWaitError:
+            raise
         except Exception as e:
             logger.error(f"Error resolving group {group_name}: {e}")
             return None
-    async def fetch_messages_from_group(self, group_name: str, since: datetime) -> List[TelegramJob]:
-        """Fetch messages from a specific group newer than the given timestamp"""
-        jobs = []
+    
+    async def fetch_messages_from_group(self, group_name: str, since: datetime) -> List[UnifiedJob]:
+        """Fetch messages from a specific group newer than its checkpoint (or the given timestamp)"""
+        state = GroupFetch(group_name)
+        
+        while True:
+            try:
+                async with self._slots:
+                    await self._run_group_fetch(state, since)
+                break
+            except FloodWaitError as e:
+                if e.seconds > self.max_flood_wait:
+                    logger.warning(f"Flood wait for {group_name}: {e.seconds} seconds exceeds limit, "
+                                   f"keeping {len(state.payloads)} partial messages")
+                    break
+                # Park only this group; its slot is free for the others meanwhile
+                logger.warning(f"Flood wait for {group_name}: {e.seconds} seconds, rescheduling")
+                await asyncio.sleep(e.seconds)
+            except Exception as e:
+                logger.error(f"Error fetching from {group_name}: {e}")
+                break
+        
+        # Advance the checkpoint only when every message up to it was seen
+        if state.complete and state.max_id:
+            self.advance_checkpoint(group_name, state.max_id)
+        
+        # Parse and hash, offloaded to the parse pool for large batches
+        jobs = await self.parse_stage.run(parse_message, state.payloads)
+        logger.info(f"Messages scanned: {state.message_count}")
+        return jobs
+    
+    async def _run_group_fetch(self, state: GroupFetch, since: datetime):
+        """Resolve the group (once) and fetch pages from where the state left off"""
+        group_name = state.group_name
+        if state.entity is None:
+            state.entity = self._load_cached_entity(group_name)
+            state.from_cache = state.entity is not None
+            if not state.from_cache:
+                state.entity = await self.resolve_group_entity(group_name)
+            if not state.entity:
+                return
+            state.min_id = self._load_checkpoint(group_name)
+        
         try:
-            # Resolve group entity first
-            entity = await self.resolve_group_entity(group_name)
-            if not entity:
-                return jobs
+            await self._collect_pages(state, since)
+        except STALE_PEER_ERRORS as e:
+            if not state.from_cache or state.message_count:
+                raise
+            # Cached peer went stale: resolve afresh once
+            logger.warning(f"Cached entity for {group_name} failed ({e}); re-resolving")
+            stale_id = telethon_utils.get_peer_id(state.entity)
+            self._invalidate_cached_entity(group_name)
+            state.from_cache = False
+            state.entity = await self.resolve_group_entity(group_name)
+            if not state.entity:
+                return
+            if telethon_utils.get_peer_id(state.entity) != stale_id:
+                # A different chat (e.g. a group migrated to a supergroup) restarts message ids
+                self._clear_checkpoint(group_name)
+                state.min_id = None
+            await self._collect_pages(state, since)
+    
+    async def _collect_pages(self, state: GroupFetch, since: datetime):
+        """Page newest-to-oldest, one budget token per request, recording progress on the state"""
+        while True:
+            limit = self.page_size
+            if not state.min_id:
+                # First fetch: capped, and cut off at the timestamp
+                limit = min(limit, self.initial_limit - state.message_count)
+                if limit <= 0:
+                    break
+            
+            with metrics.stage('telegram', 'budget_wait'):
+                await self.budget.acquire()
+            with metrics.stage('telegram', 'get_messages'):
+                messages = await self.client.get_messages(
+                    state.entity, limit=limit, offset_id=state.offset_id, min_id=state.min_id or 0
+                )
+            if not messages:
+                break
+            metrics.record_jobs('telegram', 'fetched', len(messages))
             
-            message_count = 0
-            async for message in self.client.iter_messages(entity, limit=500):
-                message_count += 1
+            reached_since = False
+            for message in messages:
+                state.message_count += 1
+                state.max_id = max(state.max_id, message.id)
                 
-                # Stop if message is older than our timestamp
-                if message.date.replace(tzinfo=None) < since.replace(tzinfo=None):
+                if not state.min_id and message.date.replace(tzinfo=None) < since.replace(tzinfo=None):
+                    reached_since = True
                     break
                 
                 if message.text:
-                    job = self._parse_message(message, group_name)
-                    if job:
-                        jobs.append(job)
-            
-            logger.info(f"Messages scanned: {message_count}")
+                    state.payloads.append((message.text, message.date, message.id, state.group_name))
             
-        except FloodWaitError as e:
-            logger.warning(f"Flood wait for {group_name}: {e.seconds} seconds")
-            await asyncio.sleep(e.seconds)
-        except Exception as e:
-            logger.error(f"Error fetching from {group_name}: {e}")
+            state.offset_id = messages[-1].id
+            if reached_since or len(messages) < limit:
+                break
         
-        return jobs
+        state.complete = True
     
-    def _parse_message(self, message, group_name: str) -> Optional[TelegramJob]:
+    def _parse_message(self, message, group_name: str) -> Optional[UnifiedJob]:
         """Parse a Telegram message into a normalized Job schema"""
-        text = message.text.strip()
-        if not text:
-            return None
-        
-        lines = text.split('\n')
-        
-        # Extract title (first line, truncated to 100 chars)
-        title = lines[0][:100] if lines else "Job Posting"
-        
-        # Extract apply link (first URL found)
-        url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, text)
-        apply_link = urls[0] if urls else None
-        
-        # Company = "Telegram: " + group_name
-        company = f"Telegram: {group_name}"
-        
-        return TelegramJob(
-            title=title,
-            company=company,
-            location="India",  # Default to India
-            description=text,
-            apply_link=apply_link,
-            posted_at=message.date,
-            external_id=str(message.id)
-        )
+        return parse_message((message.text, message.date, message.id, group_name))
     
-    def save_jobs_to_db(self, jobs: List[TelegramJob]) -> tuple[int, int]:
+    @metrics.timed('telegram', 'save')
+    def save_jobs_to_db(self, jobs: List[UnifiedJob]) -> tuple[int, int]:
         """Save jobs to database with deduplication"""
         if not jobs:
             return 0, 0
         
         session = self.db.get_session()
+        # Pending rows go out in the timed flush/commit below rather than inside the lookups
+        session.autoflush = False
+        lookup_timer = metrics.stage('telegram', 'dedup_lookup')
+        near_dup_timer = metrics.stage('telegram', 'near_dup')
+        insert_timer = metrics.stage('telegram', 'insert')
+        fields_timer = metrics.stage('telegram', 'fields')
         inserted_count = 0
         duplicate_count = 0
         
@@ -235,15 +467,31 @@ class TelegramEngine:
                 content_hash = job.get_content_hash()
                 
                 # Check for duplicates
-                existing_hash = session.query(JobHash).filter_by(content_hash=content_hash).first()
+                with lookup_timer:
+                    existing_hash = session.query(JobHash).filter_by(content_hash=content_hash).first()
                 if existing_hash:
                     duplicate_count += 1
                     continue
                 
+                # Plain-text and normalized columns, derived once for the signature and the row
+                with fields_timer:
+                    fields = job.derived_fields()
+                
+                # Cross-source near-duplicate check
+                canonical_id = None
+                if self.near_dups.enabled:
+                    with near_dup_timer:
+                        signature = self.near_dups.signature(job, fields['description_text'])
+                        canonical_id = self.near_dups.find_duplicate(session, signature, PlatformEnum.TELEGRAM)
+                    if canonical_id and self.near_dups.suppress:
+                        duplicate_count += 1
+                        continue
+                
                 # Insert hash first
                 job_hash = JobHash(content_hash=content_hash)
                 session.add(job_hash)
-                session.flush()  # Get the ID
+                with insert_timer:
+                    session.flush()  # Get the ID
                 
                 # Insert job
                 job_entry = Job(
@@ -253,17 +501,24 @@ class TelegramEngine:
                     title=job.title[:500],
                     company=job.company[:255],
                     location=job.location[:255],
+                    salary_min=job.salary_min,
+                    salary_max=job.salary_max,
+                    currency=job.currency,
                     apply_link=job.apply_link,
                     description_html=job.description,
                     posted_at_source=job.posted_at,
-                    raw_data={'message_id': job.external_id}
+                    raw_data={'message_id': job.external_id, **(job.raw_data or {})},
+                    **fields
                 )
                 session.add(job_entry)
+                if self.near_dups.enabled:
+                    self.near_dups.record(session, job_entry, signature, canonical_id)
                 inserted_count += 1
             
             # Single commit at the end
             if inserted_count > 0:
-                session.commit()
+                with metrics.stage('telegram', 'commit'):
+                    session.commit()
                 logger.info(f"DB COMMIT SUCCESS: {inserted_count} jobs inserted")
             
             if duplicate_count > 0:
@@ -280,6 +535,8 @@ class TelegramEngine:
         finally:
             session.close()
         
+        metrics.record_jobs('telegram', 'inserted', inserted_count)
+        metrics.record_jobs('telegram', 'duplicate', duplicate_count)
         return inserted_count, duplicate_count
 
 async def run_telegram_engine():
@@ -296,14 +553,16 @@ async def run_telegram_engine():
         
         all_jobs = []
         
-        # Fetch from all groups
-        for group in engine.groups:
-            if group:
-                jobs = await engine.fetch_messages_from_group(group, last_timestamp)
-                all_jobs.extend(jobs)
+        # Fetch from all groups concurrently
+        results = await asyncio.gather(*[
+            engine.fetch_messages_from_group(group, last_timestamp) for group in engine.groups if group
+        ])
+        for jobs in results:
+            all_jobs.extend(jobs)
         
         # Save to database
         inserted, duplicates = engine.save_jobs_to_db(all_jobs)
+        engine.save_checkpoints()
         
         logger.info(f"Telegram cycle complete - Inserted: {inserted}, Duplicates: {duplicates}")
         
@@ -312,5 +571,11 @@ async def run_telegram_engine():
     finally:
         await engine.client.disconnect()
 
+class TelegramAdapter(BaseAdapter):
+    """Telegram group history (poll mode), as registered in engine_registry"""
+    async def run_cycle(self):
+        await run_telegram_engine()
+
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(run_telegram_engine())
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import logging
+import asyncio
+from datetime import datetime
+from typing import Dict, List
+from telethon import events
+from telethon import utils as telethon_utils
+from telegram_engine import TelegramEngine, parse_message
+import metrics
+from log_config import setup_logging
+
+logger = logging.getLogger("TelegramListener")
+
+class TelegramListener:
+    """Keeps one authorized client connected and ingests new group messages as they arrive"""
+    def __init__(self, engine: TelegramEngine = None):
+        self.engine = engine or TelegramEngine()
+        self.flush_seconds = float(os.getenv('TELEGRAM_LISTEN_FLUSH_SECONDS', 5))
+        self.reconnect_seconds = float(os.getenv('TELEGRAM_LISTEN_RECONNECT_SECONDS', 30))
+        self.running = True
+        self.payloads: List[tuple] = []
+        self.group_by_peer: Dict[int, str] = {}
+        self._flush_lock = asyncio.Lock()
+
+    async def stop(self):
+        self.running = False
+        await self.engine.client.disconnect()
+
+    async def _resolve_groups(self) -> list:
+        """Resolve configured groups and map their peer ids back to group names"""
+        entities = []
+        self.group_by_peer = {}
+        for group_name in self.engine.groups:
+            entity = await self.engine.resolve_group_entity(group_name)
+            if entity:
+                entities.append(entity)
+                self.group_by_peer[telethon_utils.get_peer_id(entity)] = group_name
+        return entities
+
+    async def _on_new_message(self, event):
+        group_name = self.group_by_peer.get(event.chat_id)
+        message = event.message
+        if not group_name or not message:
+            return
+        # Non-text messages are kept too so the checkpoint can move past them
+        self.payloads.append((message.text, message.date, message.id, group_name))
+        metrics.QUEUE_DEPTH.set(len(self.payloads), queue='telegram_listener')
+
+    async def catch_up(self):
+        """Fill the gap since each group's checkpoint (startup and every reconnect)"""
+        since = datetime.utcnow() - self.engine.initial_lookback
+        results = await asyncio.gather(*[
+            self.engine.fetch_messages_from_group(group_name, since) for group_name in self.engine.groups
+        ])
+        jobs = [job for group_jobs in results for job in group_jobs]
+        await self._save(jobs)
+        logger.info(f"Catch-up complete: {len(jobs)} messages")
+
+    async def flush(self):
+        """Micro-batch: parse and insert everything received since the last flush"""
+        async with self._flush_lock:
+            payloads, self.payloads = self.payloads, []
+            metrics.QUEUE_DEPTH.set(0, queue='telegram_listener')
+            metrics.record_jobs('telegram', 'fetched', len(payloads))
+            try:
+                jobs = await self.engine.parse_stage.run(parse_message, payloads) if payloads else []
+                await self._save(jobs, payloads)
+            except Exception:
+                # Keep the messages for the next flush rather than losing them
+                self.payloads = payloads + self.payloads
+                raise
+
+    async def _save(self, jobs, payloads=()):
+        # Job inserts run in a worker thread so event handling never stalls
+        if jobs:
+            loop = asyncio.get_running_loop()
+            inserted, duplicates = await loop.run_in_executor(None, self.engine.save_jobs_to_db, jobs)
+            logger.info(f"Listener batch - Inserted: {inserted}, Duplicates: {duplicates}")
+        # Only messages that are now stored may move the checkpoint
+        for _, _, message_id, group_name in payloads:
+            self.engine.advance_checkpoint(group_name, message_id)
+        # Checkpoints are a tiny write and share state with the event handler: stay on the loop
+        self.engine.save_checkpoints()
+
+    async def _flush_loop(self):
+        while self.running:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Listener flush failed: {e}")
+
+    async def _watch_connection(self):
+        """Telethon reconnects on its own; catch up whenever it comes back"""
+        was_connected = True
+        while self.running:
+            await asyncio.sleep(5)
+            connected = self.engine.client.is_connected()
+            if connected and not was_connected:
+                logger.info("Telegram reconnected, catching up")
+                await self.catch_up()
+            was_connected = connected
+
+    async def run(self):
+        handler = events.NewMessage()
+        try:
+            while self.running:
+                if not await self.engine.connect():
+                    await asyncio.sleep(self.reconnect_seconds)
+                    continue
+
+                tasks = []
+                try:
+                    entities = await self._resolve_groups()
+                    if not entities:
+                        logger.error("No Telegram groups resolved; listener idle")
+                        return
+
+                    handler = events.NewMessage(chats=entities)
+                    self.engine.client.add_event_handler(self._on_new_message, handler)
+                    await self.catch_up()
+
+                    tasks = [asyncio.create_task(self._flush_loop()), asyncio.create_task(self._watch_connection())]
+                    logger.info(f"Listening on {len(entities)} Telegram groups")
+                    await self.engine.client.run_until_disconnected()
+                except Exception as e:
+                    logger.error(f"Telegram listener error: {e}")
+                finally:
+                    self.engine.client.remove_event_handler(self._on_new_message, handler)
+                    for task in tasks:
+                        task.cancel()
+                    await self.flush()
+
+                if self.running:
+                    logger.warning(f"Telegram listener disconnected; reconnecting in {self.reconnect_seconds:.0f}s")
+                    await asyncio.sleep(self.reconnect_seconds)
+        finally:
+            # Also on the early return when no group resolves
+            await self.engine.client.disconnect()
+
+async def run_telegram_listener(listener: TelegramListener = None):
+    """Long-running alternative to run_telegram_engine (TELEGRAM_MODE=listen)"""
+    listener = listener or TelegramListener()
+    try:
+        await listener.run()
+    except Exception as e:
+        logger.error(f"Error in Telegram listener: {e}")
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(run_telegram_listener())
@@ -0,0 +1,133 @@
+import os
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import select, bindparam
+from database import DatabaseManager, Job, PlatformEnum
+from near_duplicates import NearDuplicateDetector
+from models import UnifiedJob
+import search
+import metrics
+
+logger = logging.getLogger("Upsert")
+
+# Columns a provider edit can change, and the UnifiedJob value each one is stored from
+def _editable_values(job: UnifiedJob) -> Dict[str, object]:
+    return {
+        'title': job.title[:500],
+        'company': job.company[:255],
+        'location': job.location[:255],
+        'salary_min': job.salary_min,
+        'salary_max': job.salary_max,
+        'currency': job.currency,
+        'apply_link': job.apply_link,
+        'description_html': job.description,
+        **job.derived_fields(),
+    }
+
+_TEXT_COLUMNS = {'title', 'company', 'description_html'}  # Inputs to the near-duplicate signature
+
+class ChangeTracker:
+    """Matches incoming jobs to stored rows by (source, external_id) before the content-hash path
+
+    Unchanged postings (same fingerprint) only get last_seen_at bumped, in batched UPDATEs. Edited
+    ones get a narrow UPDATE of the columns that differ, plus their search index row and
+    near-duplicate signature. Only jobs with no stored row are returned for insertion. Sources whose
+    ids are not unique on their own (Telegram message ids) must not use this.
+    """
+    def __init__(self, engine: str, platform: PlatformEnum, db: DatabaseManager, near_dups: NearDuplicateDetector):
+        self.engine = engine
+        self.platform = platform
+        self.db = db
+        self.near_dups = near_dups
+        self.enabled = os.getenv('UPSERT_ENABLED', '1') == '1'
+        self.batch_size = int(os.getenv('UPSERT_BATCH_SIZE', 500))  # Ids per lookup and per last_seen UPDATE
+
+    def _stored(self, conn, external_ids: List[str]) -> Dict[str, Tuple[int, str]]:
+        """external_id -> (job id, fingerprint), newest row per id"""
+        stored = {}
+        for start in range(0, len(external_ids), self.batch_size):
+            rows = conn.execute(
+                select(Job.external_id, Job.id, Job.fingerprint)
+                .where(Job.source == self.platform, Job.external_id.in_(external_ids[start:start + self.batch_size]))
+                .order_by(Job.id)
+            ).all()
+            stored.update((row.external_id, (row.id, row.fingerprint)) for row in rows)
+        return stored
+
+    def _touch(self, conn, job_ids: List[int], now: datetime):
+        table = Job.__table__
+        for start in range(0, len(job_ids), self.batch_size):
+            conn.execute(table.update().where(table.c.id.in_(job_ids[start:start + self.batch_size]))
+                         .values(last_seen_at=now))
+
+    def _update(self, conn, changed: List[Tuple[int, UnifiedJob]], now: datetime):
+        """Write only the columns whose stored value differs, grouped into one executemany per column set"""
+        table = Job.__table__
+        wanted = {job_id: _editable_values(job) for job_id, job in changed}
+        columns = [table.c[name] for name in next(iter(wanted.values()))]
+        stored = {}
+        for start in range(0, len(changed), self.batch_size):
+            ids = [job_id for job_id, _ in changed[start:start + self.batch_size]]
+            for row in conn.execute(select(table.c.id, *columns).where(table.c.id.in_(ids))):
+                stored[row.id] = row._mapping
+
+        groups: Dict[frozenset, List[dict]] = {}
+        index_rows = []
+        for job_id, job in changed:
+            diff = {name: value for name, value in wanted[job_id].items() if stored[job_id][name] != value}
+            groups.setdefault(frozenset(diff), []).append(
+                {'row_id': job_id, 'fingerprint': job.get_fingerprint(), 'last_seen_at': now, **diff})
+            values = wanted[job_id]
+            index_rows.append({'job_id': job_id, 'title': values['title'], 'company': values['company'],
+                               'location': values['location'], 'description': values['description_text']})
+            if self.near_dups.enabled and _TEXT_COLUMNS & diff.keys():
+                self.near_dups.replace(conn, job_id, self.near_dups.signature(job, values['description_text']))
+
+        for params in groups.values():
+            conn.execute(table.update().where(table.c.id == bindparam('row_id')), params)
+        search.reindex_rows(conn, index_rows)
+
+    def apply(self, jobs: List[UnifiedJob]) -> Tuple[List[UnifiedJob], int, int]:
+        """(jobs still to insert, unchanged count, updated count)"""
+        if not self.enabled:
+            return jobs, 0, 0
+        keyed: Dict[str, UnifiedJob] = {}
+        fresh, repeats = [], 0
+        for job in jobs:
+            if not job.external_id:
+                fresh.append(job)
+                continue
+            external_id = str(job.external_id)  # Stored as a string; some providers send numeric ids
+            if external_id in keyed:
+                repeats += 1  # Same posting twice in one batch (overlapping pages or queries)
+            else:
+                keyed[external_id] = job
+        if not keyed:
+            return fresh, repeats, 0
+
+        now = datetime.utcnow()
+        unchanged, changed = [], []
+        with self.db.engine.begin() as conn:
+            with metrics.stage(self.engine, 'upsert_lookup'):
+                stored = self._stored(conn, list(keyed))
+            for external_id, job in keyed.items():
+                row = stored.get(external_id)
+                if row is None:
+                    fresh.append(job)
+                elif row[1] == job.get_fingerprint():
+                    unchanged.append(row[0])
+                else:
+                    changed.append((row[0], job))
+            if changed:
+                with metrics.stage(self.engine, 'upsert_update'):
+                    self._update(conn, changed, now)
+            if unchanged:
+                with metrics.stage(self.engine, 'last_seen'):
+                    self._touch(conn, unchanged, now)
+
+        metrics.record_jobs(self.engine, 'unchanged', len(unchanged))
+        metrics.record_jobs(self.engine, 'updated', len(changed))
+        if changed:
+            logger.info(f"{self.engine}: {len(changed)} edited postings updated in place")
+        return fresh, len(unchanged) + repeats, len(changed)
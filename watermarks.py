@@ -0,0 +1,51 @@
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from database import DatabaseManager, SearchQuery
+from models import UnifiedJob
+
+logger = logging.getLogger("Watermarks")
+
+def _naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive; sources return offset-aware ones"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class QueryWatermarks:
+    """Per-SearchQuery incremental watermarks with an overlap window for late-indexed postings"""
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self.overlap = timedelta(hours=float(os.getenv('WATERMARK_OVERLAP_HOURS', 6)))
+        # A query's first run looks back this far
+        self.initial_lookback = timedelta(hours=float(os.getenv('WATERMARK_INITIAL_LOOKBACK_HOURS', 24)))
+
+    def since(self, query: SearchQuery) -> datetime:
+        """Cut-off for a query's results: its watermark minus the overlap window"""
+        if query.last_posted_at:
+            return query.last_posted_at - self.overlap
+        return datetime.utcnow() - self.initial_lookback
+
+    @staticmethod
+    def is_newer(posted_at: Optional[datetime], since: datetime) -> bool:
+        # Undated postings are kept; the hash check still catches repeats
+        if posted_at is None:
+            return True
+        return _naive_utc(posted_at) >= since
+
+    def advance(self, query_id: int, jobs: Iterable[UnifiedJob]):
+        """Move a query's watermark forward to its newest posting; call only after the jobs are stored"""
+        newest = max((_naive_utc(job.posted_at) for job in jobs if job.posted_at), default=None)
+        session = self.db.get_session()
+        try:
+            query = session.get(SearchQuery, query_id)
+            query.last_run_at = datetime.utcnow()
+            if newest and (query.last_posted_at is None or newest > query.last_posted_at):
+                query.last_posted_at = newest
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to advance watermark for query {query_id}: {e}")
+        finally:
+            session.close()
@@ -1,182 +1,292 @@
 import os
+import re
+import time
+import json
 import logging
-import hashlib
-import aiohttp
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from database import DatabaseManager, JobHash, Job, PlatformEnum, SearchQuery
+from near_duplicates import NearDuplicateDetector
+from upsert import ChangeTracker
+from watermarks import QueryWatermarks
+from models import UnifiedJob, BaseAdapter
+from parse_pool import ParseStage
+import metrics
+from log_config import setup_logging
+import cassette
 import asyncio
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("WellfoundEngine")
 
-class WellfoundJob:
-    def __init__(self, title: str, company: str, location: str, description: str, 
-                 apply_link: Optional[str] = None, posted_at: Optional[datetime] = None, 
-                 source: str = "wellfound", external_id: Optional[str] = None):
-        self.title = title
-        self.company = company
-        self.location = location
-        self.description = description
-        self.apply_link = apply_link
-        self.posted_at = posted_at
-        self.source = source
-        self.external_id = external_id
-    
-    def get_content_hash(self) -> str:
-        # Include title, company, apply_link (if exists), and first 200 chars of description
-        content_parts = [
-            self.title.lower().strip(),
-            self.company.lower().strip(),
-            self.apply_link.lower().strip() if self.apply_link else "",
-            self.description[:200].lower().strip()
-        ]
-        content = "".join(content_parts)
-        return hashlib.sha256(content.encode()).hexdigest()
+# Listing pages are Next.js; the server-rendered Apollo cache holds every card on the page
+_NEXT_DATA_RE = re.compile(r'<script id="__NEXT_DATA__" type="application/json"[^>]*>(.*?)</script>', re.S)
+_COMPENSATION_RE = re.compile(r'([₹$€£])\s*([\d.,]+)\s*([kKLM]?)(?:\s*[–-]\s*[₹$€£]?\s*([\d.,]+)\s*([kKLM]?))?')
+_CURRENCIES = {'₹': 'INR', '$': 'USD', '€': 'EUR', '£': 'GBP'}
+_MULTIPLIERS = {'': 1, 'k': 1000, 'K': 1000, 'L': 100000, 'M': 1000000}
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+def _slug(value: str) -> str:
+    return _SLUG_RE.sub('-', value.lower()).strip('-')
+
+def parse_compensation(text: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """'₹15L – ₹30L', '$120k – $160k' or '€60k' -> (min, max, currency)"""
+    match = _COMPENSATION_RE.search(text or '')
+    if not match:
+        return None, None, None
+    symbol, low, low_unit, high, high_unit = match.groups()
+    try:
+        salary_min = int(float(low.replace(',', '')) * _MULTIPLIERS[low_unit or high_unit or ''])
+        salary_max = int(float(high.replace(',', '')) * _MULTIPLIERS[high_unit or '']) if high else salary_min
+    except ValueError:
+        return None, None, None
+    return salary_min, salary_max, _CURRENCIES[symbol]
+
+def _job(listing: dict, company: str) -> Optional[UnifiedJob]:
+    locations = listing.get('locationNames') or []
+    if isinstance(locations, dict):  # Apollo wraps JSON scalars as {"type": "json", "json": [...]}
+        locations = locations.get('json') or []
+    location = ', '.join(locations) or ('Remote' if listing.get('remote') else 'Unknown Location')
+    if listing.get('remote') and 'remote' not in location.lower():
+        location = f"{location} (Remote)"
+    salary_min, salary_max, currency = parse_compensation(listing.get('compensation') or '')
+
+    posted_at = None
+    live_start = listing.get('liveStartAt')
+    if isinstance(live_start, str) and live_start.isdigit():  # Epoch seconds from a data attribute
+        live_start = int(live_start)
+    if isinstance(live_start, (int, float)):
+        posted_at = datetime.fromtimestamp(live_start, timezone.utc).replace(tzinfo=None)
+    elif live_start:
+        try:
+            posted_at = datetime.fromisoformat(str(live_start).replace('Z', '+00:00'))
+            if posted_at.tzinfo is not None:
+                posted_at = posted_at.astimezone(timezone.utc).replace(tzinfo=None)
+        except ValueError:
+            posted_at = None
+
+    external_id = str(listing.get('id', ''))
+    return UnifiedJob(
+        title=(listing.get('title') or 'Job Posting')[:100],
+        company=company or 'Unknown Company',
+        location=location,
+        description=listing.get('description') or '',
+        apply_link=listing.get('url') or f"https://wellfound.com/jobs/{external_id}-{listing.get('slug') or ''}".rstrip('-'),
+        posted_at=posted_at,  # Undated cards pass the watermark filter without advancing it
+        external_id=external_id,
+        salary_min=salary_min,
+        salary_max=salary_max,
+        currency=currency or 'INR',
+        source="wellfound"
+    )
+
+def _parse_next_data(payload: str) -> List[UnifiedJob]:
+    state = json.loads(payload)['props']['pageProps']['apolloState']['data']
+    jobs = []
+    for entry in state.values():
+        if not isinstance(entry, dict) or 'highlightedJobListings' not in entry:
+            continue
+        for ref in entry['highlightedJobListings']:
+            listing = state.get(ref.get('__ref')) if isinstance(ref, dict) else None
+            if listing:
+                job = _job(listing, entry.get('name'))
+                if job:
+                    jobs.append(job)
+    return jobs
+
+def _parse_cards(html: str) -> List[UnifiedJob]:
+    """Rendered markup, for pages without (or with a changed) __NEXT_DATA__ payload"""
+    soup = BeautifulSoup(html, 'html.parser')
+    jobs = []
+    for card in soup.select('[data-test="StartupResult"]'):
+        name = card.select_one('h2')
+        company = name.get_text(strip=True) if name else None
+        for row in card.select('[data-test="JobListing"]'):
+            link = row.select_one('a[href*="/jobs/"]')
+            if not link:
+                continue
+            href = link['href']
+            slug = href.rstrip('/').rsplit('/', 1)[-1]
+            external_id, _, slug = slug.partition('-')
+            location = row.select_one('[data-test="JobListing-location"]')
+            compensation = row.select_one('[data-test="JobListing-compensation"]')
+            job = _job({
+                'id': external_id,
+                'slug': slug,
+                'title': link.get_text(strip=True),
+                'url': href if href.startswith('http') else f"https://wellfound.com{href}",
+                'locationNames': [part.strip() for part in location.get_text().split('•')] if location else [],
+                'compensation': compensation.get_text(strip=True) if compensation else '',
+                'liveStartAt': row.get('data-posted-at'),
+            }, company)
+            if job:
+                jobs.append(job)
+    return jobs
+
+def parse_listing_page(html: str) -> List[UnifiedJob]:
+    """Every job card on a Wellfound listing page (runs in the parse pool, so module-level)"""
+    try:
+        match = _NEXT_DATA_RE.search(html)
+        if match:
+            try:
+                return _parse_next_data(match.group(1))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Unexpected __NEXT_DATA__ shape, falling back to markup: {e}")
+        return _parse_cards(html)
+    except Exception as e:
+        logger.error(f"Error parsing listing page: {e}")
+        return []
 
 class WellfoundEngine:
     def __init__(self):
         load_dotenv()
         
-        # No API key required for Wellfound
-        self.base_url = "https://wellfound.com/jobs/search.json"
+        # No API key: listing pages are scraped with a browser-impersonating client
+        self.base_url = os.getenv('WELLFOUND_BASE_URL', "https://wellfound.com").rstrip('/')
+        self.max_pages = int(os.getenv('WELLFOUND_MAX_PAGES', 3))
+        self.concurrency = int(os.getenv('WELLFOUND_CONCURRENCY', 4))
+        self.impersonate = os.getenv('WELLFOUND_IMPERSONATE', 'chrome110')
+        self.timeout = float(os.getenv('WELLFOUND_TIMEOUT_SECONDS', 30))
         
         # Initialize database
         db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
         self.db = DatabaseManager(db_url)
         self.db.create_tables()
+        self.near_dups = NearDuplicateDetector()
+        self.changes = ChangeTracker('wellfound', PlatformEnum.WELLFOUND, self.db, self.near_dups)
+        self.watermarks = QueryWatermarks(self.db)
+        self.parse_stage = ParseStage('wellfound')
+        self.page_slots = asyncio.Semaphore(self.concurrency)
+        self.session = None
+        # Pause between queries (none when replaying a cassette)
+        self.query_delay = float(os.getenv('QUERY_DELAY_SECONDS', 0 if cassette.replaying() else 1))
     
     async def connect(self):
-        """No API key validation needed for Wellfound"""
+        """Open the cycle's curl_cffi session; its connection pool is reused for every page"""
         try:
+            self.session = cassette.curl_session(max_clients=self.concurrency, impersonate=self.impersonate,
+                                                 timeout=self.timeout)
             logger.info("Wellfound connected")
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Wellfound: {e}")
             return False
     
-    async def get_last_db_timestamp(self) -> datetime:
-        """Get the timestamp of the most recent job from database"""
-        session = self.db.get_session()
-        try:
-            latest_job = session.query(Job).filter(
-                Job.source == PlatformEnum.WELLFOUND
-            ).order_by(Job.posted_at_source.desc()).first()
-            
-            if latest_job and latest_job.posted_at_source:
-                return latest_job.posted_at_source
-            else:
-                # If no Wellfound jobs exist, fetch from last 24 hours
-                return datetime.now() - timedelta(hours=24)
-        finally:
-            session.close()
+    async def close(self):
+        if self.session is not None:
+            await self.session.__aexit__(None, None, None)
+            self.session = None
     
-    async def fetch_jobs(self, keywords: str, location: str, since_timestamp: datetime) -> List[WellfoundJob]:
-        """Fetch jobs from Wellfound API"""
+    def listing_url(self, keywords: str, location: str, page: int) -> str:
+        """/role/l/<role>/<location> for a place, /role/r/<role> for remote"""
+        role = _slug(keywords)
+        location = _slug(location or 'India')
+        path = f"/role/r/{role}" if location == 'remote' else f"/role/l/{role}/{location}"
+        return f"{self.base_url}{path}?page={page}" if page > 1 else f"{self.base_url}{path}"
+    
+    async def _fetch_page(self, url: str, keywords: str) -> Optional[str]:
+        async with self.page_slots:
+            started = time.perf_counter()
+            try:
+                response = await self.session.get(url)
+            except Exception as e:
+                logger.error(f"Wellfound request failed for {url}: {e}")
+                return None
+            metrics.record_http('wellfound', keywords, response.status_code, time.perf_counter() - started,
+                                len(response.content))
+            if response.status_code == 200:
+                return response.text
+            if response.status_code in (403, 429):
+                logger.warning(f"Wellfound blocked {url}: {response.status_code}")
+            elif response.status_code != 404:  # 404: past the last page
+                logger.error(f"Wellfound error {response.status_code} for {url}")
+            return None
+    
+    async def fetch_jobs(self, keywords: str, location: str, since_timestamp: datetime) -> List[UnifiedJob]:
+        """Fetch a query's listing pages: page 1, then the rest concurrently if it had results"""
         jobs = []
         try:
             logger.info(f"Query found: {keywords}, {location}")
             
-            params = {
-                "query": keywords,
-                "location": location or "India",
-                "page": 1
-            }
+            first = await self._fetch_page(self.listing_url(keywords, location, 1), keywords)
+            if first is None:
+                return jobs
+            # Parse and hash, offloaded to the parse pool once there is enough markup
+            parsed = await self.parse_stage.run_documents(parse_listing_page, [first])
+            if parsed and self.max_pages > 1:
+                rest = await asyncio.gather(*[
+                    self._fetch_page(self.listing_url(keywords, location, page), keywords)
+                    for page in range(2, self.max_pages + 1)
+                ])
+                parsed.extend(await self.parse_stage.run_documents(parse_listing_page, [page for page in rest if page]))
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        job_list = data.get('jobs', [])
-                        
-                        for job_data in job_list:
-                            job = self._parse_job(job_data)
-                            if job and self._is_job_newer(job, since_timestamp):
-                                jobs.append(job)
-                        
-                        logger.info(f"Jobs fetched: {len(jobs)}")
-                    else:
-                        logger.error(f"Wellfound API error: {response.status}")
+            jobs = [job for job in parsed if self._is_job_newer(job, since_timestamp)]
+            metrics.record_jobs('wellfound', 'fetched', len(parsed))
+            metrics.record_jobs('wellfound', 'stale', len(parsed) - len(jobs))
+            logger.info(f"Jobs fetched: {len(jobs)}")
                         
         except Exception as e:
             logger.error(f"Error fetching from Wellfound: {e}")
         
         return jobs
     
-    def _parse_job(self, job_data: dict) -> Optional[WellfoundJob]:
-        """Parse a Wellfound job into normalized Job schema"""
-        try:
-            title = job_data.get('title', 'Job Posting')[:100]
-            company = job_data.get('startup_name', 'Unknown Company')
-            location = job_data.get('location', 'Unknown Location')
-            description = job_data.get('description', '')
-            apply_link = job_data.get('job_url')
-            external_id = str(job_data.get('id', ''))
-            
-            # Parse posted date
-            posted_at = None
-            if job_data.get('created_at'):
-                try:
-                    posted_at = datetime.fromisoformat(job_data['created_at'].replace('Z', '+00:00'))
-                except:
-                    posted_at = datetime.now()
-            else:
-                posted_at = datetime.now()
-            
-            return WellfoundJob(
-                title=title,
-                company=company,
-                location=location,
-                description=description,
-                apply_link=apply_link,
-                posted_at=posted_at,
-                external_id=external_id
-            )
-        except Exception as e:
-            logger.error(f"Error parsing job: {e}")
-            return None
-    
-    def _is_job_newer(self, job: WellfoundJob, since_timestamp: datetime) -> bool:
-        """Check if job is newer than the given timestamp"""
-        if not job.posted_at:
-            return True  # Include jobs without timestamp
-        return job.posted_at.replace(tzinfo=None) > since_timestamp.replace(tzinfo=None)
+    def _is_job_newer(self, job: UnifiedJob, since_timestamp: datetime) -> bool:
+        """Drop postings older than the query's watermark (minus the overlap window)"""
+        return self.watermarks.is_newer(job.posted_at, since_timestamp)
     
-    def save_jobs_to_db(self, jobs: List[WellfoundJob]) -> tuple[int, int]:
+    @metrics.timed('wellfound', 'save')
+    def save_jobs_to_db(self, jobs: List[UnifiedJob]) -> tuple[int, int]:
         """Save jobs to database with deduplication"""
         if not jobs:
             return 0, 0
         
+        # Known postings (same source and external id) are touched or updated in place, not re-inserted
+        jobs, unchanged_count, _ = self.changes.apply(jobs)
+        
         session = self.db.get_session()
+        # Pending rows go out in the timed flush/commit below rather than inside the lookups
+        session.autoflush = False
+        lookup_timer = metrics.stage('wellfound', 'dedup_lookup')
+        near_dup_timer = metrics.stage('wellfound', 'near_dup')
+        insert_timer = metrics.stage('wellfound', 'insert')
+        fields_timer = metrics.stage('wellfound', 'fields')
         inserted_count = 0
-        duplicate_count = 0
+        duplicate_count = unchanged_count
         
         try:
             for job in jobs:
                 content_hash = job.get_content_hash()
                 
                 # Check for duplicates
-                existing_hash = session.query(JobHash).filter_by(content_hash=content_hash).first()
+                with lookup_timer:
+                    existing_hash = session.query(JobHash).filter_by(content_hash=content_hash).first()
                 if existing_hash:
                     duplicate_count += 1
                     continue
                 
+                # Plain-text and normalized columns, derived once for the signature and the row
+                with fields_timer:
+                    fields = job.derived_fields()
+                
+                # Cross-source near-duplicate check
+                canonical_id = None
+                if self.near_dups.enabled:
+                    with near_dup_timer:
+                        signature = self.near_dups.signature(job, fields['description_text'])
+                        canonical_id = self.near_dups.find_duplicate(session, signature, PlatformEnum.WELLFOUND)
+                    if canonical_id and self.near_dups.suppress:
+                        duplicate_count += 1
+                        continue
+                
                 try:
                     # Insert hash
                     job_hash = JobHash(content_hash=content_hash)
                     session.add(job_hash)
-                    session.flush()
+                    with insert_timer:
+                        session.flush()
                     
                     # Insert job
                     job_entry = Job(
@@ -186,12 +296,19 @@ class WellfoundEngine:
                         title=job.title[:500],
                         company=job.company[:255],
                         location=job.location[:255],
+                        salary_min=job.salary_min,
+                        salary_max=job.salary_max,
+                        currency=job.currency,
                         apply_link=job.apply_link,
                         description_html=job.description,
                         posted_at_source=job.posted_at,
-                        raw_data={'external_id': job.external_id}
+                        fingerprint=job.get_fingerprint(),
+                        raw_data={'external_id': job.external_id},
+                        **fields
                     )
                     session.add(job_entry)
+                    if self.near_dups.enabled:
+                        self.near_dups.record(session, job_entry, signature, canonical_id)
                     inserted_count += 1
                     
                 except IntegrityError:
@@ -202,7 +319,8 @@ class WellfoundEngine:
                     logger.error(f"Error saving job: {e}")
             
             if inserted_count > 0:
-                session.commit()
+                with metrics.stage('wellfound', 'commit'):
+                    session.commit()
                 logger.info(f"New jobs inserted: {inserted_count}")
             
             if duplicate_count > 0:
@@ -211,9 +329,12 @@ class WellfoundEngine:
         except Exception as e:
             session.rollback()
             logger.error(f"Database error: {e}")
+            raise
         finally:
             session.close()
         
+        metrics.record_jobs('wellfound', 'inserted', inserted_count)
+        metrics.record_jobs('wellfound', 'duplicate', duplicate_count)
         return inserted_count, duplicate_count
 
 async def run_wellfound_engine():
@@ -225,9 +346,6 @@ async def run_wellfound_engine():
         return
     
     try:
-        # Get last timestamp from database
-        last_timestamp = await engine.get_last_db_timestamp()
-        
         # Load queries from search_queries table
         session = engine.db.get_session()
         queries = session.query(SearchQuery).filter(
@@ -237,20 +355,34 @@ async def run_wellfound_engine():
         session.close()
         
         all_jobs = []
+        jobs_by_query = {}
         
-        # Fetch from all queries
+        # Fetch from all queries, each from its own watermark
         for query in queries:
-            jobs = await engine.fetch_jobs(query.value, query.location or "", last_timestamp)
+            jobs = await engine.fetch_jobs(query.value, query.location or "", engine.watermarks.since(query))
+            jobs_by_query[query.id] = jobs
             all_jobs.extend(jobs)
-            await asyncio.sleep(1)  # Rate limiting
+            await asyncio.sleep(engine.query_delay)  # Rate limiting
         
         # Save to database
         inserted, duplicates = engine.save_jobs_to_db(all_jobs)
         
+        # Watermarks only move once their jobs are stored
+        for query_id, jobs in jobs_by_query.items():
+            engine.watermarks.advance(query_id, jobs)
+        
         logger.info(f"Wellfound cycle complete - Inserted: {inserted}, Duplicates: {duplicates}")
         
     except Exception as e:
         logger.error(f"Error in Wellfound engine: {e}")
+    finally:
+        await engine.close()
+
+class WellfoundAdapter(BaseAdapter):
+    """Wellfound listing-page scraper, as registered in engine_registry"""
+    async def run_cycle(self):
+        await run_wellfound_engine()
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(run_wellfound_engine())
\ No newline at end of file